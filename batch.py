@@ -0,0 +1,438 @@
+import random
+import time
+from collections import deque
+
+import numpy as np
+
+from engine import OBSTACLE, POWERUP_DURATION, POWERUP_LIFETIME, GameMode, PowerUpType, SnakeEngine
+from levels import DEFAULT_DIFFICULTY, POOL_SIZE, level_for
+
+# Direction codes used by the batch engine, in the same order as ACTIONS
+ACTIONS = ("Up", "Down", "Left", "Right")
+DX = np.array([0, 0, -1, 1], dtype=np.int32)
+DY = np.array([-1, 1, 0, 0], dtype=np.int32)
+OPPOSITE = np.array([1, 0, 3, 2], dtype=np.int8)
+
+POWERUP_TYPES = tuple(PowerUpType)
+SCORE_MULTIPLIER = POWERUP_TYPES.index(PowerUpType.SCORE_MULTIPLIER)
+INVINCIBLE = POWERUP_TYPES.index(PowerUpType.INVINCIBLE)
+MAX_POWERUPS = 2
+
+SUPPORTED_MODES = (GameMode.CLASSIC, GameMode.ZEN, GameMode.OBSTACLES)
+
+
+class BatchEngine:
+    """Many independent snake games advanced together with NumPy.
+
+    Follows the same rules as SnakeEngine.step for CLASSIC, ZEN and
+    OBSTACLES. Every game's state lives in arrays indexed by game number:
+    the board is an occupancy grid per game (snake segment count plus the
+    OBSTACLE flag, like SnakeEngine.cells) and the body is a ring buffer of
+    coordinates. Finished games are reset automatically at the end of step()
+    after their final stats are copied to the final_* arrays.
+
+    Actions are direction codes (indexes into ACTIONS), -1 keeps going.
+    """
+
+    def __init__(self, num_games, mode=GameMode.CLASSIC, grid_size=20, seed=None):
+        if mode not in SUPPORTED_MODES:
+            raise ValueError(f"BatchEngine does not support {mode.value}")
+
+        self.num_games = num_games
+        self.game_mode = mode
+        self.GRID_SIZE = grid_size
+        self.rng = np.random.default_rng(seed)
+        self.trace = None
+
+        n = num_games
+        cells = grid_size * grid_size
+        # An invincible snake can overlap itself, so leave room past the board
+        self.capacity = 2 * cells
+        self.cells = np.zeros((n, cells), dtype=np.uint8)
+        self.body_x = np.zeros((n, self.capacity), dtype=np.int16)
+        self.body_y = np.zeros((n, self.capacity), dtype=np.int16)
+        self.head_ptr = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.head_x = np.zeros(n, dtype=np.int32)
+        self.head_y = np.zeros(n, dtype=np.int32)
+        self.direction = np.zeros(n, dtype=np.int8)
+        self.food = np.full(n, -1, dtype=np.int64)  # cell index
+        self.powerup_cell = np.full((n, MAX_POWERUPS), -1, dtype=np.int64)
+        self.powerup_type = np.zeros((n, MAX_POWERUPS), dtype=np.int8)
+        self.powerup_expiry = np.zeros((n, MAX_POWERUPS), dtype=np.int64)  # tick it expires on
+        self.active_powerup = np.full(n, -1, dtype=np.int8)
+        self.powerup_ends = np.zeros(n, dtype=np.int64)  # tick the active effect wears off on
+        self.score_multiplier = np.ones(n, dtype=np.int32)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.food_eaten = np.zeros(n, dtype=np.int64)
+        self.moves_count = np.zeros(n, dtype=np.int64)
+        self.won = np.zeros(n, dtype=bool)
+
+        # Stats of games that finished on the last step, valid where done
+        self.final_score = np.zeros(n, dtype=np.int64)
+        self.final_length = np.zeros(n, dtype=np.int64)
+        self.final_food = np.zeros(n, dtype=np.int64)
+        self.final_moves = np.zeros(n, dtype=np.int64)
+        self.final_won = np.zeros(n, dtype=bool)
+
+        self.reset(np.arange(n))
+
+    def start_trace(self):
+        """Record every random draw per game so check_parity can replay it"""
+        self.trace = [[] for _ in range(self.num_games)]
+        self.reset_trace = [[] for _ in range(self.num_games)]
+
+    def reset(self, games):
+        """Start new games in the given slots"""
+        games = np.asarray(games, dtype=np.int64)
+        if not len(games):
+            return
+        size = self.GRID_SIZE
+        center = size // 2
+
+        self.cells[games] = 0
+        self.head_ptr[games] = 2
+        self.length[games] = 3
+        self.body_x[games, :3] = (center - 2, center - 1, center)
+        self.body_y[games, :3] = center
+        self.head_x[games] = center
+        self.head_y[games] = center
+        self.direction[games] = ACTIONS.index("Right")
+        self.cells[games[:, None], center * size + np.arange(center - 2, center + 1)] = 1
+        self.food[games] = -1
+        self.powerup_cell[games] = -1
+        self.active_powerup[games] = -1
+        self.powerup_ends[games] = 0
+        self.score_multiplier[games] = 1
+        self.score[games] = 0
+        self.food_eaten[games] = 0
+        self.moves_count[games] = 0
+        self.won[games] = False
+
+        trace = self.reset_trace if self.trace is not None else None
+        if trace is not None:
+            for game in games:
+                trace[game].clear()
+
+        if self.game_mode == GameMode.OBSTACLES:
+            self.generate_obstacles(games, trace)
+
+        self.spawn_food(games, trace)
+
+    def generate_obstacles(self, games, trace=None):
+        """Lay out one of the pooled levels per game, like SnakeEngine"""
+        size = self.GRID_SIZE
+        for game, level in zip(games, self.rng.integers(0, POOL_SIZE, size=len(games))):
+            cells = np.frombuffer(level_for(int(level), size, DEFAULT_DIFFICULTY), dtype=np.int32)
+            self.cells[game, cells] = OBSTACLE
+            if trace is not None:
+                trace[game].append([(int(c) % size, int(c) // size) for c in cells])
+
+    def pick_free_cells(self, games, avoid_items=False):
+        """Uniformly random empty cell per game, -1 where the board is full"""
+        picked = np.full(len(games), -1, dtype=np.int64)
+        cells = self.cells
+        total = cells.shape[1]
+        todo = np.arange(len(games))
+
+        # Rejection sampling is uniform and almost always done in a round or
+        # two; crowded boards fall through to an exact pick below
+        for _ in range(8):
+            rows = games[todo]
+            candidates = self.rng.integers(0, total, size=len(todo))
+            ok = cells[rows, candidates] == 0
+            if avoid_items:
+                ok &= candidates != self.food[rows]
+                ok &= (self.powerup_cell[rows] != candidates[:, None]).all(axis=1)
+            picked[todo[ok]] = candidates[ok]
+            todo = todo[~ok]
+            if not len(todo):
+                return picked
+
+        for k in todo:
+            game = games[k]
+            free = np.flatnonzero(cells[game] == 0)
+            if avoid_items:
+                free = free[(free != self.food[game])
+                            & (free[:, None] != self.powerup_cell[game][None, :]).all(axis=1)]
+            if len(free):
+                picked[k] = free[self.rng.integers(len(free))]
+        return picked
+
+    def spawn_food(self, games, trace=None):
+        """Spawn food (and sometimes a powerup) for the given games"""
+        size = self.GRID_SIZE
+        food = self.pick_free_cells(games)
+        self.food[games] = food
+        if trace is not None:
+            for game, cell in zip(games, food):
+                trace[game].append(None if cell < 0 else (int(cell) % size, int(cell) // size))
+
+        # Full board: no food, and no powerup roll either
+        games = games[food >= 0]
+        rolls = self.rng.random(len(games))
+        if trace is not None:
+            for game, roll in zip(games, rolls):
+                trace[game].append(float(roll))
+
+        # Occasionally spawn powerups
+        count = (self.powerup_cell[games] >= 0).sum(axis=1)
+        games = games[(rolls < 0.15) & (count < MAX_POWERUPS)]
+        if not len(games):
+            return
+        cells = self.pick_free_cells(games, avoid_items=True)
+        games, cells = games[cells >= 0], cells[cells >= 0]
+        types = self.rng.integers(0, len(POWERUP_TYPES), size=len(games))
+        # Fill the first empty slot so slot order is spawn order
+        slot = np.argmax(self.powerup_cell[games] < 0, axis=1)
+        self.powerup_cell[games, slot] = cells
+        self.powerup_type[games, slot] = types
+        self.powerup_expiry[games, slot] = self.moves_count[games] + POWERUP_LIFETIME
+        if trace is not None:
+            for game, cell, kind in zip(games, cells, types):
+                trace[game].append((int(cell) % size, int(cell) // size))
+                trace[game].append(POWERUP_TYPES[kind])
+
+    def compact_powerups(self):
+        """Shift the second powerup into an emptied first slot"""
+        shift = (self.powerup_cell[:, 0] < 0) & (self.powerup_cell[:, 1] >= 0)
+        if shift.any():
+            self.powerup_cell[shift, 0] = self.powerup_cell[shift, 1]
+            self.powerup_type[shift, 0] = self.powerup_type[shift, 1]
+            self.powerup_expiry[shift, 0] = self.powerup_expiry[shift, 1]
+            self.powerup_cell[shift, 1] = -1
+
+    def step(self, actions=None):
+        """Advance every game by one tick.
+
+        Returns ``(state, rewards, dones)`` like SnakeEngine.step, with the
+        batch engine itself as the state. Games flagged in dones have
+        already been reset; their results are in the final_* arrays.
+        """
+        size = self.GRID_SIZE
+        n = self.num_games
+        trace = self.trace
+        score_before = self.score.copy()
+
+        # Update direction, ignoring reversals
+        if actions is not None:
+            actions = np.asarray(actions)
+            turn = (actions >= 0) & (actions != OPPOSITE[self.direction])
+            self.direction[turn] = actions[turn]
+        self.moves_count += 1
+
+        # Calculate new head position
+        head_x = self.head_x + DX[self.direction]
+        head_y = self.head_y + DY[self.direction]
+        if self.game_mode == GameMode.ZEN:
+            head_x %= size
+            head_y %= size
+        on_board = (head_x >= 0) & (head_x < size) & (head_y >= 0) & (head_y < size)
+        head = np.where(on_board, head_y * size + head_x, 0)
+
+        # Check collisions (walls, self and obstacles)
+        everyone = np.arange(n)
+        blocked = ~on_board | (self.cells[everyone, head] != 0)
+        dead = blocked & (self.active_powerup != INVINCIBLE)
+        games = np.flatnonzero(~dead)
+        head, head_x, head_y = head[games], head_x[games], head_y[games]
+        on_board = on_board[games]
+
+        # Move snake
+        ptr = self.head_ptr[games] + 1
+        self.head_ptr[games] = ptr
+        ring = ptr % self.capacity
+        self.body_x[games, ring] = head_x
+        self.body_y[games, ring] = head_y
+        self.head_x[games] = head_x
+        self.head_y[games] = head_y
+        self.cells[games[on_board], head[on_board]] += 1
+
+        # Check food collision
+        ate = on_board & (head == self.food[games])
+        eaters = games[ate]
+        self.food_eaten[eaters] += 1
+        self.score[eaters] += 10 * self.score_multiplier[eaters]
+        self.length[eaters] += 1
+        if len(eaters):
+            self.spawn_food(eaters, trace)
+        self.won[eaters] = self.food[eaters] < 0
+
+        movers = games[~ate]
+        tail = (ptr[~ate] - self.length[movers]) % self.capacity
+        tail_x = self.body_x[movers, tail]
+        tail_y = self.body_y[movers, tail]
+        tail_on = (tail_x >= 0) & (tail_x < size) & (tail_y >= 0) & (tail_y < size)
+        self.cells[movers[tail_on], tail_y[tail_on] * size + tail_x[tail_on]] -= 1
+
+        # Games that filled the board stop here
+        still = ~self.won[games]
+        games, head, on_board = games[still], head[still], on_board[still]
+
+        # Check powerup collision
+        hit = (self.powerup_cell[games] == head[:, None]) & on_board[:, None]
+        picked = hit.any(axis=1)
+        if picked.any():
+            takers = games[picked]
+            slot = np.argmax(hit[picked], axis=1)
+            kind = self.powerup_type[takers, slot]
+            self.active_powerup[takers] = kind
+            self.powerup_ends[takers] = self.moves_count[takers] + POWERUP_DURATION - 1
+            self.score_multiplier[takers[kind == SCORE_MULTIPLIER]] = 2
+            self.powerup_cell[takers, slot] = -1
+            self.compact_powerups()
+
+        # Effects wearing off this tick
+        moves = self.moves_count[games]
+        expired = games[(self.active_powerup[games] >= 0) & (self.powerup_ends[games] <= moves)]
+        self.score_multiplier[expired[self.active_powerup[expired] == SCORE_MULTIPLIER]] = 1
+        self.active_powerup[expired] = -1
+        self.powerup_ends[expired] = 0
+
+        # Powerups left uneaten for POWERUP_LIFETIME ticks
+        gone = (self.powerup_cell[games] >= 0) & (self.powerup_expiry[games] <= moves[:, None])
+        if gone.any():
+            rows, slots = np.nonzero(gone)
+            self.powerup_cell[games[rows], slots] = -1
+            self.compact_powerups()
+
+        rewards = self.score - score_before
+        dones = dead | self.won
+        finished = np.flatnonzero(dones)
+        if len(finished):
+            self.final_score[finished] = self.score[finished]
+            self.final_length[finished] = self.length[finished]
+            self.final_food[finished] = self.food_eaten[finished]
+            self.final_moves[finished] = self.moves_count[finished]
+            self.final_won[finished] = self.won[finished]
+            self.reset(finished)
+        return self, rewards, dones
+
+    def snake(self, game):
+        """Body of one game as a head-first list of (x, y)"""
+        ptr = self.head_ptr[game]
+        ring = (ptr - np.arange(self.length[game])) % self.capacity
+        return list(zip(self.body_x[game, ring].tolist(), self.body_y[game, ring].tolist()))
+
+
+class ScriptedRandom:
+    """Stands in for random.Random, handing out recorded draws in order"""
+
+    def __init__(self):
+        self.script = deque()
+
+    def next_draw(self, default):
+        return self.script.popleft() if self.script else default
+
+    def seed(self, a=None):
+        pass
+
+    def getrandbits(self, k):
+        return 0
+
+    def random(self):
+        return self.next_draw(1.0)
+
+    def choice(self, seq):
+        return self.next_draw(seq[0])
+
+
+class ShadowEngine(SnakeEngine):
+    """SnakeEngine whose random choices are replayed from a BatchEngine trace"""
+
+    def __init__(self, grid_size):
+        super().__init__(grid_size, rng=ScriptedRandom())
+        self.script = self.rng.script
+
+    def random_free_cell(self, exclude=()):
+        return self.rng.next_draw(None)
+
+    def generate_obstacles(self):
+        self.obstacles = list(self.rng.next_draw([]))
+        size = self.GRID_SIZE
+        for x, y in self.obstacles:
+            self.take_free_cell(y * size + x)
+            self.cells[y * size + x] = OBSTACLE
+
+
+def check_parity(mode=GameMode.CLASSIC, num_games=64, ticks=2000, seed=0, grid_size=20):
+    """Run BatchEngine against SnakeEngine on the same seeds and actions.
+
+    Every random draw the batch engine makes is replayed into a SnakeEngine
+    per game, so the two must agree on movement, collisions, eating,
+    powerups and scores tick by tick. Raises AssertionError on the first
+    difference and returns the number of games compared.
+    """
+    batch = BatchEngine(num_games, mode, grid_size, seed=seed)
+    batch.start_trace()
+    batch.reset(np.arange(num_games))
+    shadows = []
+    for game in range(num_games):
+        shadow = ShadowEngine(grid_size)
+        shadow.script.extend(batch.reset_trace[game])
+        shadow.reset(mode)
+        shadows.append(shadow)
+
+    actions_rng = random.Random(seed)
+    compared = num_games
+    for tick in range(ticks):
+        actions = np.array([actions_rng.choice((-1, -1, 0, 1, 2, 3)) for _ in range(num_games)])
+        for game in range(num_games):
+            batch.trace[game].clear()
+        _, rewards, dones = batch.step(actions)
+
+        for game, shadow in enumerate(shadows):
+            shadow.script.extend(batch.trace[game])
+            action = None if actions[game] < 0 else ACTIONS[actions[game]]
+            _, reward, done = shadow.step(action)
+            where = f"game {game} tick {tick}"
+            assert not shadow.script, where
+            assert done == dones[game] and reward == rewards[game], where
+            if done:
+                assert shadow.score == batch.final_score[game], where
+                assert len(shadow.snake) == batch.final_length[game], where
+                assert shadow.won == batch.final_won[game], where
+                shadow.script.extend(batch.reset_trace[game])
+                shadow.reset(mode)
+                compared += 1
+            assert_same_state(batch, game, shadow, where)
+    return compared
+
+
+def assert_same_state(batch, game, engine, where=""):
+    """Compare one batch game with a SnakeEngine"""
+    size = batch.GRID_SIZE
+    food = batch.food[game]
+    powerups = [((int(c) % size, int(c) // size), POWERUP_TYPES[t])
+                for c, t in zip(batch.powerup_cell[game], batch.powerup_type[game]) if c >= 0]
+    active = batch.active_powerup[game]
+
+    assert batch.snake(game) == list(engine.snake), where
+    assert ACTIONS[batch.direction[game]] == engine.snake_direction, where
+    assert (None if food < 0 else (int(food) % size, int(food) // size)) == engine.food, where
+    assert powerups == list(engine.powerups.items()), where
+    assert (None if active < 0 else POWERUP_TYPES[active]) == engine.active_powerup, where
+    assert batch.powerup_ends[game] == engine.powerup_ends, where
+    assert list(batch.powerup_expiry[game][batch.powerup_cell[game] >= 0]) == list(engine.powerup_expiry.values()), where
+    assert batch.score_multiplier[game] == engine.score_multiplier, where
+    assert batch.score[game] == engine.score, where
+    assert batch.moves_count[game] == engine.moves_count, where
+    assert bytes(batch.cells[game]) == bytes(engine.cells), where
+
+
+def benchmark(num_games=10000, ticks=200, mode=GameMode.CLASSIC, seed=0):
+    """Game-steps per second with random actions"""
+    batch = BatchEngine(num_games, mode, seed=seed)
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(-1, 4, size=(ticks, num_games))
+    start = time.perf_counter()
+    for tick in range(ticks):
+        batch.step(actions[tick])
+    return num_games * ticks / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    for mode in SUPPORTED_MODES:
+        games = check_parity(mode)
+        print(f"{mode.value}: parity OK over {games} games, "
+              f"{benchmark(mode=mode):,.0f} game-steps/s")
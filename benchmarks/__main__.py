@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+from benchmarks import headless, render, rooms, startup
+
+# Metrics where a bigger number is better; everything else is a cost
+HIGHER_IS_BETTER = ('ticks_per_s', 'server_rooms', 'levels_per_s')
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                              ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(base, current, out=sys.stdout):
+    """Print each metric next to a previous results file, with the change"""
+    print(f"{'metric':<34}{base['commit']:>12}{current['commit']:>12}  change", file=out)
+    for name, value in current['results'].items():
+        old = base['results'].get(name)
+        if old is None:
+            print(f"{name:<34}{'-':>12}{value:>12}", file=out)
+            continue
+        change = (value - old) / old * 100 if old else 0.0
+        better = (change > 0) == name.startswith(HIGHER_IS_BETTER)
+        verdict = "" if abs(change) < 5 else ("better" if better else "WORSE")
+        print(f"{name:<34}{old:>12}{value:>12}  {change:+6.1f}% {verdict}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the simulation and rendering hot paths")
+    parser.add_argument("--output", help="results file (default: bench-<commit>.json)")
+    parser.add_argument("--compare", help="results file from another commit to compare against")
+    parser.add_argument("--no-render", action="store_true", help="skip the Tk benchmarks")
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    results = headless.run()
+    results.update(startup.headless())
+    results.update(rooms.run())
+    skipped = None
+    if args.no_render:
+        skipped = "disabled with --no-render"
+    else:
+        render_results = render.run()
+        if render_results is None:
+            skipped = "no tkinter or no display (set DISPLAY or install Xvfb and xvfbwrapper)"
+        else:
+            results.update(render_results)
+
+    report = {
+        'commit': commit,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'seeds': {'headless': headless.SEED, 'render': render.SEED},
+        'render_skipped': skipped,
+        'results': results,
+    }
+    output = args.output or f"bench-{commit}.json"
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+    else:
+        for name, value in results.items():
+            print(f"{name:<34}{value:>12}")
+    if skipped:
+        print(f"Rendering benchmarks skipped: {skipped}")
+    print(f"Results written to {output}")
+
+    over = startup.over_budget(results)
+    for name, (value, budget) in over.items():
+        print(f"Over budget: {name} = {value} (budget {budget})")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
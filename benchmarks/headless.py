@@ -0,0 +1,146 @@
+import time
+from array import array
+from collections import deque
+
+import levels
+import stream
+from engine import DIRECTIONS, GameMode, SnakeEngine
+from rewind import RewindBuffer, Snapshot
+
+SEED = 1234
+GRID_SIZE = 64  # big enough for a 1000-segment snake
+TICK_LENGTHS = (3, 100, 1000)
+SPAWN_FILLS = (0.5, 0.9, 0.99)
+
+STEP_OF = {delta: name for name, delta in DIRECTIONS.items()}
+
+
+def cycle(size):
+    """A Hamiltonian cycle over an even-sized board, as a list of cells.
+
+    Row 0 left to right, then the rest of the board snaking down columns
+    1..size-1, then back up column 0.
+    """
+    cells = [(x, 0) for x in range(size)]
+    for y in range(1, size):
+        xs = range(size - 1, 0, -1) if y % 2 else range(1, size)
+        cells.extend((x, y) for x in xs)
+    cells.extend((0, y) for y in range(size - 1, 0, -1))
+    return cells
+
+
+def cycle_turns(cells):
+    """Direction to take from each cell to follow the cycle"""
+    turns = {}
+    for (x, y), (nx, ny) in zip(cells, cells[1:] + cells[:1]):
+        turns[(x, y)] = STEP_OF[(nx - x, ny - y)]
+    return turns
+
+
+def engine_with_length(length, grid_size=GRID_SIZE, seed=SEED):
+    """A Classic game whose snake already has ``length`` segments.
+
+    The snake lies along cycle(grid_size), heading the way the cycle goes,
+    so following cycle_turns never collides.
+    """
+    engine = SnakeEngine(grid_size, mode=GameMode.CLASSIC, seed=seed)
+    path = cycle(grid_size)
+    body = [path[-i % len(path)] for i in range(length)]  # head first, walking backwards
+
+    engine.snake = deque(body)
+    engine.cells = bytearray(grid_size * grid_size)
+    engine.free_cells = array('i', range(grid_size * grid_size))
+    engine.free_slots = array('i', range(grid_size * grid_size))
+    for x, y in body:
+        engine.take_free_cell(y * grid_size + x)
+        engine.cells[y * grid_size + x] += 1
+
+    direction = cycle_turns(path)[body[1]]
+    engine.snake_direction = engine.next_direction = direction
+    engine.powerups.clear()
+    engine.powerup_expiry.clear()
+    engine.spawn_food()
+    return engine
+
+
+def ticks_per_second(length, ticks=20000, repeats=5):
+    """Best-of-repeats step() rate for a snake of about ``length``"""
+    turns = cycle_turns(cycle(GRID_SIZE))
+    best = 0
+    for _ in range(repeats):
+        engine = engine_with_length(length)
+        step = engine.step
+        snake = engine.snake
+        start = time.perf_counter()
+        for _ in range(ticks):
+            step(turns[snake[0]])
+        best = max(best, ticks / (time.perf_counter() - start))
+    return best
+
+
+def spawn_latency(fill, calls=20000):
+    """p50 and p99 spawn_food() time in microseconds at a board fill ratio"""
+    engine = engine_with_length(int(fill * GRID_SIZE * GRID_SIZE))
+    spawn = engine.spawn_food
+    clock = time.perf_counter_ns
+    samples = []
+    for _ in range(calls):
+        start = clock()
+        spawn()
+        samples.append(clock() - start)
+    samples.sort()
+    return samples[len(samples) // 2] / 1000, samples[int(len(samples) * 0.99)] / 1000
+
+
+def rewind_ms(length=1000, grid_size=GRID_SIZE, repeats=20):
+    """Worst of repeats snapshot and seek times in ms for a snake of ``length``.
+
+    Snapshots share with the latest one kept, as they do while recording.
+    Each seek lands one tick before a snapshot, so it also replays the
+    most ticks a seek ever has to.
+    """
+    turns = cycle_turns(cycle(grid_size))
+    engine = engine_with_length(length, grid_size)
+    rewind = RewindBuffer()
+    rewind.start(engine)
+    for _ in range(rewind.interval * repeats):
+        engine.step(turns[engine.snake[0]])
+        rewind.record(engine)
+
+    snapshot_ms, seek_ms = 0, 0
+    for i in range(repeats):
+        start = time.perf_counter()
+        Snapshot(engine, rewind.snapshots[-1])
+        snapshot_ms = max(snapshot_ms, (time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        rewind.seek(engine, (i + 1) * rewind.interval - 1)
+        seek_ms = max(seek_ms, (time.perf_counter() - start) * 1000)
+    return snapshot_ms, seek_ms
+
+
+def run():
+    """Every headless benchmark, as metric name -> value"""
+    results = {}
+    for length in TICK_LENGTHS:
+        results[f'ticks_per_s_len{length}'] = round(ticks_per_second(length))
+    for fill in SPAWN_FILLS:
+        p50, p99 = spawn_latency(fill)
+        results[f'spawn_us_p50_fill{round(fill * 100)}'] = round(p50, 3)
+        results[f'spawn_us_p99_fill{round(fill * 100)}'] = round(p99, 3)
+
+    # Greedy Classic games on 20x20 through the delta stream, checked tick by tick
+    ticks, size, encode_time, step_time = stream.check(GameMode.CLASSIC, seed=SEED)
+    results['stream_bytes_per_tick'] = round(size / ticks, 3)
+    results['stream_encode_us'] = round(encode_time / ticks * 1e6, 3)
+
+    # Uncached OBSTACLES levels, generated and checked for sealed pockets
+    results['levels_per_s_grid64'] = round(levels.benchmark(GRID_SIZE))
+
+    snapshot_ms, seek_ms = rewind_ms()
+    results['rewind_snapshot_ms_len1000'] = round(snapshot_ms, 3)
+    results['rewind_seek_ms_len1000'] = round(seek_ms, 3)
+    # The same on the largest board, where anything proportional to its area shows
+    snapshot_ms, seek_ms = rewind_ms(grid_size=1000)
+    results['rewind_snapshot_ms_grid1000'] = round(snapshot_ms, 3)
+    results['rewind_seek_ms_grid1000'] = round(seek_ms, 3)
+    return results
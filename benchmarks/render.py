@@ -0,0 +1,186 @@
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks import startup
+from bots import GreedyBot
+from engine import GameMode
+from inputs import LatencyHistogram
+
+SEED = 1234
+FRAMES = 600
+SCREEN_REPEATS = 20
+PRESSES = 50
+
+
+def open_display():
+    """Tk root on $DISPLAY, else on a private Xvfb when xvfbwrapper is installed.
+
+    Returns (root, xvfb), with root None when there is nowhere to draw.
+    """
+    try:
+        import tkinter as tk
+    except ImportError:
+        return None, None
+    try:
+        return tk.Tk(), None
+    except tk.TclError:
+        pass
+    try:
+        from xvfbwrapper import Xvfb
+    except ImportError:
+        return None, None
+
+    xvfb = Xvfb(width=1280, height=800)
+    try:
+        xvfb.start()
+        return tk.Tk(), xvfb
+    except Exception:
+        xvfb.stop()
+        return None, None
+
+
+def next_item_id(canvas):
+    """Id the canvas will give its next item; differences count creations"""
+    probe = canvas.create_line(0, 0, 0, 0)
+    canvas.delete(probe)
+    return probe + 1
+
+
+def ms(samples_ns, fraction=0.5):
+    samples = sorted(samples_ns)
+    return round(samples[min(len(samples) - 1, int(len(samples) * fraction))] / 1e6, 3)
+
+
+def frame_costs(game, frames=FRAMES):
+    """Time each frame's work over a greedy Zen game, flushing Tk each frame.
+
+    update_sidebar is what a tick costs the sidebar; draw_game's own call
+    to it then finds nothing to do. draw_sidebar, the full rebuild done on
+    a screen change, is timed separately.
+    """
+    root, canvas = game.root, game.canvas
+    clock = time.perf_counter_ns
+    bot = GreedyBot(random.Random(SEED))
+    game.engine.rng.seed(SEED)
+
+    draw_ns, update_ns, sidebar_ns, created = [], [], [], []
+    game.start_game(GameMode.ZEN)
+    game.stop_loop()
+    root.update()
+    for _ in range(frames):
+        direction = bot.choose(game.engine)
+        if direction:
+            game.engine.turn(direction)
+        if not game.tick():
+            game.start_game(GameMode.ZEN)
+            game.stop_loop()
+            continue
+
+        start = clock()
+        game.update_sidebar()
+        root.update_idletasks()
+        update_ns.append(clock() - start)
+
+        first_id = next_item_id(canvas)
+        start = clock()
+        game.draw_game()
+        root.update_idletasks()
+        draw_ns.append(clock() - start)
+        created.append(next_item_id(canvas) - first_id - 1)
+
+        start = clock()
+        canvas.delete("sidebar")
+        game.draw_sidebar()
+        root.update_idletasks()
+        sidebar_ns.append(clock() - start)
+
+    return {
+        'draw_game_ms_p50': ms(draw_ns),
+        'draw_game_ms_p95': ms(draw_ns, 0.95),
+        'update_sidebar_ms_p50': ms(update_ns),
+        'update_sidebar_ms_p95': ms(update_ns, 0.95),
+        'draw_sidebar_ms_p50': ms(sidebar_ns),
+        'draw_sidebar_ms_p95': ms(sidebar_ns, 0.95),
+        'draw_game_items_created_mean': round(statistics.fmean(created), 2),
+        'game_canvas_items': len(canvas.find_all()),
+    }
+
+
+def screen_cost(game, show):
+    """Median build time of a screen and how many items it leaves on the canvas"""
+    samples = []
+    for _ in range(SCREEN_REPEATS):
+        start = time.perf_counter_ns()
+        show()
+        game.root.update_idletasks()
+        samples.append(time.perf_counter_ns() - start)
+    return ms(samples), len(game.canvas.find_all())
+
+
+def input_latency(game, low_latency, presses=PRESSES):
+    """Keypress-to-screen p50/p95 for turns pressed at random points of the tick interval"""
+    root = game.root
+    rng = random.Random(SEED)
+    clock = time.perf_counter
+    game.low_latency = low_latency
+    game.latency = LatencyHistogram(bucket_ms=5, buckets=60)
+    game.start_game(GameMode.ZEN)
+
+    for _ in range(presses):
+        wake = clock() + rng.uniform(0, game.engine.game_speed / 1000)
+        while clock() < wake:
+            root.update()
+        heading = game.engine.snake_direction
+        game.queue_direction("Up" if heading in ("Left", "Right") else "Left")
+
+        # Pump the event loop until the turn is on screen
+        seen, give_up = game.latency.count, clock() + 1
+        while game.latency.count == seen and game.running and clock() < give_up:
+            root.update()
+        if not game.running:
+            game.start_game(GameMode.ZEN)
+
+    game.stop_loop()
+    return game.latency.percentile(0.5), game.latency.percentile(0.95)
+
+
+def run():
+    """Every rendering benchmark, or None when no display can be opened"""
+    root, xvfb = open_display()
+    if root is None:
+        return None
+
+    from snake import SnakeGame
+
+    cwd = os.getcwd()
+    try:
+        # The game writes its score database and replay to the working directory
+        with tempfile.TemporaryDirectory() as scratch:
+            os.chdir(scratch)
+            game = SnakeGame(root)
+            results = frame_costs(game)
+            results['menu_build_ms'], results['menu_items'] = screen_cost(game, game.show_menu)
+            results['game_over_build_ms'], results['game_over_items'] = screen_cost(game, game.show_game_over)
+            results.update(startup.menu())
+            results['input_latency_ms_p50'], results['input_latency_ms_p95'] = input_latency(game, False)
+            (results['input_latency_low_latency_ms_p50'],
+             results['input_latency_low_latency_ms_p95']) = input_latency(game, True)
+            if game.scores:
+                game.scores.close()
+            game.main_frame.destroy()
+
+            # Same view on a 1000x1000 board: cost should track the view, not the board
+            game = SnakeGame(root, grid_size=1000)
+            for name, value in frame_costs(game).items():
+                results[f'{name}_grid1000'] = value
+            if game.scores:
+                game.scores.close()
+    finally:
+        os.chdir(cwd)
+        root.destroy()
+        if xvfb:
+            xvfb.stop()
+    return results
@@ -0,0 +1,78 @@
+import asyncio
+import random
+import socket
+import statistics
+import time
+
+from bots import GreedyBot
+from engine import GameMode
+from server import Client, GameServer
+
+SEED = 1234
+ROOMS = 2000
+PASSES = 30
+PERIOD_MS = 100  # 10 Hz
+
+
+def stop_timers(server):
+    """Only the timed passes should tick, not the groups' own loops"""
+    for group in server.groups.values():
+        if group.task:
+            group.task.cancel()
+
+
+async def measure(rooms=ROOMS, passes=PASSES, delta=False):
+    """Cost of a batched tick pass per room, each room with one socket client.
+
+    The clients take JSON lines, or the binary delta stream with delta set.
+
+    Greedy bots steer through the same turn queue clients use; their
+    moves, restarts and draining the client sockets are left out of the
+    timing.
+    """
+    server = GameServer()
+    peers, bots = [], []
+    for i in range(rooms):
+        ours, theirs = socket.socketpair()
+        theirs.setblocking(False)
+        reader, writer = await asyncio.open_unix_connection(sock=ours)
+        server.join(Client(reader, writer), f"room{i}", GameMode.CLASSIC, seed=SEED + i, delta=delta)
+        peers.append(theirs)
+        bots.append(GreedyBot(random.Random(SEED + i)))
+
+    per_room_us = []
+    for _ in range(passes):
+        for room, bot in zip(server.rooms.values(), bots):
+            if room.engine.done:
+                server.restart(room)
+            direction = bot.choose(room.engine)
+            if direction:
+                room.inputs.push(direction, room.engine.snake_direction, 0)
+        stop_timers(server)
+
+        start = time.perf_counter()
+        for group in list(server.groups.values()):
+            group.tick()
+        per_room_us.append((time.perf_counter() - start) * 1e6 / rooms)
+        stop_timers(server)
+
+        await asyncio.sleep(0)
+        for peer in peers:
+            try:
+                while peer.recv(65536):
+                    pass
+            except BlockingIOError:
+                pass
+
+    for peer in peers:
+        peer.close()
+    return statistics.median(per_room_us)
+
+
+def run():
+    results = {}
+    for delta, suffix in ((False, ''), (True, '_delta')):
+        per_room_us = asyncio.run(measure(delta=delta))
+        results[f'server_pass_us_per_room{suffix}'] = round(per_room_us, 2)
+        results[f'server_rooms_at_10hz{suffix}'] = int(PERIOD_MS * 1000 / per_room_us)
+    return results
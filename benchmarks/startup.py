@@ -0,0 +1,71 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 5
+
+# Cold start budgets in ms; python -m benchmarks fails when a median is over
+BUDGETS = {
+    'headless_cold_start_ms': 50,
+    'menu_cold_start_ms': 500,
+}
+
+# Each script runs in a fresh interpreter and prints its timings as JSON
+HEADLESS = """
+import json, sys, time
+start = time.perf_counter()
+from engine import GameMode, SnakeEngine
+engine = SnakeEngine(20, mode=GameMode.CLASSIC, seed=1)
+engine.step()
+print(json.dumps({'ms': (time.perf_counter() - start) * 1000, 'tkinter': 'tkinter' in sys.modules}))
+"""
+
+MENU = """
+import json, time
+start = time.perf_counter()
+import tkinter as tk
+from snake import SnakeGame
+root = tk.Tk()
+game = SnakeGame(root)
+root.update()
+print(json.dumps({'ms': (time.perf_counter() - start) * 1000}))
+root.destroy()
+"""
+
+
+def cold_start(script):
+    """Median of RUNS fresh interpreters running script, plus the last run's output"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    samples, output = [], None
+    with tempfile.TemporaryDirectory() as scratch:
+        for _ in range(RUNS):
+            result = subprocess.run([sys.executable, "-c", script], cwd=scratch, env=env,
+                                    capture_output=True, text=True, check=True)
+            output = json.loads(result.stdout)
+            samples.append(output['ms'])
+    return round(statistics.median(samples), 2), output
+
+
+def headless():
+    """Import to first engine tick; the headless path must not load tkinter"""
+    ms, output = cold_start(HEADLESS)
+    return {'headless_cold_start_ms': ms, 'headless_imports_tkinter': int(output['tkinter'])}
+
+
+def menu():
+    """Import to first painted menu frame, on the display render.py opened"""
+    ms, _ = cold_start(MENU)
+    return {'menu_cold_start_ms': ms}
+
+
+def over_budget(results):
+    """Metrics whose value exceeds their budget, as name -> (value, budget)"""
+    over = {name: (results[name], budget) for name, budget in BUDGETS.items()
+            if name in results and results[name] > budget}
+    if results.get('headless_imports_tkinter'):
+        over['headless_imports_tkinter'] = (1, 0)
+    return over
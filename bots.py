@@ -0,0 +1,338 @@
+import random
+import time
+from array import array
+from collections import deque
+
+from engine import DIRECTIONS, OBSTACLE, OPPOSITES, GameMode, PowerUpType
+from hamilton import CACHE_DIR, cycle_for
+
+
+def next_cell(engine, direction):
+    """Where the head would land moving in direction"""
+    dx, dy = DIRECTIONS[direction]
+    x, y = engine.snake[0]
+    x += dx
+    y += dy
+    if engine.game_mode == GameMode.ZEN:
+        x %= engine.GRID_SIZE
+        y %= engine.GRID_SIZE
+    return x, y
+
+
+def is_deadly(engine, cell):
+    """Would moving the head onto cell end the game"""
+    if engine.active_powerup == PowerUpType.INVINCIBLE:
+        return False
+    x, y = cell
+    size = engine.GRID_SIZE
+    if not (0 <= x < size and 0 <= y < size):
+        return True
+    return engine.cells[y * size + x] != 0
+
+
+def legal_moves(engine):
+    """Directions that are not a reversal"""
+    reverse = OPPOSITES[engine.snake_direction]
+    return [d for d in DIRECTIONS if d != reverse]
+
+
+class RandomBot:
+    """Turns at random, never straight into something deadly if it can help it"""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def choose(self, engine):
+        moves = legal_moves(engine)
+        safe = [d for d in moves if not is_deadly(engine, next_cell(engine, d))]
+        return self.rng.choice(safe or moves)
+
+
+class GreedyBot:
+    """Heads straight for the food, avoiding moves that die next tick"""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def distance(self, engine, cell):
+        fx, fy = engine.food
+        dx, dy = abs(cell[0] - fx), abs(cell[1] - fy)
+        if engine.game_mode == GameMode.ZEN:
+            dx = min(dx, engine.GRID_SIZE - dx)
+            dy = min(dy, engine.GRID_SIZE - dy)
+        return dx + dy
+
+    def choose(self, engine):
+        best, best_distance = [], None
+        for direction in legal_moves(engine):
+            cell = next_cell(engine, direction)
+            if is_deadly(engine, cell):
+                continue
+            distance = self.distance(engine, cell) if engine.food else 0
+            if best_distance is None or distance < best_distance:
+                best, best_distance = [direction], distance
+            elif distance == best_distance:
+                best.append(direction)
+        if not best:
+            return None
+        return self.rng.choice(best)
+
+
+class Autopilot:
+    """Steers to the food along a BFS distance field, chasing its tail when boxed in.
+
+    The field holds every cell's distance to the food around walls and
+    obstacles, ignoring the snake. It depends only on the board and the food,
+    so it is built once per food position, a slice per tick, and reused until
+    the food moves; cells it has not reached yet use the straight-line
+    distance. A move is only taken if the tail can still be reached from the
+    new head (the tail always moves away, so that keeps a way out). If the
+    food-ward move fails that check the snake follows its tail instead.
+
+    Each choose() stays within budget_ms: half for growing the field, the
+    rest for the tail checks, a check cut short by the budget counting as
+    safe.
+    """
+
+    def __init__(self, rng=None, budget_ms=5):
+        self.rng = rng if rng is not None else random.Random()
+        self.budget_ns = int(budget_ms * 1e6)
+        self.field = None
+        self.field_key = None
+        self.frontier = deque()
+
+    def start_field(self, engine, key):
+        """Begin a new distance field from the food"""
+        size = engine.GRID_SIZE
+        fx, fy = engine.food
+        self.field = array('i', [-1]) * (size * size)
+        self.field[fy * size + fx] = 0
+        self.frontier = deque([fy * size + fx])
+        self.field_key = key
+
+    def neighbors(self, engine, index):
+        """Cells next to a cell, wrapping in Zen mode"""
+        size = engine.GRID_SIZE
+        x, y = index % size, index // size
+        if engine.game_mode == GameMode.ZEN:
+            return ((y * size + (x + 1) % size), (y * size + (x - 1) % size),
+                    ((y + 1) % size * size + x), ((y - 1) % size * size + x))
+        cells = []
+        if x + 1 < size:
+            cells.append(index + 1)
+        if x > 0:
+            cells.append(index - 1)
+        if y + 1 < size:
+            cells.append(index + size)
+        if y > 0:
+            cells.append(index - size)
+        return cells
+
+    def grow_field(self, engine, deadline):
+        """Extend the distance field breadth-first until done or out of time"""
+        field, frontier, cells = self.field, self.frontier, engine.cells
+        clock = time.perf_counter_ns
+        expanded = 0
+        while frontier:
+            expanded += 1
+            if not expanded & 255 and clock() > deadline:
+                return
+            index = frontier.popleft()
+            distance = field[index] + 1
+            for neighbor in self.neighbors(engine, index):
+                if field[neighbor] < 0 and not cells[neighbor] & OBSTACLE:
+                    field[neighbor] = distance
+                    frontier.append(neighbor)
+
+    def distance(self, engine, index, target):
+        """Straight-line grid distance between two cells"""
+        size = engine.GRID_SIZE
+        dx = abs(index % size - target % size)
+        dy = abs(index // size - target // size)
+        if engine.game_mode == GameMode.ZEN:
+            dx = min(dx, size - dx)
+            dy = min(dy, size - dy)
+        return dx + dy
+
+    def food_distance(self, engine, index):
+        """Distance to the food along the field, or a lower bound while it grows"""
+        distance = self.field[index]
+        if distance >= 0:
+            return distance
+        fx, fy = engine.food
+        return self.distance(engine, index, fy * engine.GRID_SIZE + fx)
+
+    def room(self, engine, start, deadline):
+        """Flood empty cells from start; (tail reached, cells found)
+
+        Stops early once the tail is touched, there is room for the whole
+        snake, or time runs out (reported as reaching the tail).
+        """
+        size = engine.GRID_SIZE
+        tail_x, tail_y = engine.snake[-1]
+        tail = tail_y * size + tail_x
+        need = len(engine.snake)
+        cells = engine.cells
+        clock = time.perf_counter_ns
+
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            if not len(seen) & 63 and clock() > deadline:
+                return True, len(seen)
+            for neighbor in self.neighbors(engine, queue.popleft()):
+                if neighbor == tail:
+                    return True, len(seen)
+                if neighbor in seen or cells[neighbor]:
+                    continue
+                seen.add(neighbor)
+                if len(seen) >= need:
+                    return True, len(seen)
+                queue.append(neighbor)
+        return False, len(seen)
+
+    def choose(self, engine):
+        start = time.perf_counter_ns()
+        size = engine.GRID_SIZE
+
+        # Moves that stay on the board and do not die next tick
+        candidates = []
+        for direction in legal_moves(engine):
+            x, y = next_cell(engine, direction)
+            if 0 <= x < size and 0 <= y < size and not is_deadly(engine, (x, y)):
+                candidates.append((direction, y * size + x))
+        if not candidates:
+            return None
+        self.rng.shuffle(candidates)
+
+        deadline = start + self.budget_ns
+        if engine.food is not None:
+            key = (engine.seed, engine.game_mode, engine.food)
+            if key != self.field_key:
+                self.start_field(engine, key)
+
+            # Cells nearer the food than the head were reached before it
+            head_x, head_y = engine.snake[0]
+            if self.field[head_y * size + head_x] < 0:
+                self.grow_field(engine, start + self.budget_ns // 2)
+
+            direction, index = min(candidates, key=lambda c: self.food_distance(engine, c[1]))
+            if self.room(engine, index, deadline)[0]:
+                return direction
+
+        # Survival: follow the tail, or failing that head for the most room
+        tail_x, tail_y = engine.snake[-1]
+        tail = tail_y * size + tail_x
+        candidates.sort(key=lambda c: self.distance(engine, c[1], tail))
+        best, best_room = None, -1
+        for direction, index in candidates:
+            reached, found = self.room(engine, index, deadline)
+            if reached:
+                return direction
+            if found > best_room:
+                best, best_room = direction, found
+        return best
+
+
+class CycleBot:
+    """Follows a Hamiltonian cycle over the board, cutting corners toward food.
+
+    Once the whole body lies on the cycle in order, the stretch of cycle
+    from the head forward to the tail is empty, so the snake may jump ahead
+    to any neighbouring cycle cell that does not pass the food and still
+    leaves SHORTCUT_MARGIN cells before the tail. Shortcuts stop once the
+    snake covers half the board, after which it just follows the cycle and
+    fills it. Each tick is O(1): a few lookups in the cycle's index arrays.
+
+    Food on a cell the cycle misses (beside obstacles) is fetched with the
+    autopilot; the body is then out of order until it has moved a full
+    length along the cycle again. Until then there are no shortcuts and
+    each cycle step must pass the autopilot's room check.
+    """
+
+    SHORTCUT_MARGIN = 3
+
+    # Modes worth playing: obstacles leave cells off the cycle, and Time
+    # Attack's clock runs out long before a cycle fills the board
+    MODES = (GameMode.CLASSIC, GameMode.SPEED, GameMode.ZEN)
+
+    def __init__(self, rng=None, cache_dir=CACHE_DIR):
+        self.rng = rng if rng is not None else random.Random()
+        self.cache_dir = cache_dir
+        self.autopilot = Autopilot(self.rng)
+        self.game = None
+        self.cycle = None
+
+    def start(self, engine):
+        """Load the cycle for a new game's board"""
+        self.game = (engine.seed, engine.game_mode)
+        self.cycle = cycle_for(engine, self.cache_dir)
+        self.unordered = len(engine.snake)  # moves along the cycle until the body is in order
+        self.length = len(engine.snake)
+
+    def choose(self, engine):
+        if (engine.seed, engine.game_mode) != self.game:
+            self.start(engine)
+        cycle = self.cycle
+        size = engine.GRID_SIZE
+        order, pos, count = cycle.order, cycle.pos, len(cycle)
+
+        # A tick without growth moved the tail one segment further along
+        if len(engine.snake) == self.length and self.unordered:
+            self.unordered -= 1
+        self.length = len(engine.snake)
+
+        head_x, head_y = engine.snake[0]
+        head = pos[head_y * size + head_x] if 0 <= head_x < size and 0 <= head_y < size else -1
+        food = engine.food
+        food_pos = pos[food[1] * size + food[0]] if food else -1
+
+        if head < 0 or (food and food_pos < 0):
+            # Off the cycle, or the food is: let the autopilot get there
+            self.unordered = len(engine.snake)
+            return self.autopilot.choose(engine)
+
+        moves = {}
+        for direction in legal_moves(engine):
+            x, y = next_cell(engine, direction)
+            if 0 <= x < size and 0 <= y < size and not is_deadly(engine, (x, y)):
+                moves[y * size + x] = direction
+
+        step = order[(head + 1) % count]
+        if self.unordered:
+            # Stray segments may lie ahead on the cycle, so check for room
+            deadline = time.perf_counter_ns() + self.autopilot.budget_ns
+            if step in moves and self.autopilot.room(engine, step, deadline)[0]:
+                return moves[step]
+            self.unordered = len(engine.snake)
+            return self.autopilot.choose(engine)
+        if food is None or 2 * len(engine.snake) > count:
+            if step in moves:
+                return moves[step]
+            self.unordered = len(engine.snake)
+            return self.autopilot.choose(engine)
+
+        # Jump as far along the cycle as is safe, but not past the food
+        tail_x, tail_y = engine.snake[-1]
+        room = (pos[tail_y * size + tail_x] - head) % count
+        reach = min((food_pos - head) % count, room - self.SHORTCUT_MARGIN)
+        best, best_jump = None, 0
+        for index, direction in moves.items():
+            jump = (pos[index] - head) % count
+            if pos[index] >= 0 and best_jump < jump <= reach:
+                best, best_jump = direction, jump
+        if best is not None:
+            return best
+        if step in moves:
+            return moves[step]
+        self.unordered = len(engine.snake)
+        return self.autopilot.choose(engine)
+
+
+# Bot name -> class taking an RNG, with choose(engine) returning a direction
+BOTS = {
+    "random": RandomBot,
+    "greedy": GreedyBot,
+    "autopilot": Autopilot,
+    "cycle": CycleBot,
+}
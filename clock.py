@@ -0,0 +1,115 @@
+import math
+import statistics
+import time
+from collections import deque
+
+FRAME_MS = 1000 / 60  # one display frame
+MAX_CATCHUP = 4  # ticks run back to back before the backlog is dropped
+EARLY_FRACTION = 0.5  # share of a period after which a turn may tick early
+
+
+class TickClock:
+    """Fixed-timestep accumulator on a monotonic clock.
+
+    The game loop calls advance() when it wakes, then runs one tick for
+    every due(period_ms) that returns True. Time spent simulating and drawing
+    stays in the accumulator, so the tick rate does not drift with draw cost;
+    a loop that falls more than MAX_CATCHUP ticks behind drops the backlog
+    instead of fast-forwarding. The period is read on every call, so speed
+    changes from modes and powerups apply from the next tick.
+
+    The last ``window`` ticks are kept for stats(): effective ticks per
+    second and how late each tick ran relative to its ideal time.
+    """
+
+    def __init__(self, timer=time.perf_counter, window=240):
+        self.timer = timer
+        self.tick_times = deque(maxlen=window)
+        self.lateness = deque(maxlen=window)  # seconds past the ideal tick time
+        self.periods = deque(maxlen=window)
+        self.start()
+
+    def start(self):
+        """Begin timing from now with nothing due, e.g. on start or resume"""
+        self.last = self.timer()
+        self.accumulator = 0.0
+        self.catchup = 0
+        self.dropped = 0
+        self.last_render = -math.inf
+        self.tick_times.clear()
+        self.lateness.clear()
+        self.periods.clear()
+
+    def advance(self):
+        """Add the time since the last call to the accumulator"""
+        now = self.timer()
+        self.accumulator += now - self.last
+        self.last = now
+        self.catchup = 0
+
+    def due(self, period_ms):
+        """Consume one tick of period_ms if it is due"""
+        period = period_ms / 1000
+        if self.accumulator < period:
+            return False
+        if self.catchup >= MAX_CATCHUP:
+            self.dropped += int(self.accumulator // period)
+            self.accumulator %= period
+            return False
+
+        self.lateness.append(self.accumulator - period)
+        self.accumulator -= period
+        self.catchup += 1
+        self.tick_times.append(self.last)
+        self.periods.append(period)
+        return True
+
+    def early(self, period_ms, fraction=EARLY_FRACTION):
+        """Take the next tick of period_ms now if fraction of it has passed.
+
+        For low-latency input: the rest of the period is skipped, not
+        carried, so the following tick is a full period later and one
+        interval shrinks to no less than fraction of a period.
+        """
+        self.advance()
+        period = period_ms / 1000
+        if self.accumulator < period * fraction:
+            return False
+
+        self.lateness.append(self.accumulator - period)
+        self.accumulator = max(0.0, self.accumulator - period)
+        self.tick_times.append(self.last)
+        self.periods.append(period)
+        return True
+
+    def wait_ms(self, period_ms):
+        """Whole milliseconds until the next tick of period_ms is due"""
+        elapsed = self.accumulator + self.timer() - self.last
+        return max(1, math.ceil(period_ms - elapsed * 1000))
+
+    def frame_ready(self):
+        """True if a display frame has passed since the last render"""
+        return (self.timer() - self.last_render) * 1000 >= FRAME_MS
+
+    def frame_wait_ms(self):
+        """Whole milliseconds until the next render is allowed"""
+        return max(1, math.ceil(FRAME_MS - (self.timer() - self.last_render) * 1000))
+
+    def rendered(self):
+        """Note that a frame was just drawn"""
+        self.last_render = self.timer()
+
+    def stats(self):
+        """Effective tick rate and timer jitter over the recent window"""
+        times = self.tick_times
+        if len(times) < 2 or times[-1] == times[0]:
+            return None
+        lateness_ms = [late * 1000 for late in self.lateness]
+        return {
+            'ticks_per_second': (len(times) - 1) / (times[-1] - times[0]),
+            'target_ticks_per_second': len(self.periods) / sum(self.periods),
+            'jitter_ms': statistics.pstdev(lateness_ms),
+            'late_mean_ms': statistics.fmean(lateness_ms),
+            'late_max_ms': max(lateness_ms),
+            'dropped': self.dropped,
+        }
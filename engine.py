@@ -0,0 +1,419 @@
+import random
+from array import array
+from collections import deque
+from datetime import datetime
+from enum import Enum
+
+from levels import DEFAULT_DIFFICULTY, POOL_SIZE, level_for
+from scheduler import EventScheduler
+
+
+class GameMode(Enum):
+    CLASSIC = "Classic"
+    SPEED = "Speed Mode"
+    OBSTACLES = "Obstacles"
+    TIME_ATTACK = "Time Attack"
+    ZEN = "Zen Mode"
+
+
+class PowerUpType(Enum):
+    SPEED_BOOST = "speed_boost"
+    SLOW_DOWN = "slow_down"
+    SCORE_MULTIPLIER = "score_multiplier"
+    INVINCIBLE = "invincible"
+
+
+DIRECTIONS = {
+    "Up": (0, -1),
+    "Down": (0, 1),
+    "Left": (-1, 0),
+    "Right": (1, 0),
+}
+OPPOSITES = {"Up": "Down", "Down": "Up", "Left": "Right", "Right": "Left"}
+
+TIME_ATTACK_SECONDS = 120
+POWERUP_DURATION = 100  # ticks an effect lasts, counting the pickup tick
+POWERUP_LIFETIME = 100  # ticks a powerup stays on the board uneaten
+MAX_GAME_SPEED = 300  # slowest tick interval in ms, bounds how soon Time Attack can end
+
+# Occupancy grid cell values: the low bits count snake segments on the cell
+# (an invincible snake can overlap itself), OBSTACLE marks a wall block
+OBSTACLE = 0x80
+
+
+class SnakeEngine:
+    """Headless snake game rules with an explicit step() API.
+
+    The engine knows nothing about Tk. Time advances by the tick interval
+    (game_speed) on every step, so Time Attack runs on simulated time unless
+    a wall clock is passed in as ``clock`` (a callable returning seconds).
+
+    Everything timed (powerups expiring, effects wearing off, Time Attack
+    running out) is an event in ``self.timers``, fired on its tick.
+
+    All gameplay randomness comes from ``self.rng``, reseeded with the
+    game's seed on every reset, so a seed, a mode and the direction taken on
+    each tick reproduce a game exactly (see replay.py).
+    """
+
+    def __init__(self, grid_size=20, rng=None, clock=None, mode=GameMode.CLASSIC, seed=None):
+        self.GRID_SIZE = grid_size
+        self.rng = rng if rng is not None else random.Random()
+        self.clock = clock
+        self.difficulty = DEFAULT_DIFFICULTY  # of OBSTACLES levels, see levels.py
+        self.timers = EventScheduler()
+
+        # Things that happened during the last step, e.g. ("food", pos),
+        # for the renderer to turn into effects
+        self.events = []
+
+        self.reset(mode, seed)
+
+    def reset(self, mode, seed=None):
+        """Start a new game with the selected mode, seeded if given"""
+        if seed is None:
+            seed = self.rng.getrandbits(63)
+        self.seed = seed
+        self.rng.seed(seed)
+
+        self.game_mode = mode
+        self.running = True
+        self.done = False
+        self.won = False
+        self.score = 0
+        self.moves_count = 0
+        self.food_eaten = 0
+        self.score_multiplier = 1
+        self.food = None
+        self.obstacles = []
+        self.powerups = {}  # position -> PowerUpType
+        self.powerup_expiry = {}  # position -> tick the powerup there expires on
+        self.active_powerup = None
+        self.powerup_ends = 0  # tick the active effect wears off on
+        self.elapsed_ms = 0  # game time of the latest tick
+        self.events.clear()
+        self.timers.clear()
+
+        # Initialize snake in the center
+        center_x = self.GRID_SIZE // 2
+        center_y = self.GRID_SIZE // 2
+        self.snake = deque([(center_x, center_y), (center_x - 1, center_y), (center_x - 2, center_y)])
+
+        # One byte per cell, updated as the head moves and the tail pops so
+        # collision checks never scan the body
+        self.cells = bytearray(self.GRID_SIZE * self.GRID_SIZE)
+
+        # Every empty cell index, in no particular order, plus each cell's
+        # slot in that array (-1 when occupied) so a cell can be swap-removed
+        # and a uniformly random empty cell picked in O(1)
+        self.free_cells = array('i', range(self.GRID_SIZE * self.GRID_SIZE))
+        self.free_slots = self.free_cells[:]
+
+        for x, y in self.snake:
+            self.take_free_cell(y * self.GRID_SIZE + x)
+            self.cells[y * self.GRID_SIZE + x] += 1
+        self.snake_direction = "Right"
+        self.next_direction = "Right"
+
+        # Set game speed based on mode
+        if mode == GameMode.SPEED:
+            self.base_speed = 150
+        elif mode == GameMode.ZEN:
+            self.base_speed = 120
+        else:
+            self.base_speed = 100
+        self.game_speed = self.base_speed
+
+        # Time attack mode
+        self.start_time = 0
+        if mode == GameMode.TIME_ATTACK:
+            self.start_time = self.now()
+            self.schedule_time_check()
+
+        # Generate obstacles for obstacles mode
+        if mode == GameMode.OBSTACLES:
+            self.generate_obstacles()
+
+        self.spawn_food()
+        return self
+
+    def now(self):
+        """Current game time in seconds"""
+        if self.clock is not None:
+            return self.clock()
+        return self.elapsed_ms / 1000
+
+    @property
+    def time_remaining(self):
+        """Whole seconds left in Time Attack as of the latest tick, 0 in other modes"""
+        if self.game_mode != GameMode.TIME_ATTACK:
+            return 0
+        return max(0, TIME_ATTACK_SECONDS - int(self.now() - self.start_time))
+
+    @property
+    def powerup_timer(self):
+        """Ticks left on the active effect, 0 when there is none"""
+        return self.powerup_ends - self.moves_count if self.active_powerup else 0
+
+    def schedule_time_check(self):
+        """Check for Time Attack's end on the first tick that could reach it.
+
+        No tick takes longer than MAX_GAME_SPEED of simulated time, so the
+        check can wait until that many ms per tick would use up the time
+        left; it then looks again, closer each time. A wall clock can run
+        ahead of the ticks, so with one every tick is checked.
+        """
+        if self.clock is not None:
+            ticks = 1
+        else:
+            remaining_ms = TIME_ATTACK_SECONDS * 1000 - (self.elapsed_ms - int(self.start_time * 1000))
+            ticks = max(1, -(-remaining_ms // MAX_GAME_SPEED))
+        self.timers.schedule(self.moves_count + ticks, "time_check")
+
+    def take_free_cell(self, index):
+        """Remove a cell from the free-cell index"""
+        free, slots = self.free_cells, self.free_slots
+        slot = slots[index]
+        last = free.pop()
+        if last != index:
+            free[slot] = last
+            slots[last] = slot
+        slots[index] = -1
+
+    def release_free_cell(self, index):
+        """Put a cell back into the free-cell index"""
+        self.free_slots[index] = len(self.free_cells)
+        self.free_cells.append(index)
+
+    def generate_obstacles(self):
+        """Lay out one of the pooled levels for obstacles mode"""
+        self.obstacles = []
+        size = self.GRID_SIZE
+        level = self.rng.randrange(POOL_SIZE)
+        for index in level_for(level, size, self.difficulty):
+            self.obstacles.append((index % size, index // size))
+            self.take_free_cell(index)
+            self.cells[index] = OBSTACLE
+
+    def random_free_cell(self, exclude=()):
+        """Pick a uniformly random empty cell not in exclude, or None"""
+        free = self.free_cells
+        size = self.GRID_SIZE
+
+        # exclude is tiny (the food and a couple of powerups); only the ones
+        # sitting on free cells matter
+        exclude = {pos for pos in exclude
+                   if pos and self.free_slots[pos[1] * size + pos[0]] >= 0}
+        if len(free) <= 2 * len(exclude):
+            # Nearly full board, filter instead of rejection sampling
+            free = [i for i in free if (i % size, i // size) not in exclude]
+            exclude = ()
+        if not free:
+            return None
+
+        while True:
+            index = free[self.rng.randrange(len(free))]
+            pos = (index % size, index // size)
+            if pos not in exclude:
+                return pos
+
+    def occupied_in(self, x0, y0, x1, y1):
+        """Yield (index, cell value) for every non-empty cell in [x0, x1) x [y0, y1)
+
+        Scans the occupancy grid a row slice at a time, so the cost depends
+        on the rectangle's area, not on the board size or snake length.
+        """
+        size = self.GRID_SIZE
+        cells = self.cells
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(size, x1), min(size, y1)
+        for y in range(y0, y1):
+            start = y * size + x0
+            row = cells[start:y * size + x1]
+            if row.count(0) == len(row):
+                continue
+            for offset, value in enumerate(row):
+                if value:
+                    yield start + offset, value
+
+    def powerups_in(self, x0, y0, x1, y1):
+        """Powerups inside [x0, x1) x [y0, y1), as position -> PowerUpType"""
+        return {pos: powerup_type for pos, powerup_type in self.powerups.items()
+                if x0 <= pos[0] < x1 and y0 <= pos[1] < y1}
+
+    def spawn_food(self):
+        """Spawn food at a random location, or None once the board is full"""
+        self.food = self.random_free_cell()
+        if self.food is None:
+            return
+
+        # Occasionally spawn powerups
+        if self.rng.random() < 0.15 and len(self.powerups) < 2:
+            self.spawn_powerup()
+
+    def spawn_powerup(self):
+        """Spawn a random powerup"""
+        pos = self.random_free_cell((self.food, *self.powerups))
+        if pos is not None:
+            powerup_type = self.rng.choice(list(PowerUpType))
+            self.powerups[pos] = powerup_type
+            expires = self.moves_count + POWERUP_LIFETIME
+            self.powerup_expiry[pos] = expires
+            self.timers.schedule(expires, "powerup_expired", pos)
+
+    def turn(self, direction):
+        """Queue the next direction change, ignoring reversals"""
+        if direction != OPPOSITES.get(self.snake_direction):
+            self.next_direction = direction
+
+    def step(self, action=None):
+        """Advance the game by one tick.
+
+        ``action`` is an optional direction name applied like a keypress
+        before the move. Returns ``(state, reward, done)`` where the state is
+        the engine itself and the reward is the score gained this tick.
+        """
+        if self.done:
+            return self, 0, True
+        if action is not None:
+            self.turn(action)
+
+        events = self.events
+        events.clear()
+        score_before = self.score
+
+        # Update direction; this tick comes game_speed ms after the last one
+        self.snake_direction = self.next_direction
+        self.moves_count += 1
+        self.elapsed_ms += self.game_speed
+
+        # Calculate new head position
+        dx, dy = DIRECTIONS[self.snake_direction]
+        head_x, head_y = self.snake[0]
+        head_x += dx
+        head_y += dy
+
+        # Zen mode - wrap around edges
+        size = self.GRID_SIZE
+        if self.game_mode == GameMode.ZEN:
+            head_x = head_x % size
+            head_y = head_y % size
+
+        new_head = (head_x, head_y)
+
+        # An invincible snake may leave the board; cells off the board are
+        # simply not tracked in the occupancy grid
+        cells = self.cells
+        on_board = 0 <= head_x < size and 0 <= head_y < size
+
+        # Check collisions (walls, self and obstacles)
+        if self.active_powerup != PowerUpType.INVINCIBLE:
+            if not on_board or cells[head_y * size + head_x]:
+                return self.end_game()
+
+        # Move snake
+        snake = self.snake
+        snake.appendleft(new_head)
+        if on_board:
+            index = head_y * size + head_x
+            if not cells[index]:
+                self.take_free_cell(index)
+            cells[index] += 1
+
+        # Check food collision
+        if new_head == self.food:
+            self.food_eaten += 1
+            self.score += 10 * self.score_multiplier
+            self.spawn_food()
+            events.append(("food", new_head))
+
+            # Nowhere left to put food: the snake filled the board
+            if self.food is None:
+                self.won = True
+                return self.end_game(self.score - score_before)
+
+            # Speed mode - increase speed
+            if self.game_mode == GameMode.SPEED:
+                self.game_speed = max(50, self.game_speed - 3)
+        else:
+            tail_x, tail_y = snake.pop()
+            if 0 <= tail_x < size and 0 <= tail_y < size:
+                index = tail_y * size + tail_x
+                cells[index] -= 1
+                if not cells[index]:
+                    self.release_free_cell(index)
+
+        # Check powerup collision
+        powerup_type = self.powerups.pop(new_head, None)
+        if powerup_type is not None:
+            del self.powerup_expiry[new_head]
+            self.activate_powerup(powerup_type)
+            events.append(("powerup", new_head))
+
+        # Fire timed events due this tick
+        timers = self.timers
+        if timers.heap and timers.heap[0][0] <= self.moves_count:
+            for tick, kind, data in timers.due(self.moves_count):
+                if self.fire(tick, kind, data):
+                    return self.end_game(self.score - score_before)
+
+        return self, self.score - score_before, False
+
+    def fire(self, tick, kind, data):
+        """Handle one timed event; True if it ends the game"""
+        if kind == "powerup_expired":
+            # Ignore powerups eaten since, or a newer one on the same cell
+            if self.powerup_expiry.get(data) == tick:
+                del self.powerup_expiry[data]
+                self.powerups.pop(data, None)
+        elif kind == "effect_ended":
+            # Ignore effects renewed by a later pickup
+            if self.active_powerup and self.powerup_ends == tick:
+                self.deactivate_powerup()
+        elif kind == "time_check":
+            if self.time_remaining <= 0:
+                return True
+            self.schedule_time_check()
+        return False
+
+    def score_data(self):
+        """Stats for the high score table"""
+        return {
+            'score': self.score,
+            'length': len(self.snake),
+            'food': self.food_eaten,
+            'moves': self.moves_count,
+            'date': datetime.now().strftime("%Y-%m-%d %H:%M")
+        }
+
+    def end_game(self, reward=0):
+        """Mark the game as finished"""
+        self.running = False
+        self.done = True
+        return self, reward, True
+
+    def activate_powerup(self, powerup_type):
+        """Activate a powerup"""
+        self.active_powerup = powerup_type
+        # The pickup tick counts as the first, as it did with the old countdown
+        self.powerup_ends = self.moves_count + POWERUP_DURATION - 1  # ~10 seconds depending on speed
+        self.timers.schedule(self.powerup_ends, "effect_ended")
+
+        if powerup_type == PowerUpType.SPEED_BOOST:
+            self.game_speed = max(30, self.game_speed // 2)
+        elif powerup_type == PowerUpType.SLOW_DOWN:
+            self.game_speed = min(MAX_GAME_SPEED, self.game_speed * 2)
+        elif powerup_type == PowerUpType.SCORE_MULTIPLIER:
+            self.score_multiplier = 2
+
+    def deactivate_powerup(self):
+        """Deactivate current powerup"""
+        if self.active_powerup == PowerUpType.SPEED_BOOST:
+            self.game_speed = self.base_speed
+        elif self.active_powerup == PowerUpType.SLOW_DOWN:
+            self.game_speed = self.base_speed
+        elif self.active_powerup == PowerUpType.SCORE_MULTIPLIER:
+            self.score_multiplier = 1
+
+        self.active_powerup = None
+        self.powerup_ends = 0
@@ -0,0 +1,241 @@
+import hashlib
+import os
+import struct
+import tempfile
+from array import array
+from collections import deque
+
+from engine import OBSTACLE
+
+# Cycle file layout, little-endian: magic b"SNKC", grid size (I), cycle
+# length (I), then the cycle as cell indices ('i' array) followed by each
+# cell's position in the cycle ('i' array, -1 for cells not on it).
+MAGIC = b"SNKC"
+HEADER = struct.Struct("<4sII")
+
+# $SNAKE_CYCLE_CACHE, else snake/cycles in the user's cache directory
+CACHE_DIR = os.environ.get("SNAKE_CYCLE_CACHE") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(os.path.join("~", ".cache")), "snake", "cycles")
+
+CYCLES = {}  # cache key -> Cycle, shared by every solver in the process
+
+
+class Cycle:
+    """A closed tour of board cells: order[k] is the k-th cell, pos[cell] its k"""
+
+    def __init__(self, size, order, pos):
+        self.size = size
+        self.order = order
+        self.pos = pos
+
+    def __len__(self):
+        return len(self.order)
+
+    def to_bytes(self):
+        return HEADER.pack(MAGIC, self.size, len(self.order)) + self.order.tobytes() + self.pos.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, size, length = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a cycle file")
+        order = array('i')
+        pos = array('i')
+        start = HEADER.size
+        order.frombytes(data[start:start + 4 * length])
+        pos.frombytes(data[start + 4 * length:start + 4 * (length + size * size)])
+        if len(pos) != size * size:
+            raise ValueError("Cycle file is truncated")
+        return cls(size, order, pos)
+
+
+def cache_key(engine):
+    """(grid size, mode, obstacle layout) a cycle was built for"""
+    layout = ",".join(str(y * engine.GRID_SIZE + x) for x, y in sorted(engine.obstacles))
+    digest = hashlib.sha1(layout.encode()).hexdigest()[:16] if layout else "open"
+    return engine.GRID_SIZE, engine.game_mode.name, digest
+
+
+def cycle_for(engine, cache_dir=CACHE_DIR):
+    """The cycle for an engine's board, from memory, disk or built fresh"""
+    key = cache_key(engine)
+    cycle = CYCLES.get(key)
+    if cycle is not None:
+        return cycle
+
+    path = os.path.join(cache_dir, "%d-%s-%s.cyc" % key) if cache_dir else None
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                cycle = Cycle.from_bytes(f.read())
+        except (OSError, ValueError, struct.error):
+            cycle = None
+    if cycle is None:
+        cycle = build_cycle(engine.GRID_SIZE, engine.cells)
+        if path:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                # A temporary file of its own, so workers saving the same cycle never mix
+                fd, temp = tempfile.mkstemp(suffix=".tmp", dir=cache_dir)
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(cycle.to_bytes())
+                os.replace(temp, path)
+            except OSError as e:
+                print(f"Error saving cycle: {e}")
+    CYCLES[key] = cycle
+    return cycle
+
+
+def build_cycle(size, cells):
+    """Hamiltonian cycle over as many non-obstacle cells as possible.
+
+    With obstacles on the board, every alignment of the 2x2 blocks is
+    tried and the longest cycle kept.
+    """
+    if not any(cell & OBSTACLE for cell in cells):
+        return block_cycle(size, cells, 0, 0)
+    return max((block_cycle(size, cells, ox, oy) for oy in (0, 1) for ox in (0, 1)), key=len)
+
+
+def block_cycle(size, cells, ox, oy):
+    """Cycle built from 2x2 blocks whose grid starts at cell (ox, oy).
+
+    The board is cut into 2x2 blocks. Every block without an obstacle starts
+    as its own 4-cell loop, and a spanning tree over those blocks merges the
+    loops into one: for each tree edge, the two facing block sides are
+    replaced by two edges across. Cells left over (an odd last row or column,
+    the free cells of blocks holding obstacles) are then spliced in two at a
+    time wherever a cycle edge runs alongside a pair of them. Anything that
+    still does not fit (a parity leftover next to an obstacle) stays off the
+    cycle.
+    """
+    blocks_x = (size - ox) // 2
+    blocks_y = (size - oy) // 2
+    links = {}  # cell index -> set of its two cycle neighbors
+
+    def link(a, b):
+        links.setdefault(a, set()).add(b)
+        links.setdefault(b, set()).add(a)
+
+    def unlink(a, b):
+        links[a].discard(b)
+        links[b].discard(a)
+
+    def corners(bx, by):
+        """Top-left, top-right, bottom-right, bottom-left cells of a block"""
+        top_left = (2 * by + oy) * size + 2 * bx + ox
+        return top_left, top_left + 1, top_left + size + 1, top_left + size
+
+    def usable(bx, by):
+        return not any(cells[index] & OBSTACLE for index in corners(bx, by))
+
+    # Largest group of connected obstacle-free blocks, breadth-first from its first block
+    seen = set()
+    tree = []
+    best_tree, best_blocks = [], []
+    for by in range(blocks_y):
+        for bx in range(blocks_x):
+            if (bx, by) in seen or not usable(bx, by):
+                continue
+            seen.add((bx, by))
+            tree, group = [], [(bx, by)]
+            queue = deque(group)
+            while queue:
+                cx, cy = queue.popleft()
+                for nx, ny in ((cx + 1, cy), (cx, cy + 1), (cx - 1, cy), (cx, cy - 1)):
+                    if (0 <= nx < blocks_x and 0 <= ny < blocks_y and (nx, ny) not in seen
+                            and usable(nx, ny)):
+                        seen.add((nx, ny))
+                        tree.append(((cx, cy), (nx, ny)))
+                        group.append((nx, ny))
+                        queue.append((nx, ny))
+            if len(group) > len(best_blocks):
+                best_tree, best_blocks = tree, group
+
+    for bx, by in best_blocks:
+        top_left, top_right, bottom_right, bottom_left = corners(bx, by)
+        link(top_left, top_right)
+        link(top_right, bottom_right)
+        link(bottom_right, bottom_left)
+        link(bottom_left, top_left)
+
+    for a, b in best_tree:
+        (first, second) = sorted((a, b))
+        tl1, tr1, br1, bl1 = corners(*first)
+        tl2, tr2, br2, bl2 = corners(*second)
+        if first[1] == second[1]:
+            # Side by side: open the facing vertical sides
+            unlink(tr1, br1)
+            unlink(tl2, bl2)
+            link(tr1, tl2)
+            link(br1, bl2)
+        else:
+            # One above the other: open the facing horizontal sides
+            unlink(bl1, br1)
+            unlink(tl2, tr2)
+            link(bl1, tl2)
+            link(br1, tr2)
+
+    splice_leftovers(size, cells, links)
+    return trace(size, links)
+
+
+def splice_leftovers(size, cells, links):
+    """Insert free cells missing from the cycle, two neighbours at a time"""
+    def neighbors(index):
+        x, y = index % size, index // size
+        if x + 1 < size:
+            yield index + 1, size
+        if x > 0:
+            yield index - 1, size
+        if y + 1 < size:
+            yield index + size, 1
+        if y > 0:
+            yield index - size, 1
+
+    progress = True
+    while progress:
+        progress = False
+        for c in range(size * size):
+            if c in links or cells[c] & OBSTACLE:
+                continue
+            for d, across in neighbors(c):
+                if d in links or cells[d] & OBSTACLE:
+                    continue
+                # A cycle edge a-b alongside c-d, one step across on either side
+                for shift in (across, -across):
+                    a, b = c + shift, d + shift
+                    if not (0 <= a < size * size and 0 <= b < size * size):
+                        continue
+                    if abs(a % size - c % size) > 1 or abs(b % size - d % size) > 1:
+                        continue
+                    if a in links and b in links[a]:
+                        links[a].discard(b)
+                        links[b].discard(a)
+                        links[a].add(c)
+                        links[c] = {a, d}
+                        links[d] = {c, b}
+                        links[b].add(d)
+                        progress = True
+                        break
+                if c in links:
+                    break
+
+
+def trace(size, links):
+    """Walk the linked cells into order and position arrays"""
+    order = array('i')
+    pos = array('i', [-1]) * (size * size)
+    if not links:
+        return Cycle(size, order, pos)
+
+    start = min(links)
+    previous, current = None, start
+    while True:
+        pos[current] = len(order)
+        order.append(current)
+        a, b = links[current]
+        previous, current = current, (b if a == previous else a)
+        if current == start:
+            break
+    return Cycle(size, order, pos)
@@ -0,0 +1,81 @@
+from collections import deque
+
+from engine import OPPOSITES
+
+
+class InputQueue:
+    """Turns pressed between ticks, applied one per tick in order.
+
+    A press is dropped if it would not change the heading the snake will
+    have by the time it applies (same direction or a reversal of the last
+    queued turn), and once ``capacity`` turns are waiting. Each entry keeps
+    the perf_counter_ns of the keypress for latency measurement.
+    """
+
+    def __init__(self, capacity=3):
+        self.capacity = capacity
+        self.pending = deque()
+
+    def __len__(self):
+        return len(self.pending)
+
+    def clear(self):
+        self.pending.clear()
+
+    def push(self, direction, heading, pressed_ns):
+        """Queue a turn; heading is the snake's current direction"""
+        if self.pending:
+            heading = self.pending[-1][0]
+        if direction == heading or direction == OPPOSITES[heading] or len(self.pending) >= self.capacity:
+            return False
+        self.pending.append((direction, pressed_ns))
+        return True
+
+    def pop(self, heading):
+        """Next turn still legal from heading, as (direction, pressed_ns), or None"""
+        while self.pending:
+            direction, pressed_ns = self.pending.popleft()
+            if direction != heading and direction != OPPOSITES[heading]:
+                return direction, pressed_ns
+        return None
+
+
+class LatencyHistogram:
+    """Fixed-width millisecond buckets, the last one open-ended"""
+
+    def __init__(self, bucket_ms=10, buckets=20):
+        self.bucket_ms = bucket_ms
+        self.counts = [0] * buckets
+        self.count = 0
+
+    def record(self, ms):
+        self.counts[min(len(self.counts) - 1, int(ms // self.bucket_ms))] += 1
+        self.count += 1
+
+    def percentile(self, fraction):
+        """Upper edge of the bucket holding the nearest-rank percentile, in ms"""
+        if not self.count:
+            return None
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return (i + 1) * self.bucket_ms
+        return len(self.counts) * self.bucket_ms
+
+    def lines(self, width=20):
+        """Text bars for the non-empty buckets, like the tournament histogram"""
+        peak = max(self.counts) or 1
+        last = len(self.counts) - 1
+        rows = []
+        for i, count in enumerate(self.counts):
+            if not count:
+                continue
+            low = i * self.bucket_ms
+            label = f"{low:>4}+" if i == last else f"{low:>4}-{low + self.bucket_ms:<4}"
+            rows.append(f"{label:<10}| {'#' * max(1, width * count // peak)} {count}")
+        return rows
+
+    def to_dict(self):
+        return {'bucket_ms': self.bucket_ms, 'counts': list(self.counts), 'count': self.count}
@@ -0,0 +1,283 @@
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+# Level pool file layout, little-endian: magic b"SNKL", grid size (I) and
+# difficulty (I), then one record per level: seed (Q), obstacle count (I)
+# and the obstacle cell indices ('i' array). Only build_pool() writes pool
+# files, each one whole, so readers never see a partial file. The file name
+# carries GENERATOR_VERSION, bumped whenever generate() would lay a seed
+# out differently, so replays never meet a stale layout.
+MAGIC = b"SNKL"
+HEADER = struct.Struct("<4sII")
+RECORD = struct.Struct("<QI")
+GENERATOR_VERSION = 1
+
+# $SNAKE_LEVEL_CACHE, else snake/levels in the user's cache directory
+CACHE_DIR = os.environ.get("SNAKE_LEVEL_CACHE") or os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(os.path.join("~", ".cache")), "snake", "levels")
+
+POOL_SIZE = 4096  # level seeds an OBSTACLES game picks from
+DEFAULT_DIFFICULTY = 2
+MAX_ATTEMPTS = 50
+
+LEVELS = {}  # (grid size, difficulty) -> {seed: obstacle cells}, shared by the process
+
+
+def reserved_cells(size):
+    """Cells a level must leave free: the snake's start and three cells ahead"""
+    center = size // 2
+    return {center * size + x for x in range(center - 2, center + 4)}
+
+
+def layout(rng, size, difficulty):
+    """One candidate layout: straight walls inside the two-cell margin.
+
+    Difficulty d blocks about 2d% of the interior with walls up to d cells
+    long, so difficulty 2 puts around ten cells on a 20x20 board, like the
+    old 8-15 random blocks.
+    """
+    low, span = 2, size - 4
+    if span < 1:
+        return []
+    high = low + span - 1
+    reserved = reserved_cells(size)
+    # Never more than the interior has room for, which on tiny boards is nothing
+    room = span * span - sum(low <= cell % size <= high and low <= cell // size <= high for cell in reserved)
+    if room < 1:
+        return []
+    target = min(room, max(1, int(span * span * 0.02 * difficulty)))
+    taken = set()
+    cells = []
+    random = rng.random
+    while len(cells) < target:
+        x = low + int(random() * span)
+        y = low + int(random() * span)
+        step = 1 if random() < 0.5 else size
+        cell = y * size + x
+        for _ in range(1 + int(random() * difficulty)):
+            if x > high or y > high:
+                break
+            if cell not in reserved and cell not in taken:
+                taken.add(cell)
+                cells.append(cell)
+            if step == 1:
+                x += 1
+            else:
+                y += 1
+            cell += step
+    return cells
+
+
+def free_runs(size, cells):
+    """Runs of free cells and the union-find joining them, from obstacle cells.
+
+    Each row is split into runs between its sorted obstacle columns, and
+    runs overlapping a run in the row above are joined, so the cost depends
+    on the number of obstacles, not on the board area. Rows without
+    obstacles are one full-width run, and a stretch of them is treated as
+    a single row. Returns (runs, find): runs are (row, first x, last x) by
+    id and find maps a run id to its group's root.
+    """
+    parent = []
+    runs = []
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def add_row(y, xs, above):
+        row = []
+        start = 0
+        for x in xs:
+            if x > start:
+                row.append((start, x - 1, len(runs)))
+                parent.append(len(runs))
+                runs.append((y, start, x - 1))
+            start = x + 1
+
+        # Join runs that overlap a run above, walking both rows left to right
+        i = j = 0
+        while i < len(row) and j < len(above):
+            first, last, run = row[i]
+            above_first, above_last, above_run = above[j]
+            if first <= above_last and above_first <= last:
+                a, b = find(run), find(above_run)
+                if a != b:
+                    parent[a] = b
+            if last < above_last:
+                i += 1
+            else:
+                j += 1
+        return row
+
+    above = []
+    y = -1
+    xs = []
+    for cell in sorted(cells):
+        row = cell // size
+        if row != y:
+            if y >= 0:
+                xs.append(size)
+                above = add_row(y, xs, above)
+            if row > y + 1:
+                above = add_row(y + 1, [size], above)  # the empty rows in between
+            y = row
+            xs = []
+        xs.append(cell % size)
+    if y >= 0:
+        xs.append(size)
+        above = add_row(y, xs, above)
+    if y < size - 1:
+        add_row(y + 1, [size], above)
+    return runs, find
+
+
+def connected(size, cells):
+    """True if the cells not in ``cells`` form one 4-connected region"""
+    runs, find = free_runs(size, cells)
+    return len({find(run) for run in range(len(runs))}) <= 1
+
+
+def pockets(size, cells):
+    """Free cells the obstacles in ``cells`` cut off from the board's edge.
+
+    Levels keep two free cells along every wall, so run 0 (the top row)
+    belongs to the edge's region, and so does every empty row.
+    """
+    runs, find = free_runs(size, cells)
+    edge = find(0)
+    sealed = []
+    for run, (row, first, last) in enumerate(runs):
+        if find(run) != edge:
+            sealed.extend(range(row * size + first, row * size + last + 1))
+    return sealed
+
+
+def generate(seed, size, difficulty=DEFAULT_DIFFICULTY):
+    """Obstacle cells of level ``seed``, leaving every free cell reachable.
+
+    Small pockets a candidate seals off (up to a quarter of its obstacle
+    count, away from the snake's start) are filled in; candidates that cut
+    off more are redrawn. If none passes within MAX_ATTEMPTS the level has
+    no obstacles.
+    """
+    rng = random.Random(f"level:{seed}:{size}:{difficulty}")
+    reserved = reserved_cells(size)
+    for _ in range(MAX_ATTEMPTS):
+        cells = layout(rng, size, difficulty)
+        sealed = pockets(size, cells)
+        if len(sealed) <= len(cells) // 4 and reserved.isdisjoint(sealed):
+            cells.extend(sealed)
+            return array('i', cells)
+    return array('i')
+
+
+def pool_path(cache_dir, size, difficulty):
+    return os.path.join(cache_dir, "%d-d%d-v%d.lvl" % (size, difficulty, GENERATOR_VERSION))
+
+
+def load_pool(path, size, difficulty):
+    """Levels saved in a pool file, as seed -> obstacle cells"""
+    pool = {}
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return pool
+    try:
+        magic, file_size, file_difficulty = HEADER.unpack_from(data)
+    except struct.error:
+        return pool
+    if magic != MAGIC or (file_size, file_difficulty) != (size, difficulty):
+        return pool
+
+    pos = HEADER.size
+    while pos + RECORD.size <= len(data):
+        seed, count = RECORD.unpack_from(data, pos)
+        pos += RECORD.size
+        if pos + 4 * count > len(data):
+            break
+        cells = array('i')
+        cells.frombytes(data[pos:pos + 4 * count])
+        pos += 4 * count
+        pool[seed] = cells
+    return pool
+
+
+def save_pool(path, size, difficulty, pool):
+    """Write a whole pool file: to a temporary file, then renamed over path.
+
+    Concurrent writers each rename a complete file into place, so the last
+    one wins and the file is never a mix of both.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, size, difficulty))
+            for seed in sorted(pool):
+                cells = pool[seed]
+                f.write(RECORD.pack(seed, len(cells)) + cells.tobytes())
+        os.replace(temp, path)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def level_for(seed, size, difficulty=DEFAULT_DIFFICULTY, cache_dir=CACHE_DIR):
+    """Obstacle cells of a level, from memory, the pool file or generated fresh.
+
+    Never writes: a level the pool file lacks is generated and kept in
+    memory only. build_pool() is what fills pool files.
+    """
+    key = (size, difficulty)
+    pool = LEVELS.get(key)
+    if pool is None:
+        pool = LEVELS[key] = load_pool(pool_path(cache_dir, size, difficulty), size, difficulty) if cache_dir else {}
+    cells = pool.get(seed)
+    if cells is None:
+        cells = pool[seed] = generate(seed, size, difficulty)
+    return cells
+
+
+def build_pool(size, difficulty=DEFAULT_DIFFICULTY, seeds=range(POOL_SIZE), cache_dir=CACHE_DIR):
+    """Generate every level of a pool the file lacks and rewrite the file with them"""
+    path = pool_path(cache_dir, size, difficulty)
+    saved = load_pool(path, size, difficulty)
+    pool = LEVELS.setdefault((size, difficulty), {})
+    pool.update(saved)
+    missing = [seed for seed in seeds if seed not in saved]
+    for seed in missing:
+        if seed not in pool:
+            pool[seed] = generate(seed, size, difficulty)
+        saved[seed] = pool[seed]
+    if missing:
+        save_pool(path, size, difficulty, saved)
+    return len(missing)
+
+
+def benchmark(size=128, difficulty=DEFAULT_DIFFICULTY, count=500):
+    """Levels generated and validated per second, uncached"""
+    start = time.perf_counter()
+    for seed in range(count):
+        generate(seed, size, difficulty)
+    return count / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    # python levels.py [grid size] [difficulty]: fill that pool's file in CACHE_DIR
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    difficulty = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_DIFFICULTY
+    start = time.perf_counter()
+    built = build_pool(size, difficulty)
+    print(f"{size}x{size} difficulty {difficulty}: {built} new levels saved to "
+          f"{pool_path(CACHE_DIR, size, difficulty)} in "
+          f"{time.perf_counter() - start:.2f}s, {benchmark(size, difficulty):,.0f} levels/s uncached")
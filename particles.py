@@ -0,0 +1,60 @@
+from array import array
+
+PARTICLE_LIFE = 20  # frames
+
+
+class ParticlePool:
+    """Fixed-capacity particle storage in parallel arrays.
+
+    Slots are handed out round-robin. Every particle lives the same number
+    of frames, so the live particles are always the most recently emitted
+    ones and reusing the next slot evicts the oldest. Nothing is allocated
+    per particle; a renderer keeps one canvas item per slot and watches
+    ``serial`` to spot slots that were reused.
+    """
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.x = array('d', bytes(8 * capacity))  # grid units
+        self.y = array('d', bytes(8 * capacity))
+        self.life = array('i', bytes(4 * capacity))
+        self.serial = array('I', bytes(4 * capacity))  # bumped on every reuse
+        self.color = [None] * capacity
+        self.next_slot = 0
+        self.live = 0
+
+    def clear(self):
+        """Kill every particle"""
+        for slot in self.live_slots():
+            self.life[slot] = 0
+        self.live = 0
+
+    def emit(self, position, color, rng, count=8):
+        """Burst of particles around a grid position"""
+        for _ in range(count):
+            slot = self.next_slot
+            self.next_slot = (slot + 1) % self.capacity
+            speed = rng.uniform(2, 5)
+            self.x[slot] = position[0] + speed * rng.choice((-1, 1)) / 10
+            self.y[slot] = position[1] + speed * rng.choice((-1, 1)) / 10
+            self.life[slot] = PARTICLE_LIFE
+            self.color[slot] = color
+            self.serial[slot] = (self.serial[slot] + 1) & 0xFFFFFFFF
+        self.live = min(self.capacity, self.live + count)
+
+    def live_slots(self):
+        """Slots holding live particles, oldest first"""
+        start = self.next_slot - self.live
+        capacity = self.capacity
+        return ((start + k) % capacity for k in range(self.live))
+
+    def age(self):
+        """Advance one frame and return the slots whose particle died"""
+        life = self.life
+        dead = []
+        for slot in self.live_slots():
+            life[slot] -= 1
+            if life[slot] <= 0:
+                dead.append(slot)
+        self.live -= len(dead)
+        return dead
@@ -0,0 +1,76 @@
+import csv
+import json
+import time
+from collections import deque
+
+PERCENTILES = (50, 95, 99)
+
+
+class Profiler:
+    """Rolling perf_counter_ns timings for named spans.
+
+    Methods are timed by wrap(), which shadows the method with a timing
+    wrapper on that one instance. Nothing is wrapped while profiling is off,
+    so the hot path pays nothing for it; unwrap() restores the originals.
+    Spans may nest (draw_game includes draw_sidebar). Only the last
+    ``window`` samples of each span are kept.
+    """
+
+    def __init__(self, window=600):
+        self.window = window
+        self.samples = {}  # span name -> deque of durations in ns
+        self.wrapped = []
+
+    def wrap(self, obj, attr, name=None):
+        """Time every call to obj.attr under the span name (default attr)"""
+        method = getattr(obj, attr)
+        samples = self.samples.setdefault(name or attr, deque(maxlen=self.window))
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                samples.append(clock() - start)
+
+        setattr(obj, attr, timed)
+        self.wrapped.append((obj, attr))
+
+    def unwrap(self):
+        """Put every wrapped method back"""
+        for obj, attr in self.wrapped:
+            delattr(obj, attr)
+        self.wrapped.clear()
+
+    def stats(self, name):
+        """Sample count, p50/p95/p99 and max of a span, in milliseconds"""
+        samples = sorted(self.samples[name])
+        if not samples:
+            return None
+        stats = {'count': len(samples)}
+        for p in PERCENTILES:
+            index = min(len(samples) - 1, max(0, round(p / 100 * len(samples)) - 1))
+            stats[f'p{p}_ms'] = samples[index] / 1e6
+        stats['max_ms'] = samples[-1] / 1e6
+        return stats
+
+    def summary(self):
+        """stats() for every span that has samples"""
+        return {name: stats for name in self.samples
+                if (stats := self.stats(name)) is not None}
+
+    def dump(self, path):
+        """Write the summary as CSV, or as JSON with the raw samples"""
+        summary = self.summary()
+        with open(path, 'w', newline='') as f:
+            if path.endswith('.csv'):
+                writer = csv.writer(f)
+                writer.writerow(['span', 'count', *(f'p{p}_ms' for p in PERCENTILES), 'max_ms'])
+                for name, stats in summary.items():
+                    writer.writerow([name, *stats.values()])
+            else:
+                json.dump({
+                    'summary': summary,
+                    'samples_ns': {name: list(samples) for name, samples in self.samples.items()},
+                }, f, indent=2)
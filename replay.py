@@ -0,0 +1,104 @@
+import struct
+import sys
+import time
+
+from engine import GameMode, SnakeEngine
+
+# File layout, little-endian:
+#   magic b"SNKR", version (B), mode index in GameMode (B), grid size (H),
+#   seed (Q), tick count (I)
+# followed by the direction taken on each tick, 2 bits per tick, four ticks
+# per byte starting from the low bits.
+MAGIC = b"SNKR"
+VERSION = 3  # 2: OBSTACLES boards from levels.py, 3: powerups expire on a fixed tick
+HEADER = struct.Struct("<4sBBHQI")
+
+MODES = tuple(GameMode)
+CODES = ("Up", "Down", "Left", "Right")
+CODE_OF = {direction: code for code, direction in enumerate(CODES)}
+
+
+class Replay:
+    """Seed, mode and per-tick directions of one game"""
+
+    def __init__(self, mode, seed, grid_size=20):
+        self.mode = mode
+        self.seed = seed
+        self.grid_size = grid_size
+        self.ticks = 0
+        self.moves = bytearray()
+
+    @classmethod
+    def for_engine(cls, engine):
+        """Start recording the game an engine was just reset into"""
+        return cls(engine.game_mode, engine.seed, engine.GRID_SIZE)
+
+    def append(self, direction):
+        """Record the direction the snake moved on the next tick"""
+        shift = (self.ticks & 3) * 2
+        if not shift:
+            self.moves.append(0)
+        self.moves[-1] |= CODE_OF[direction] << shift
+        self.ticks += 1
+
+    def truncate(self, ticks):
+        """Drop every recorded direction after the first ``ticks``"""
+        if ticks >= self.ticks:
+            return
+        del self.moves[(ticks + 3) // 4:]
+        if ticks & 3:
+            self.moves[-1] &= (1 << ((ticks & 3) * 2)) - 1
+        self.ticks = ticks
+
+    def directions(self):
+        """Yield the recorded directions in tick order"""
+        moves = self.moves
+        for tick in range(self.ticks):
+            yield CODES[(moves[tick >> 2] >> ((tick & 3) * 2)) & 3]
+
+    def to_bytes(self):
+        header = HEADER.pack(MAGIC, VERSION, MODES.index(self.mode),
+                             self.grid_size, self.seed, self.ticks)
+        return header + bytes(self.moves)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, mode, grid_size, seed, ticks = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a snake replay file")
+        replay = cls(MODES[mode], seed, grid_size)
+        replay.ticks = ticks
+        replay.moves = bytearray(data[HEADER.size:HEADER.size + (ticks + 3) // 4])
+        if len(replay.moves) * 4 < ticks:
+            raise ValueError("Replay file is truncated")
+        return replay
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def simulate(replay):
+    """Re-run a replay headlessly and return the engine at the end"""
+    engine = SnakeEngine(replay.grid_size, mode=replay.mode, seed=replay.seed)
+    step = engine.step
+    for direction in replay.directions():
+        step(direction)
+    return engine
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        replay = Replay.load(path)
+        start = time.perf_counter()
+        engine = simulate(replay)
+        elapsed = time.perf_counter() - start
+        print(f"{path}: {replay.mode.value}, seed {replay.seed}, {replay.ticks} ticks, "
+              f"score {engine.score}, length {len(engine.snake)}, "
+              f"{'finished' if engine.done else 'still running'} "
+              f"({replay.ticks / elapsed if elapsed else 0:,.0f} ticks/s)")
@@ -0,0 +1,284 @@
+import random
+from array import array
+from collections import deque
+
+from engine import OBSTACLE, GameMode, PowerUpType, SnakeEngine
+from replay import CODE_OF, CODES
+
+POWERUP_TYPES = tuple(PowerUpType)
+
+# Engine attributes copied as they are; everything else is packed below
+SCALARS = ('seed', 'game_mode', 'running', 'done', 'won', 'score', 'moves_count', 'food_eaten',
+           'score_multiplier', 'food', 'active_powerup', 'powerup_ends', 'elapsed_ms',
+           'snake_direction', 'next_direction', 'base_speed', 'game_speed', 'start_time')
+SNAPSHOT_OVERHEAD = 400  # bytes for the Snapshot object, tuples and array headers
+CHUNK = 4096  # bytes per shared piece of the free-cell index
+
+
+class Snapshot:
+    """Everything needed to put an engine back exactly as it was.
+
+    The snake is packed as int16 x, y pairs. The free-cell index is kept in
+    order, so random spawns after a restore pick the same cells as before,
+    as CHUNK-byte pieces; a piece equal to the previous snapshot's is shared
+    with it, so on a large board a snapshot costs about what changed since
+    the last one. Pending timed events are kept as they are in the
+    scheduler's heap. Obstacles and the RNG state are shared with the
+    previous snapshot when they have not changed. The occupancy grid and
+    free-cell slots are not stored: restore() patches the engine's own.
+    """
+
+    __slots__ = ('tick', 'scalars', 'snake', 'free', 'powerups', 'timers', 'obstacles', 'rng', 'size')
+
+    def __init__(self, engine, previous=None):
+        self.tick = engine.moves_count
+        self.scalars = tuple(getattr(engine, name) for name in SCALARS)
+
+        snake = array('h')
+        for x, y in engine.snake:
+            snake.append(x)
+            snake.append(y)
+        self.snake = snake
+        self.free, added = split(engine.free_cells, previous.free if previous else ())
+        expiry = engine.powerup_expiry
+        self.powerups = tuple((x, y, POWERUP_TYPES.index(kind), expiry[x, y])
+                              for (x, y), kind in engine.powerups.items())
+        self.timers = (tuple(engine.timers.heap), engine.timers.seq)
+
+        obstacles = tuple(engine.obstacles)
+        version, words, gauss = engine.rng.getstate()
+        rng = (version, array('I', words), gauss)
+        shared = 0
+        if previous is not None:
+            if previous.obstacles == obstacles:
+                obstacles = previous.obstacles
+                shared += len(obstacles) * 64
+            if previous.rng == rng:
+                rng = previous.rng
+                shared += len(words) * 4
+        self.obstacles = obstacles
+        self.rng = rng
+        self.size = (SNAPSHOT_OVERHEAD + len(snake) * 2 + added + len(self.free) * 8
+                     + (len(self.powerups) + len(self.timers[0])) * 64 + len(obstacles) * 64
+                     + len(words) * 4 - shared)
+
+    def shared_with(self, other):
+        """Bytes of this snapshot's size that other holds instead"""
+        shared = sum(len(piece) for piece, other_piece in zip(self.free, other.free)
+                     if piece is other_piece)
+        if self.rng is other.rng:
+            shared += len(self.rng[1]) * 4
+        if self.obstacles is other.obstacles:
+            shared += len(self.obstacles) * 64
+        return shared
+
+    def restore(self, engine):
+        """Put engine back in this snapshot's state.
+
+        The occupancy grid and free-cell slots are patched rather than
+        rebuilt, which costs the two snakes' lengths plus the free-cell
+        pieces that differ, not the board's area.
+        """
+        size = engine.GRID_SIZE
+        obstacles = list(self.obstacles)
+        patch = len(engine.cells) == size * size and engine.obstacles == obstacles
+        old_snake = engine.snake
+        old_free = engine.free_cells
+
+        for name, value in zip(SCALARS, self.scalars):
+            setattr(engine, name, value)
+        engine.events.clear()
+        engine.obstacles = obstacles
+        engine.powerups = {(x, y): POWERUP_TYPES[kind] for x, y, kind, _ in self.powerups}
+        engine.powerup_expiry = {(x, y): expires for x, y, _, expires in self.powerups}
+        heap, engine.timers.seq = self.timers
+        engine.timers.heap = list(heap)
+        version, words, gauss = self.rng
+        engine.rng.setstate((version, tuple(words), gauss))
+
+        snake = self.snake
+        engine.snake = deque(zip(snake[0::2], snake[1::2]))
+        free = engine.free_cells = array('i')
+        free.frombytes(b"".join(self.free))
+
+        if patch:
+            # Same board and obstacles: move the snake's counts, fix changed slots
+            cells = engine.cells
+            for x, y in old_snake:
+                if 0 <= x < size and 0 <= y < size:
+                    cells[y * size + x] -= 1
+            for x, y in engine.snake:
+                if 0 <= x < size and 0 <= y < size:
+                    cells[y * size + x] += 1
+            patch_slots(engine.free_slots, old_free, free)
+            return
+
+        cells = engine.cells = bytearray(size * size)
+        for x, y in obstacles:
+            cells[y * size + x] = OBSTACLE
+        for x, y in engine.snake:
+            if 0 <= x < size and 0 <= y < size:
+                cells[y * size + x] += 1
+        slots = engine.free_slots = array('i', [-1]) * (size * size)
+        for slot, index in enumerate(free):
+            slots[index] = slot
+
+
+def split(data, previous):
+    """data's bytes as CHUNK-byte pieces, reusing equal pieces from previous.
+
+    Returns the pieces and how many bytes the new ones hold.
+    """
+    view = memoryview(data).cast('B')
+    pieces = []
+    new = 0
+    for i, start in enumerate(range(0, len(view), CHUNK)):
+        piece = view[start:start + CHUNK].tobytes()
+        if i < len(previous) and previous[i] == piece:
+            piece = previous[i]
+        else:
+            new += len(piece)
+        pieces.append(piece)
+    return tuple(pieces), new
+
+
+def patch_slots(slots, old, new):
+    """Turn slots from the inverse of free-cell list old into new's.
+
+    Only stretches of CHUNK bytes where the lists differ are visited: cells
+    in unchanged stretches keep their slots.
+    """
+    step = CHUNK // new.itemsize
+    changed = [start for start in range(0, max(len(old), len(new)), step)
+               if old[start:start + step] != new[start:start + step]]
+    for start in changed:
+        for index in old[start:start + step]:
+            slots[index] = -1
+    for start in changed:
+        for slot in range(start, min(start + step, len(new))):
+            slots[new[slot]] = slot
+
+
+class RewindBuffer:
+    """Recent history of one game within a memory budget.
+
+    A snapshot is kept every ``interval`` ticks, plus the direction taken
+    on each tick (one byte). seek() restores the latest snapshot at or
+    before the target and replays the recorded directions up to it, which
+    the engine's determinism makes exact. When the snapshots outgrow
+    budget_bytes the oldest are dropped, so how far back a game can be
+    rewound depends on its snake length and board size.
+
+    Seeking does not discard anything, so a finished game can be browsed
+    back and forth; record() after a seek starts a new timeline from there.
+    """
+
+    def __init__(self, budget_bytes=8 * 1024 * 1024, interval=16):
+        self.budget_bytes = budget_bytes
+        self.interval = interval
+        self.snapshots = deque()
+        self.directions = bytearray()  # code of the direction taken on each tick since first_tick
+        self.first_tick = 0
+        self.used = 0
+
+    def start(self, engine):
+        """Begin a new game's history from its current state"""
+        self.snapshots.clear()
+        self.directions.clear()
+        self.used = 0
+        self.first_tick = engine.moves_count
+        self.add_snapshot(engine)
+
+    @property
+    def last_tick(self):
+        return self.first_tick + len(self.directions)
+
+    def add_snapshot(self, engine):
+        previous = self.snapshots[-1] if self.snapshots else None
+        snapshot = Snapshot(engine, previous)
+        self.snapshots.append(snapshot)
+        self.used += snapshot.size
+
+        # Drop the oldest snapshots (and their ticks) while over budget
+        while self.used > self.budget_bytes and len(self.snapshots) > 1:
+            oldest = self.snapshots.popleft()
+            first = self.snapshots[0]
+            # Whatever the new first snapshot shared now counts against it
+            inherited = first.shared_with(oldest)
+            first.size += inherited
+            self.used += inherited - oldest.size
+            del self.directions[:first.tick - self.first_tick]
+            self.first_tick = first.tick
+
+    def record(self, engine):
+        """Note the tick the engine just took"""
+        tick = engine.moves_count
+        if tick - 1 < self.last_tick:
+            self.truncate(tick - 1)
+        self.directions.append(CODE_OF[engine.snake_direction])
+        if tick % self.interval == 0:
+            self.add_snapshot(engine)
+
+    def truncate(self, tick):
+        """Forget everything after tick"""
+        del self.directions[tick - self.first_tick:]
+        while self.snapshots and self.snapshots[-1].tick > tick:
+            dropped = self.snapshots.pop()
+            self.used -= dropped.size
+
+    def seek(self, engine, tick):
+        """Put engine in its state at tick, clamped to the history kept; returns the tick"""
+        tick = max(self.first_tick, min(tick, self.last_tick))
+        # Latest snapshot at or before tick
+        index = len(self.snapshots) - 1
+        while self.snapshots[index].tick > tick:
+            index -= 1
+        snapshot = self.snapshots[index]
+        snapshot.restore(engine)
+
+        step = engine.step
+        directions = self.directions
+        for t in range(snapshot.tick, tick):
+            step(CODES[directions[t - self.first_tick]])
+        return tick
+
+
+def check(mode=GameMode.CLASSIC, seed=0, grid_size=20, ticks=3000, budget_bytes=64 * 1024):
+    """Rewind an autopilot game to random ticks and confirm replaying from
+    there matches the original run exactly.
+
+    The budget is small enough that the oldest snapshots get dropped.
+    """
+    from bots import Autopilot
+
+    engine = SnakeEngine(grid_size, mode=mode, seed=seed)
+    bot = Autopilot(random.Random(seed))
+    rewind = RewindBuffer(budget_bytes)
+    rewind.start(engine)
+    history = {}  # tick -> state
+    while not engine.done and engine.moves_count < ticks:
+        engine.step(bot.choose(engine))
+        rewind.record(engine)
+        history[engine.moves_count] = state_of(engine)
+
+    rng = random.Random(seed)
+    for _ in range(20):
+        tick = rng.randrange(rewind.first_tick, rewind.last_tick)
+        rewind.seek(engine, tick)
+        if tick in history and state_of(engine) != history[tick]:
+            raise AssertionError(f"{mode.value}: state differs after seeking to tick {tick}")
+    return len(history), rewind.first_tick
+
+
+def state_of(engine):
+    """Everything a restore has to get right, for comparing engines"""
+    return (tuple(engine.snake), engine.food, dict(engine.powerups), dict(engine.powerup_expiry), engine.score,
+            engine.game_speed, engine.powerup_timer, engine.elapsed_ms, engine.time_remaining,
+            list(engine.timers.heap), engine.rng.getstate(), tuple(engine.free_cells), tuple(engine.free_slots),
+            bytes(engine.cells))
+
+
+if __name__ == "__main__":
+    for mode in GameMode:
+        ticks, first_tick = check(mode)
+        print(f"{mode.value}: {ticks} ticks, seeks back to tick {first_tick} match the original run")
@@ -0,0 +1,129 @@
+import json
+import os
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    mode TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    food INTEGER NOT NULL,
+    moves INTEGER NOT NULL,
+    date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (mode, score DESC);
+CREATE INDEX IF NOT EXISTS runs_by_date ON runs (mode, date);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+FIELDS = ('score', 'length', 'food', 'moves', 'date')
+
+
+class ScoreStore:
+    """Every finished run, kept in SQLite.
+
+    Runs are never trimmed. Each write is its own transaction in WAL mode
+    with full sync, so a crash can lose at most the run being written and
+    never corrupts earlier ones. Top-k and date-range queries walk the
+    (mode, score) and (mode, date) indexes. Rows come back as dicts with the
+    same keys the old high_scores.json entries had.
+    """
+
+    def __init__(self, path='high_scores.db', json_path='high_scores.json'):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+        if json_path:
+            self.import_json(json_path)
+
+    def import_json(self, json_path):
+        """Copy the old high_scores.json in, once per database.
+
+        An unreadable file is left alone and retried next time; entries
+        missing a field or holding the wrong type are skipped.
+        """
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone():
+            return 0
+        if not os.path.exists(json_path):
+            return 0
+
+        try:
+            with open(json_path, 'r') as f:
+                high_scores = json.load(f)
+            modes = list(high_scores.items())
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Error loading high scores: {e}")
+            return 0
+        rows = []
+        for mode, entries in modes:
+            for entry in entries if isinstance(entries, list) else ():
+                try:
+                    score, length, food, moves = (int(entry[field]) for field in FIELDS[:4])
+                    rows.append((str(mode), score, length, food, moves, str(entry['date'])))
+                except (KeyError, ValueError, TypeError) as e:
+                    print(f"Error loading high score entry {entry!r}: {e}")
+
+        # The rows and the marker land together or not at all
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO runs (mode, score, length, food, moves, date) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('json_imported', ?)", (json_path,))
+        return len(rows)
+
+    def record(self, mode, score_data):
+        """Store one run; score_data is SnakeEngine.score_data()"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (mode, score, length, food, moves, date) VALUES (?, ?, ?, ?, ?, ?)",
+                (mode, *(score_data[field] for field in FIELDS))
+            )
+        return cursor.lastrowid
+
+    def record_many(self, runs):
+        """Store (mode, score_data) pairs in a single transaction"""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO runs (mode, score, length, food, moves, date) VALUES (?, ?, ?, ?, ?, ?)",
+                ((mode, *(data[field] for field in FIELDS)) for mode, data in runs)
+            )
+
+    def top(self, mode, k=10):
+        """Best k runs for a mode, earliest first among equal scores"""
+        rows = self.conn.execute(
+            "SELECT score, length, food, moves, date FROM runs "
+            "WHERE mode = ? ORDER BY score DESC, id LIMIT ?",
+            (mode, k)
+        )
+        return [dict(row) for row in rows]
+
+    def best(self, mode):
+        """Best run for a mode, or None"""
+        runs = self.top(mode, 1)
+        return runs[0] if runs else None
+
+    def between(self, mode, start, end, limit=None):
+        """Runs for a mode dated start <= date < end ("YYYY-MM-DD HH:MM" strings)"""
+        rows = self.conn.execute(
+            "SELECT score, length, food, moves, date FROM runs "
+            "WHERE mode = ? AND date >= ? AND date < ? ORDER BY date, id LIMIT ?",
+            (mode, start, end, -1 if limit is None else limit)
+        )
+        return [dict(row) for row in rows]
+
+    def count(self, mode=None):
+        """Number of runs stored, for one mode or all"""
+        if mode is None:
+            return self.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM runs WHERE mode = ?", (mode,)).fetchone()[0]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,414 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from collections import deque
+
+from clock import TickClock
+from engine import GameMode, SnakeEngine
+from inputs import InputQueue
+from stream import StreamEncoder
+
+# A client whose socket buffer passes HIGH_WATER bytes stops getting ticks;
+# once it drains below LOW_WATER it gets a keyframe and carries on. One
+# still stalled after STALL_SECONDS is disconnected.
+HIGH_WATER = 64 * 1024
+LOW_WATER = 16 * 1024
+STALL_SECONDS = 5
+MAX_LINE = 4096
+ROOM_NAME = re.compile(r"[A-Za-z0-9_-]{1,64}")  # also the recording's file name
+
+
+def encode(message):
+    """One JSON line"""
+    return json.dumps(message, separators=(',', ':')).encode() + b"\n"
+
+
+def valid_seed(seed):
+    """True if seed fits the uint64 replays and the delta stream store it as"""
+    return type(seed) is int and 0 <= seed < 2 ** 64
+
+
+class Client:
+    """One connection, in at most one room"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.room = None
+        self.delta = False  # gets the binary stream.py feed instead of JSON lines
+        self.stalled_since = None  # loop time the buffer passed HIGH_WATER
+
+    def send(self, data):
+        if not self.writer.transport.is_closing():
+            self.writer.write(data)
+
+    def reply(self, message):
+        """Answer a request; delta clients get nothing but their stream"""
+        if not self.delta:
+            self.send(encode(message))
+
+
+class Room:
+    """One game and everyone connected to it.
+
+    Any client in the room may steer; turns go through an InputQueue so at
+    most one applies per tick. Each tick is encoded once per format in use
+    and the same bytes go to every client of that format. The binary delta
+    stream is only kept while a delta client is in the room or the room is
+    being recorded.
+    """
+
+    def __init__(self, name, mode, seed=None, grid_size=20):
+        self.name = name
+        self.engine = SnakeEngine(grid_size, mode=mode, seed=seed)
+        self.inputs = InputQueue()
+        self.clients = set()
+        self.delta_clients = 0
+        self.encoder = None
+        self.recording = None
+        self.powerups_sent = {}
+
+    def add(self, client):
+        # Build the stream first so a client is never in the room without it
+        if client.delta:
+            self.start_stream()
+            self.delta_clients += 1
+        self.clients.add(client)
+
+    def remove(self, client):
+        self.clients.discard(client)
+        if client.delta:
+            self.delta_clients -= 1
+            if not self.delta_clients and not self.recording:
+                self.encoder = None
+
+    def start_stream(self):
+        """Begin encoding the delta stream from a keyframe of the current state"""
+        if self.encoder is None:
+            self.encoder = StreamEncoder(self.engine)
+            data = self.encoder.take()
+            if self.recording:
+                self.recording.write(data)
+
+    def keyframe(self, client=None):
+        """Full game state, sent on join, restart and after a stall"""
+        if client and client.delta:
+            return bytes(self.encoder.keyframe())
+        engine = self.engine
+        return encode({
+            'type': 'state',
+            'room': self.name,
+            'mode': engine.game_mode.name,
+            'grid': engine.GRID_SIZE,
+            'seed': engine.seed,
+            'tick': engine.moves_count,
+            'snake': list(engine.snake),
+            'direction': engine.snake_direction,
+            'food': engine.food,
+            'obstacles': engine.obstacles,
+            'powerups': [[*pos, kind.value] for pos, kind in engine.powerups.items()],
+            'active_powerup': engine.active_powerup.value if engine.active_powerup else None,
+            'powerup_timer': engine.powerup_timer,
+            'score': engine.score,
+            'time_remaining': engine.time_remaining,
+            'done': engine.done,
+        })
+
+    def tick(self):
+        """Advance the game one step"""
+        engine = self.engine
+        turn = self.inputs.pop(engine.snake_direction)
+        engine.step(turn[0] if turn else None)
+        if self.encoder:
+            self.encoder.tick()
+
+    def tick_line(self):
+        """JSON line for the tick just taken"""
+        engine = self.engine
+
+        # Formatted by hand: json.dumps would be most of the cost of a tick
+        head_x, head_y = engine.snake[0]
+        food = f"[{engine.food[0]},{engine.food[1]}]" if engine.food else "null"
+        line = (f'{{"type":"{"over" if engine.done else "tick"}","tick":{engine.moves_count},'
+                f'"head":[{head_x},{head_y}],"length":{len(engine.snake)},"food":{food},'
+                f'"score":{engine.score}')
+
+        extra = {}
+        if engine.powerups != self.powerups_sent:
+            self.powerups_sent = dict(engine.powerups)
+            extra['powerups'] = [[*pos, kind.value] for pos, kind in engine.powerups.items()]
+        if engine.active_powerup:
+            extra['powerup'] = [engine.active_powerup.value, engine.powerup_timer]
+        if engine.game_mode == GameMode.TIME_ATTACK:
+            extra['time_remaining'] = engine.time_remaining
+        if extra:
+            line += "," + json.dumps(extra, separators=(',', ':'))[1:-1]
+        return (line + "}\n").encode()
+
+    def broadcast(self, now):
+        """Send the last tick to every client keeping up; resync or drop the rest"""
+        delta = self.encoder.take() if self.encoder else None
+        if self.recording:
+            self.recording.write(delta)
+        line = self.tick_line() if len(self.clients) > self.delta_clients else None
+
+        for client in tuple(self.clients):
+            buffered = client.writer.transport.get_write_buffer_size()
+            if client.stalled_since is None:
+                if buffered <= HIGH_WATER:
+                    client.send(delta if client.delta else line)
+                    continue
+                client.stalled_since = now
+            elif buffered <= LOW_WATER:
+                # Caught up: it missed ticks, so start it over from a keyframe
+                client.stalled_since = None
+                client.send(self.keyframe(client))
+                continue
+            if now - client.stalled_since > STALL_SECONDS:
+                client.writer.close()
+
+
+class TickGroup:
+    """Every room ticking at one period, advanced together in a single pass.
+
+    One timer wakes the whole group, so the per-tick overhead of the event
+    loop is paid once per period rather than once per room. A TickClock
+    keeps the period from drifting; a pass that is still running when the
+    next one is due counts as an overrun.
+    """
+
+    def __init__(self, server, period_ms):
+        self.server = server
+        self.period_ms = period_ms
+        self.rooms = set()
+        self.clock = TickClock(timer=time.perf_counter)
+        self.pass_ms = deque(maxlen=240)
+        self.overruns = 0
+        self.task = None
+
+    def add(self, room):
+        self.rooms.add(room)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def run(self):
+        clock = self.clock
+        clock.start()
+        while self.rooms:
+            await asyncio.sleep(clock.wait_ms(self.period_ms) / 1000)
+            clock.advance()
+            while self.rooms and clock.due(self.period_ms):
+                start = clock.timer()
+                self.tick()
+                end = clock.timer()
+                self.pass_ms.append((end - start) * 1000)
+                if clock.accumulator + end - clock.last >= self.period_ms / 1000:
+                    self.overruns += 1
+
+    def tick(self):
+        """Step every room once and broadcast the results"""
+        now = self.clock.timer()
+        for room in tuple(self.rooms):
+            try:
+                room.tick()
+                room.broadcast(now)
+            except Exception as e:
+                # Stop this room only; the rest of the group keeps ticking
+                print(f"Error ticking room {room.name}: {e}")
+                self.rooms.discard(room)
+                continue
+            if room.engine.done:
+                self.rooms.discard(room)
+            elif room.engine.game_speed != self.period_ms:
+                # Speed mode or a powerup changed the rate: move groups
+                self.rooms.discard(room)
+                self.server.schedule(room)
+
+    def stats(self):
+        stats = self.clock.stats() or {}
+        passes = sorted(self.pass_ms)
+        stats.update({
+            'period_ms': self.period_ms,
+            'rooms': len(self.rooms),
+            'overruns': self.overruns,
+            'pass_ms_p50': passes[len(passes) // 2] if passes else 0,
+            'pass_ms_max': passes[-1] if passes else 0,
+        })
+        return stats
+
+
+class GameServer:
+    """Many rooms served from one event loop.
+
+    Clients send JSON lines: {"join": room, "mode": "CLASSIC", "seed": 1}
+    (room names match ROOM_NAME; mode and seed only matter for a new
+    room), {"turn": "Up"}, {"restart": true}, {"leave": true} and
+    {"stats": true}. The server answers a join with a full "state" message
+    and then sends one "tick" line per game tick (head, length, food, score
+    and anything else that changed), ending with "over".
+
+    A join with "delta": true switches the connection to the binary feed
+    from stream.py instead: from then on the server sends only stream
+    records, starting with a keyframe. With record_dir set, every room's
+    stream is also written to <record_dir>/<room>.snks.
+    """
+
+    def __init__(self, grid_size=20, record_dir=None):
+        self.grid_size = grid_size
+        self.record_dir = record_dir
+        self.rooms = {}
+        self.groups = {}  # period in ms -> TickGroup
+
+    def schedule(self, room):
+        """Put a running room in the group for its current tick period"""
+        period = room.engine.game_speed
+        group = self.groups.get(period)
+        if group is None:
+            group = self.groups[period] = TickGroup(self, period)
+        group.add(room)
+
+    def unschedule(self, room):
+        group = self.groups.get(room.engine.game_speed)
+        if group:
+            group.rooms.discard(room)
+
+    def join(self, client, name, mode, seed=None, delta=False):
+        self.leave(client)
+        room = self.rooms.get(name)
+        if room is None:
+            room = self.rooms[name] = Room(name, mode, seed, self.grid_size)
+            if self.record_dir:
+                try:
+                    room.recording = open(os.path.join(self.record_dir, f"{name}.snks"), 'ab')
+                    room.start_stream()
+                except OSError as e:
+                    print(f"Error recording room {name}: {e}")
+            self.schedule(room)
+        client.delta = delta
+        room.add(client)
+        client.room = room
+        client.send(room.keyframe(client))
+
+    def leave(self, client):
+        room = client.room
+        if room is None:
+            return
+        room.remove(client)
+        client.room = None
+        if not room.clients:
+            self.unschedule(room)
+            if room.recording:
+                room.recording.close()
+            del self.rooms[room.name]
+
+    def restart(self, room):
+        self.unschedule(room)
+        room.engine.reset(room.engine.game_mode)
+        room.inputs.clear()
+        delta = None
+        if room.encoder:
+            room.encoder.reset()
+            delta = room.encoder.take()
+            if room.recording:
+                room.recording.write(delta)
+        line = room.keyframe()
+        for client in room.clients:
+            client.send(delta if client.delta else line)
+        self.schedule(room)
+
+    def stats(self):
+        """Rooms, clients and per-group tick stats"""
+        return {
+            'rooms': len(self.rooms),
+            'clients': sum(len(room.clients) for room in self.rooms.values()),
+            'groups': [group.stats() for group in self.groups.values() if group.rooms],
+        }
+
+    def handle(self, client, message):
+        """Apply one client message"""
+        room = client.room
+        if 'turn' in message:
+            if room and message['turn'] in ("Up", "Down", "Left", "Right"):
+                room.inputs.push(message['turn'], room.engine.snake_direction, 0)
+        elif 'join' in message:
+            name = message['join']
+            if not isinstance(name, str) or not ROOM_NAME.fullmatch(name):
+                client.reply({'type': 'error', 'error': "room names are 1-64 letters, digits, '_' or '-'"})
+                return
+            mode = GameMode.__members__.get(message.get('mode', 'CLASSIC'))
+            if mode is None:
+                client.reply({'type': 'error', 'error': f"unknown mode {message['mode']}"})
+                return
+            seed = message.get('seed')
+            if seed is not None and not valid_seed(seed):
+                client.reply({'type': 'error', 'error': f"seed must be an integer from 0 to 2**64-1, not {seed!r}"})
+                return
+            self.join(client, name, mode, seed, bool(message.get('delta')))
+        elif 'restart' in message:
+            if room and room.engine.done:
+                self.restart(room)
+        elif 'leave' in message:
+            self.leave(client)
+        elif 'stats' in message:
+            client.reply({'type': 'stats', **self.stats()})
+
+    async def serve_client(self, reader, writer):
+        client = Client(reader, writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    self.handle(client, json.loads(line))
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    client.reply({'type': 'error', 'error': str(e)})
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            self.leave(client)
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, path=None, stats_every=0):
+        if path:
+            server = await asyncio.start_unix_server(self.serve_client, path, limit=MAX_LINE)
+        else:
+            server = await asyncio.start_server(self.serve_client, host, port, limit=MAX_LINE)
+        async with server:
+            if stats_every:
+                asyncio.create_task(self.print_stats(stats_every))
+            await server.serve_forever()
+
+    async def print_stats(self, every):
+        while True:
+            await asyncio.sleep(every)
+            stats = self.stats()
+            print(f"{stats['rooms']} rooms, {stats['clients']} clients")
+            for group in stats['groups']:
+                print(f"  {group['period_ms']} ms: {group['rooms']} rooms, "
+                      f"{group.get('ticks_per_second', 0):.1f} ticks/s, "
+                      f"pass p50 {group['pass_ms_p50']:.2f} ms max {group['pass_ms_max']:.2f} ms, "
+                      f"{group['overruns']} overruns, {group.get('dropped', 0)} dropped")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Host many snake games over TCP or a Unix socket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--grid", type=int, default=20, help="board size for new rooms")
+    parser.add_argument("--stats", type=float, default=0, help="print tick stats every N seconds")
+    parser.add_argument("--record", help="append every room's delta stream to <dir>/<room>.snks")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(GameServer(args.grid, args.record).serve(args.host, args.port, args.unix, args.stats))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
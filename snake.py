@@ -1,35 +1,53 @@
+import argparse
 import tkinter as tk
 from tkinter import font as tkfont
-import random
-import json
 import os
-from datetime import datetime
-from enum import Enum
-
-class GameMode(Enum):
-    CLASSIC = "Classic"
-    SPEED = "Speed Mode"
-    OBSTACLES = "Obstacles"
-    TIME_ATTACK = "Time Attack"
-    ZEN = "Zen Mode"
-
-class PowerUpType(Enum):
-    SPEED_BOOST = "speed_boost"
-    SLOW_DOWN = "slow_down"
-    SCORE_MULTIPLIER = "score_multiplier"
-    INVINCIBLE = "invincible"
+import random
+import time
+from array import array
+
+from clock import TickClock
+from engine import OBSTACLE, POWERUP_DURATION, GameMode, PowerUpType, SnakeEngine
+from inputs import InputQueue, LatencyHistogram
+from particles import ParticlePool
+from replay import Replay
+from rewind import RewindBuffer
+
+# Ticks moved per arrow key on the review screen
+REVIEW_STEPS = {"Left": -1, "Right": 1, "Down": -100, "Up": 100}
+
+# Font name -> tkfont.Font options, see FontCache
+FONTS = {
+    'title': {'family': 'Helvetica', 'size': 48, 'weight': 'bold'},
+    'subtitle': {'family': 'Helvetica', 'size': 24, 'weight': 'bold'},
+    'button': {'family': 'Helvetica', 'size': 16, 'weight': 'bold'},
+    'score': {'family': 'Helvetica', 'size': 20, 'weight': 'bold'},
+    'small': {'family': 'Helvetica', 'size': 12},
+    'tiny': {'family': 'Helvetica', 'size': 10},
+}
+
+
+class FontCache(dict):
+    """Fonts by name, each created the first time it is looked up"""
+
+    def __missing__(self, name):
+        font = self[name] = tkfont.Font(**FONTS[name])
+        return font
+
 
 class SnakeGame:
-    def __init__(self, root):
+    def __init__(self, root, grid_size=20, low_latency=False):
         self.root = root
         self.root.title("🐍 Snake Game - Ultimate Edition")
         self.root.configure(bg='#0a0e27')
 
         # Game constants
-        self.GRID_SIZE = 20
+        self.GRID_SIZE = grid_size
         self.CELL_SIZE = 25
-        self.CANVAS_WIDTH = self.GRID_SIZE * self.CELL_SIZE
-        self.CANVAS_HEIGHT = self.GRID_SIZE * self.CELL_SIZE
+        self.VIEW_SIZE = min(grid_size, 20)  # cells on screen; bigger boards scroll
+        self.CAMERA_MARGIN = self.VIEW_SIZE // 4
+        self.CANVAS_WIDTH = self.VIEW_SIZE * self.CELL_SIZE
+        self.CANVAS_HEIGHT = self.VIEW_SIZE * self.CELL_SIZE
 
         # Color scheme - glassmorphism/liquid glass
         self.COLORS = {
@@ -57,30 +75,55 @@ class SnakeGame:
 
         # Game state
         self.current_screen = "menu"  # menu, game, game_over
-        self.game_mode = GameMode.CLASSIC
-        self.snake = []
-        self.snake_direction = "Right"
-        self.next_direction = "Right"
-        self.food = None
-        self.obstacles = []
-        self.powerups = []
-        self.active_powerup = None
-        self.powerup_timer = 0
+        self.engine = SnakeEngine(self.GRID_SIZE)
+        self.replay = None
+        self.rewind = RewindBuffer()  # recent ticks, see step_back and review
+        self.rewinding = False  # BackSpace held
+        self.autopilot = None  # steers the snake while set, toggled with P
+        self.clock = TickClock()
+        self.loop_id = None  # pending root.after for update_game
+        self.draw_pending = False
+        self.inputs = InputQueue()
+        self.low_latency = low_latency  # tick early for turns pressed late in the interval
+        self.latency = LatencyHistogram()  # keypress to rendered move, in ms
+        self.applied_presses = []  # keypress times of turns ticked but not yet drawn
         self.running = False
         self.paused = False
-        self.score = 0
-        self.high_scores = self.load_high_scores()
-        self.game_speed = 150
-        self.base_speed = 150
-        self.time_remaining = 0
-        self.start_time = 0
-        self.moves_count = 0
-        self.food_eaten = 0
-        self.score_multiplier = 1
+        self.scores = None  # opened on first use, see score_store
+        self.mode_best = None  # best run for the mode being played
 
         # Animation state
-        self.particle_effects = []
+        self.particles = ParticlePool(capacity=64)
         self.animation_frame = 0
+        self.fx_rng = random.Random()  # cosmetic only, never touches gameplay
+
+        # PhotoImages for static art, see gradient_image
+        self.image_cache = {}
+
+        # Canvas items kept alive between ticks, see draw_game
+        self.static_keys = {}
+        self.needs_redraw = True
+        self.camera = (0, 0)  # board cell at the top-left of the view
+        self.segment_serials = array('i')  # per cell, see rebuild_segment_serials
+        self.tiles = {}  # cell index -> (item, style)
+        self.free_tiles = []
+        self.food_visible = True
+        self.eyes_visible = True
+        self.sidebar_items = {}  # see draw_sidebar
+        self.sidebar_shown = {}
+        self.sidebar_lowered = False
+        self.sidebar_bar = (0, 0, 0)  # timer bar x, y and full width
+        self.powerup_items = {}
+        self.food_items = ()
+        self.eye_items = ()
+        self.particle_items = []
+        self.particle_shown = []
+
+        # Span timings, on with F3 or SNAKE_PROFILE=<dump path>
+        self.profiler = None
+        self.profile_path = os.environ.get('SNAKE_PROFILE')
+        self.profile_item = None
+        self.profile_frames = 0
 
         # Setup UI
         self.setup_fonts()
@@ -98,17 +141,33 @@ class SnakeGame:
         self.root.bind("<d>", lambda e: self.queue_direction("Right"))
         self.root.bind("<space>", lambda e: self.toggle_pause())
         self.root.bind("<Escape>", lambda e: self.show_menu())
+        self.root.bind("<p>", lambda e: self.toggle_autopilot())
+        self.root.bind("<F3>", lambda e: self.toggle_profiler())
+        self.root.bind("<KeyPress-BackSpace>", lambda e: self.hold_rewind(True))
+        self.root.bind("<KeyRelease-BackSpace>", lambda e: self.hold_rewind(False))
+
+        if self.profile_path:
+            self.toggle_profiler()
 
     def setup_fonts(self):
-        """Setup custom fonts for the game"""
-        self.fonts = {
-            'title': tkfont.Font(family='Helvetica', size=48, weight='bold'),
-            'subtitle': tkfont.Font(family='Helvetica', size=24, weight='bold'),
-            'button': tkfont.Font(family='Helvetica', size=16, weight='bold'),
-            'score': tkfont.Font(family='Helvetica', size=20, weight='bold'),
-            'small': tkfont.Font(family='Helvetica', size=12),
-            'tiny': tkfont.Font(family='Helvetica', size=10),
-        }
+        """Setup custom fonts for the game, created as screens first use them"""
+        self.fonts = FontCache()
+
+    def score_store(self):
+        """The score database, opened the first time a screen needs it"""
+        if self.scores is None:
+            from scores import ScoreStore
+
+            self.scores = ScoreStore()
+        return self.scores
+
+    def best_score(self, mode):
+        """Best recorded run for a mode, or None if there is none or it can't be read"""
+        try:
+            return self.score_store().best(mode.value)
+        except Exception as e:
+            print(f"Error loading high scores: {e}")
+            return None
 
     def create_ui(self):
         """Create the main UI container"""
@@ -126,25 +185,59 @@ class SnakeGame:
         )
         self.canvas.pack()
 
-    def create_glass_panel(self, x, y, width, height, alpha=0.15):
+    def create_glass_panel(self, x, y, width, height, alpha=0.15, tags="glass_panel"):
         """Create a glassmorphism panel effect"""
-        # Background with slight transparency effect
-        self.canvas.create_rectangle(
-            x, y, x + width, y + height,
-            fill=self.COLORS['bg_gradient_1'],
-            outline=self.COLORS['glass_border'],
-            width=2,
-            tags="glass_panel"
+        return self.canvas.create_image(
+            x - 1, y - 1,
+            image=self.glass_panel_image(width, height),
+            anchor="nw",
+            tags=tags
         )
-        # Inner glow effect
-        self.canvas.create_rectangle(
-            x + 2, y + 2, x + width - 2, y + height - 2,
-            fill='',
-            outline=self.COLORS['glass_border_2'],
-            width=1,
-            tags="glass_panel"
+
+    def glass_panel_image(self, width, height):
+        """Panel fill with its outer border and inner glow, rendered once per size"""
+        colors = (self.COLORS['bg_gradient_1'], self.COLORS['glass_border'], self.COLORS['glass_border_2'])
+        key = ('panel', width, height, colors)
+        image = self.image_cache.get(key)
+        if image is None:
+            fill, border, glow = colors
+            image = tk.PhotoImage(width=width + 2, height=height + 2)
+            # Outer 2px border, then the fill, then a 1px inner glow line
+            image.put(border, to=(0, 0, width + 2, height + 2))
+            image.put(fill, to=(2, 2, width, height))
+            image.put(glow, to=(3, 3, width - 1, height - 1))
+            image.put(fill, to=(4, 4, width - 2, height - 2))
+            self.image_cache[key] = image
+        return image
+
+    def draw_background(self, tags):
+        """Fill the canvas with the menu background gradient"""
+        self.canvas.create_image(
+            0, 0,
+            image=self.gradient_image(self.CANVAS_WIDTH + 300, self.CANVAS_HEIGHT,
+                                      (10, 14, 39), (29, 53, 97)),
+            anchor="nw",
+            tags=tags
         )
 
+    def gradient_image(self, width, height, top, bottom):
+        """Vertical gradient image, rendered once per size and palette"""
+        key = ('gradient', width, height, top, bottom)
+        image = self.image_cache.get(key)
+        if image is None:
+            rows = []
+            for i in range(height):
+                color_ratio = i / height
+                r, g, b = (int(a + (z - a) * color_ratio) for a, z in zip(top, bottom))
+                rows.append(f'{{#{r:02x}{g:02x}{b:02x}}}')
+
+            # One pixel wide column, stretched to the full width
+            column = tk.PhotoImage(width=1, height=height)
+            column.put(' '.join(rows), to=(0, 0))
+            image = column.zoom(width, 1)
+            self.image_cache[key] = image
+        return image
+
     def create_gradient_rect(self, x, y, width, height, colors, tags=""):
         """Create a gradient rectangle effect"""
         steps = len(colors) - 1
@@ -201,20 +294,11 @@ class SnakeGame:
         self.current_screen = "menu"
         self.running = False
         self.paused = False
-        self.canvas.delete("all")
+        self.stop_loop()
+        self.clear_screen()
 
         # Background gradient
-        for i in range(self.CANVAS_HEIGHT):
-            color_ratio = i / self.CANVAS_HEIGHT
-            r = int(10 + (29 - 10) * color_ratio)
-            g = int(14 + (53 - 14) * color_ratio)
-            b = int(39 + (97 - 39) * color_ratio)
-            color = f'#{r:02x}{g:02x}{b:02x}'
-            self.canvas.create_line(
-                0, i, self.CANVAS_WIDTH + 300, i,
-                fill=color,
-                tags="background"
-            )
+        self.draw_background(tags="background")
 
         # Main glass panel
         panel_width = 400
@@ -288,7 +372,7 @@ class SnakeGame:
         controls_y = panel_y + panel_height + 20
         self.canvas.create_text(
             panel_x + panel_width // 2, controls_y,
-            text="Controls: Arrow Keys or WASD | Space: Pause | ESC: Menu",
+            text="Controls: Arrow Keys or WASD | Space: Pause | Backspace: Rewind | ESC: Menu",
             fill=self.COLORS['text_secondary'],
             font=self.fonts['tiny'],
             tags="menu"
@@ -296,20 +380,10 @@ class SnakeGame:
 
     def show_high_scores(self):
         """Display high scores screen"""
-        self.canvas.delete("all")
+        self.clear_screen()
 
         # Background
-        for i in range(self.CANVAS_HEIGHT):
-            color_ratio = i / self.CANVAS_HEIGHT
-            r = int(10 + (29 - 10) * color_ratio)
-            g = int(14 + (53 - 14) * color_ratio)
-            b = int(39 + (97 - 39) * color_ratio)
-            color = f'#{r:02x}{g:02x}{b:02x}'
-            self.canvas.create_line(
-                0, i, self.CANVAS_WIDTH + 300, i,
-                fill=color,
-                tags="scores"
-            )
+        self.draw_background(tags="scores")
 
         # Panel
         panel_width = 500
@@ -330,7 +404,11 @@ class SnakeGame:
         # Display scores for each mode
         y_offset = panel_y + 80
         for mode in GameMode:
-            mode_scores = self.high_scores.get(mode.value, [])
+            try:
+                mode_scores = self.score_store().top(mode.value, 3)
+            except Exception as e:
+                print(f"Error loading high scores: {e}")
+                mode_scores = []
 
             self.canvas.create_text(
                 panel_x + 30, y_offset,
@@ -344,7 +422,7 @@ class SnakeGame:
             y_offset += 30
 
             if mode_scores:
-                for i, score_data in enumerate(mode_scores[:3], 1):
+                for i, score_data in enumerate(mode_scores, 1):
                     score_text = f"{i}. Score: {score_data['score']} | Food: {score_data['food']}"
                     self.canvas.create_text(
                         panel_x + 50, y_offset,
@@ -379,104 +457,44 @@ class SnakeGame:
 
     def start_game(self, mode):
         """Start a new game with the selected mode"""
-        self.game_mode = mode
         self.current_screen = "game"
         self.running = True
         self.paused = False
-        self.score = 0
-        self.moves_count = 0
-        self.food_eaten = 0
-        self.score_multiplier = 1
-        self.obstacles = []
-        self.powerups = []
-        self.active_powerup = None
-        self.powerup_timer = 0
-
-        # Initialize snake in the center
-        center_x = self.GRID_SIZE // 2
-        center_y = self.GRID_SIZE // 2
-        self.snake = [(center_x, center_y), (center_x - 1, center_y), (center_x - 2, center_y)]
-        self.snake_direction = "Right"
-        self.next_direction = "Right"
-
-        # Set game speed based on mode
-        if mode == GameMode.SPEED:
-            self.game_speed = 150
-            self.base_speed = 150
-        elif mode == GameMode.ZEN:
-            self.game_speed = 120
-            self.base_speed = 120
-        else:
-            self.game_speed = 100
-            self.base_speed = 100
+        self.engine.reset(mode)
+        self.replay = Replay.for_engine(self.engine)
+        self.rewind.start(self.engine)
+        self.rewinding = False
+        self.mode_best = self.best_score(mode)
+        self.particles.clear()
+        self.inputs.clear()
+        self.applied_presses.clear()
+        self.needs_redraw = True
 
-        # Time attack mode
-        if mode == GameMode.TIME_ATTACK:
-            self.time_remaining = 120  # 2 minutes
-            self.start_time = datetime.now()
-
-        # Generate obstacles for obstacles mode
-        if mode == GameMode.OBSTACLES:
-            self.generate_obstacles()
-
-        self.spawn_food()
-        self.update_game()
         self.draw_game()
-
-    def generate_obstacles(self):
-        """Generate random obstacles for obstacles mode"""
-        self.obstacles = []
-        num_obstacles = random.randint(8, 15)
-
-        for _ in range(num_obstacles):
-            while True:
-                x = random.randint(2, self.GRID_SIZE - 3)
-                y = random.randint(2, self.GRID_SIZE - 3)
-                if (x, y) not in self.snake and (x, y) not in self.obstacles:
-                    self.obstacles.append((x, y))
-                    break
-
-    def spawn_food(self):
-        """Spawn food at a random location"""
-        while True:
-            x = random.randint(0, self.GRID_SIZE - 1)
-            y = random.randint(0, self.GRID_SIZE - 1)
-            if (x, y) not in self.snake and (x, y) not in self.obstacles:
-                self.food = (x, y)
-                break
-
-        # Occasionally spawn powerups
-        if random.random() < 0.15 and len(self.powerups) < 2:
-            self.spawn_powerup()
-
-    def spawn_powerup(self):
-        """Spawn a random powerup"""
-        while True:
-            x = random.randint(0, self.GRID_SIZE - 1)
-            y = random.randint(0, self.GRID_SIZE - 1)
-            if ((x, y) not in self.snake and (x, y) not in self.obstacles
-                and (x, y) != self.food and (x, y) not in [p[0] for p in self.powerups]):
-                powerup_type = random.choice(list(PowerUpType))
-                self.powerups.append(((x, y), powerup_type))
-                break
+        self.start_loop()
 
     def queue_direction(self, direction):
         """Queue the next direction change"""
+        if self.current_screen == "review":
+            self.review_seek(REVIEW_STEPS[direction])
+            return
         if not self.running or self.paused:
             return
 
-        opposites = {"Up": "Down", "Down": "Up", "Left": "Right", "Right": "Left"}
-        if direction != opposites.get(self.snake_direction):
-            self.next_direction = direction
+        if self.inputs.push(direction, self.engine.snake_direction, time.perf_counter_ns()):
+            if self.low_latency:
+                self.tick_early()
 
     def toggle_pause(self):
         """Toggle pause state"""
         if self.running and self.current_screen == "game":
             self.paused = not self.paused
             if self.paused:
+                self.stop_loop()
                 self.draw_pause_menu()
             else:
-                self.update_game()
+                self.canvas.delete("pause")
+                self.start_loop()
 
     def draw_pause_menu(self):
         """Draw pause menu overlay"""
@@ -518,456 +536,622 @@ class SnakeGame:
             tags="pause"
         )
 
+    def start_loop(self):
+        """(Re)start the game loop with the first tick one period from now"""
+        self.stop_loop()
+        self.clock.start()
+        self.draw_pending = False
+        self.loop_id = self.root.after(self.engine.game_speed, self.update_game)
+
+    def stop_loop(self):
+        """Cancel the pending game loop callback, if any"""
+        if self.loop_id is not None:
+            self.root.after_cancel(self.loop_id)
+            self.loop_id = None
+
     def update_game(self):
-        """Main game loop"""
+        """Main game loop: run every tick that is due, then draw at most once"""
+        self.loop_id = None
         if not self.running or self.paused:
             return
 
-        # Update direction
-        self.snake_direction = self.next_direction
-        self.moves_count += 1
-
-        # Calculate new head position
-        head_x, head_y = self.snake[0]
-
-        if self.snake_direction == "Up":
-            head_y -= 1
-        elif self.snake_direction == "Down":
-            head_y += 1
-        elif self.snake_direction == "Left":
-            head_x -= 1
-        elif self.snake_direction == "Right":
-            head_x += 1
-
-        # Zen mode - wrap around edges
-        if self.game_mode == GameMode.ZEN:
-            head_x = head_x % self.GRID_SIZE
-            head_y = head_y % self.GRID_SIZE
-
-        new_head = (head_x, head_y)
-
-        # Check collisions
-        if self.game_mode != GameMode.ZEN:
-            # Wall collision
-            if (head_x < 0 or head_y < 0 or
-                head_x >= self.GRID_SIZE or head_y >= self.GRID_SIZE):
-                if self.active_powerup != PowerUpType.INVINCIBLE:
-                    self.game_over()
-                    return
-
-        # Self collision
-        if new_head in self.snake[1:]:
-            if self.active_powerup != PowerUpType.INVINCIBLE:
-                self.game_over()
+        clock = self.clock
+        clock.advance()
+        while clock.due(self.engine.game_speed):
+            if not self.tick():
                 return
+            self.draw_pending = True
+        self.present()
 
-        # Obstacle collision
-        if new_head in self.obstacles:
-            if self.active_powerup != PowerUpType.INVINCIBLE:
-                self.game_over()
-                return
+    def tick_early(self):
+        """Run the next tick now if enough of its interval has already passed"""
+        if self.loop_id is None or not self.clock.early(self.engine.game_speed):
+            return
+        self.stop_loop()
+        if not self.tick():
+            return
+        self.draw_pending = True
+        self.present()
+
+    def present(self):
+        """Draw if a frame is due, then schedule the next loop pass"""
+        clock = self.clock
+
+        # Ticks that land within one display frame share a render
+        if self.draw_pending and clock.frame_ready():
+            self.draw_game()
+            clock.rendered()
+            self.draw_pending = False
+            if self.applied_presses:
+                # Idle callbacks run in order, so this one follows the canvas redisplay
+                presses, self.applied_presses = self.applied_presses, []
+                self.root.after_idle(lambda: self.record_latency(presses))
+            if self.profiler:
+                self.draw_profile_overlay()
 
-        # Move snake
-        self.snake.insert(0, new_head)
-
-        # Check food collision
-        ate_food = False
-        if new_head == self.food:
-            ate_food = True
-            self.food_eaten += 1
-            self.score += 10 * self.score_multiplier
-            self.spawn_food()
-            self.create_particle_effect(new_head, self.COLORS['food'])
-
-            # Speed mode - increase speed
-            if self.game_mode == GameMode.SPEED:
-                self.game_speed = max(50, self.game_speed - 3)
-
-        if not ate_food:
-            self.snake.pop()
-
-        # Check powerup collision
-        for i, (pos, powerup_type) in enumerate(self.powerups):
-            if new_head == pos:
-                self.activate_powerup(powerup_type)
-                self.powerups.pop(i)
-                self.create_particle_effect(new_head, self.COLORS['powerup_score'])
-                break
-
-        # Update powerup timer
-        if self.active_powerup:
-            self.powerup_timer -= 1
-            if self.powerup_timer <= 0:
-                self.deactivate_powerup()
-
-        # Remove old powerups
-        self.powerups = [p for p in self.powerups if random.random() > 0.01]
-
-        # Update time for time attack
-        if self.game_mode == GameMode.TIME_ATTACK:
-            elapsed = (datetime.now() - self.start_time).total_seconds()
-            self.time_remaining = max(0, 120 - int(elapsed))
-            if self.time_remaining <= 0:
-                self.game_over()
-                return
+        # Continue game loop
+        delay = clock.wait_ms(self.engine.game_speed)
+        if self.draw_pending:
+            delay = min(delay, clock.frame_wait_ms())
+        self.loop_id = self.root.after(delay, self.update_game)
+
+    def toggle_autopilot(self):
+        """Hand the steering to the pathfinding autopilot, or take it back"""
+        from bots import Autopilot
+
+        self.autopilot = None if self.autopilot else Autopilot(random.Random())
+
+    def record_latency(self, presses):
+        """Log keypress-to-screen times for the turns just drawn"""
+        now = time.perf_counter_ns()
+        for pressed_ns in presses:
+            self.latency.record((now - pressed_ns) / 1e6)
+
+    def hold_rewind(self, held):
+        """Rewind one tick per tick while BackSpace is held"""
+        self.rewinding = held and self.running
+
+    def step_back(self):
+        """Undo the last tick, as far back as the rewind buffer reaches"""
+        engine = self.engine
+        if engine.moves_count > self.rewind.first_tick:
+            self.rewind.seek(engine, engine.moves_count - 1)
+            self.replay.truncate(engine.moves_count)
+            self.inputs.clear()
+            for slot in self.particles.live_slots():
+                self.canvas.itemconfig(self.particle_items[slot], state='hidden')
+            self.particles.clear()
+        return True
+
+    def tick(self):
+        """Advance the game one step; False once it is over"""
+        if self.rewinding:
+            return self.step_back()
+
+        # At most one queued turn per tick; the autopilot overrides the keys
+        turn = self.inputs.pop(self.engine.snake_direction)
+        if self.autopilot:
+            direction = self.autopilot.choose(self.engine)
+            if direction:
+                self.engine.turn(direction)
+        elif turn:
+            direction, pressed_ns = turn
+            self.engine.turn(direction)
+            self.applied_presses.append(pressed_ns)
+
+        _, _, done = self.engine.step()
+        self.replay.append(self.engine.snake_direction)
+        self.rewind.record(self.engine)
+        if done:
+            self.game_over()
+            return False
+
+        for kind, position in self.engine.events:
+            color = self.COLORS['food'] if kind == "food" else self.COLORS['powerup_score']
+            self.create_particle_effect(position, color)
 
         # Update animation frame
         self.animation_frame = (self.animation_frame + 1) % 360
-
-        # Continue game loop
-        self.draw_game()
-        self.root.after(self.game_speed, self.update_game)
-
-    def activate_powerup(self, powerup_type):
-        """Activate a powerup"""
-        self.active_powerup = powerup_type
-        self.powerup_timer = 100  # ~10 seconds depending on speed
-
-        if powerup_type == PowerUpType.SPEED_BOOST:
-            self.game_speed = max(30, self.game_speed // 2)
-        elif powerup_type == PowerUpType.SLOW_DOWN:
-            self.game_speed = min(300, self.game_speed * 2)
-        elif powerup_type == PowerUpType.SCORE_MULTIPLIER:
-            self.score_multiplier = 2
-
-    def deactivate_powerup(self):
-        """Deactivate current powerup"""
-        if self.active_powerup == PowerUpType.SPEED_BOOST:
-            self.game_speed = self.base_speed
-        elif self.active_powerup == PowerUpType.SLOW_DOWN:
-            self.game_speed = self.base_speed
-        elif self.active_powerup == PowerUpType.SCORE_MULTIPLIER:
-            self.score_multiplier = 1
-
-        self.active_powerup = None
-        self.powerup_timer = 0
+        return True
 
     def create_particle_effect(self, position, color):
         """Create particle effect at position"""
-        for _ in range(8):
-            angle = random.uniform(0, 360)
-            speed = random.uniform(2, 5)
-            self.particle_effects.append({
-                'x': position[0],
-                'y': position[1],
-                'dx': speed * random.choice([-1, 1]),
-                'dy': speed * random.choice([-1, 1]),
-                'life': 20,
-                'color': color
-            })
+        self.particles.emit(position, color, self.fx_rng)
 
     def draw_game(self):
-        """Draw the complete game state"""
-        self.canvas.delete("all")
-
-        # Draw game area background
-        self.canvas.create_rectangle(
-            0, 0, self.CANVAS_WIDTH, self.CANVAS_HEIGHT,
-            fill=self.COLORS['bg_dark'],
-            outline=''
-        )
-
-        # Draw grid
-        for i in range(self.GRID_SIZE + 1):
-            # Vertical lines
-            self.canvas.create_line(
-                i * self.CELL_SIZE, 0,
-                i * self.CELL_SIZE, self.CANVAS_HEIGHT,
-                fill=self.COLORS['bg_gradient_1'],
-                width=1
-            )
-            # Horizontal lines
-            self.canvas.create_line(
-                0, i * self.CELL_SIZE,
-                self.CANVAS_WIDTH, i * self.CELL_SIZE,
-                fill=self.COLORS['bg_gradient_1'],
-                width=1
-            )
-
-        # Draw obstacles
-        for x, y in self.obstacles:
-            px, py = x * self.CELL_SIZE, y * self.CELL_SIZE
-            self.canvas.create_rectangle(
-                px + 2, py + 2, px + self.CELL_SIZE - 2, py + self.CELL_SIZE - 2,
-                fill=self.COLORS['obstacle'],
-                outline=self.COLORS['glass_border'],
-                width=2
-            )
-
-        # Draw food with glow effect
-        if self.food:
-            fx, fy = self.food
-            px, py = fx * self.CELL_SIZE, fy * self.CELL_SIZE
+        """Bring the canvas up to date with the game state.
+
+        Only the VIEW_SIZE x VIEW_SIZE cells around the head are drawn. A
+        fixed pool of tile items covers them: every frame the occupancy grid
+        is scanned inside the view and only tiles whose cell or look changed
+        are touched. When the camera scrolls, everything on the board moves
+        with one canvas.move. The whole canvas is only rebuilt after a
+        screen change.
+        """
+        if self.needs_redraw:
+            self.redraw_game()
+            return
 
-            # Glow effect
-            glow_size = 5 + abs((self.animation_frame % 60) - 30) // 10
+        self.update_segment_serials()
+        self.update_camera()
+        self.update_tiles()
+        self.update_eye_items()
+        self.update_food_items()
+        self.update_powerup_items()
+        self.draw_particles()
+
+        self.update_sidebar()
+
+    def redraw_game(self):
+        """Rebuild every dynamic game canvas item from scratch"""
+        self.canvas.delete("!static")
+        self.profile_item = None
+        self.tiles = {}
+        self.free_tiles = []
+        self.needs_redraw = False
+        self.update_static_layer()
+        self.rebuild_segment_serials()
+        self.update_camera(center=True)
+
+        # Food with glow effect
+        self.food_items = (
             self.canvas.create_oval(
-                px - glow_size, py - glow_size,
-                px + self.CELL_SIZE + glow_size, py + self.CELL_SIZE + glow_size,
-                fill='', outline=self.COLORS['food_glow'], width=2
-            )
-
-            # Food
+                0, 0, 0, 0,
+                fill='', outline=self.COLORS['food_glow'], width=2,
+                tags=("world", "food")
+            ),
             self.canvas.create_oval(
-                px + 3, py + 3, px + self.CELL_SIZE - 3, py + self.CELL_SIZE - 3,
+                0, 0, 0, 0,
                 fill=self.COLORS['food'],
                 outline=self.COLORS['food_glow'],
-                width=2
-            )
+                width=2,
+                tags=("world", "food")
+            ),
+        )
+        self.rendered_food = None
+        self.food_visible = True
+        self.update_food_items()
+
+        # Powerups
+        self.powerup_items = {}
+        self.update_powerup_items()
+
+        # One hidden tile per visible cell, for snake segments and obstacles
+        self.tiles = {}
+        self.free_tiles = [
+            self.canvas.create_rectangle(0, 0, 0, 0, state='hidden', tags=("world", "tile"))
+            for _ in range(self.VIEW_SIZE * self.VIEW_SIZE)
+        ]
+        self.update_tiles()
+
+        # Eyes
+        self.eye_items = (
+            self.canvas.create_oval(0, 0, 0, 0, fill='white', tags=("world", "eye")),
+            self.canvas.create_oval(0, 0, 0, 0, fill='white', tags=("world", "eye")),
+        )
+        self.eyes_visible = True
+        self.update_eye_items()
 
-        # Draw powerups
-        for (x, y), powerup_type in self.powerups:
-            px, py = x * self.CELL_SIZE, y * self.CELL_SIZE
+        # One hidden oval per particle slot, shown while the slot is live
+        self.particle_items = [
+            self.canvas.create_oval(0, 0, 0, 0, outline='', state='hidden', tags=("world", "particle"))
+            for _ in range(self.particles.capacity)
+        ]
+        self.particle_shown = [(None, None)] * self.particles.capacity  # (serial, size)
 
-            color_map = {
-                PowerUpType.SPEED_BOOST: self.COLORS['powerup_speed'],
-                PowerUpType.SLOW_DOWN: self.COLORS['powerup_slow'],
-                PowerUpType.SCORE_MULTIPLIER: self.COLORS['powerup_score'],
-                PowerUpType.INVINCIBLE: self.COLORS['powerup_invincible'],
-            }
+        self.draw_particles()
+        self.draw_sidebar()
 
-            symbol_map = {
-                PowerUpType.SPEED_BOOST: "⚡",
-                PowerUpType.SLOW_DOWN: "🐌",
-                PowerUpType.SCORE_MULTIPLIER: "✨",
-                PowerUpType.INVINCIBLE: "🛡️",
-            }
+    def update_static_layer(self):
+        """Show the background and grid, rebuilding them only if they changed
 
-            color = color_map.get(powerup_type, self.COLORS['powerup_score'])
+        These items stay on the canvas across ticks, games and screens
+        (hidden while a menu is up), tagged "static" and kept below
+        everything else. They cover the view, not the board, so scrolling
+        never touches them.
+        """
+        grid_key = (self.VIEW_SIZE, self.CELL_SIZE, self.COLORS['bg_dark'], self.COLORS['bg_gradient_1'])
+        if grid_key != self.static_keys.get('grid'):
+            self.canvas.delete("grid")
+            self.static_keys['grid'] = grid_key
+
+            # Draw game area background
             self.canvas.create_rectangle(
-                px + 2, py + 2, px + self.CELL_SIZE - 2, py + self.CELL_SIZE - 2,
-                fill=color,
-                outline=self.COLORS['glass_border'],
-                width=2
+                0, 0, self.CANVAS_WIDTH, self.CANVAS_HEIGHT,
+                fill=self.COLORS['bg_dark'],
+                outline='',
+                tags=("static", "grid")
             )
-            self.canvas.create_text(
-                px + self.CELL_SIZE // 2, py + self.CELL_SIZE // 2,
-                text=symbol_map.get(powerup_type, "?"),
-                fill=self.COLORS['text_primary'],
-                font=self.fonts['small']
-            )
-
-        # Draw snake
-        for i, (x, y) in enumerate(self.snake):
-            px, py = x * self.CELL_SIZE, y * self.CELL_SIZE
 
-            if i == 0:  # Head
-                # Head with gradient
-                self.canvas.create_rectangle(
-                    px + 1, py + 1, px + self.CELL_SIZE - 1, py + self.CELL_SIZE - 1,
-                    fill=self.COLORS['snake_head'],
-                    outline=self.COLORS['glass_border'],
-                    width=2
+            # Draw grid
+            for i in range(self.VIEW_SIZE + 1):
+                # Vertical lines
+                self.canvas.create_line(
+                    i * self.CELL_SIZE, 0,
+                    i * self.CELL_SIZE, self.CANVAS_HEIGHT,
+                    fill=self.COLORS['bg_gradient_1'],
+                    width=1,
+                    tags=("static", "grid")
                 )
-                # Eyes
-                eye_offset = 6
-                if self.snake_direction == "Right":
-                    eye1 = (px + self.CELL_SIZE - 8, py + eye_offset)
-                    eye2 = (px + self.CELL_SIZE - 8, py + self.CELL_SIZE - eye_offset)
-                elif self.snake_direction == "Left":
-                    eye1 = (px + 8, py + eye_offset)
-                    eye2 = (px + 8, py + self.CELL_SIZE - eye_offset)
-                elif self.snake_direction == "Up":
-                    eye1 = (px + eye_offset, py + 8)
-                    eye2 = (px + self.CELL_SIZE - eye_offset, py + 8)
-                else:  # Down
-                    eye1 = (px + eye_offset, py + self.CELL_SIZE - 8)
-                    eye2 = (px + self.CELL_SIZE - eye_offset, py + self.CELL_SIZE - 8)
-
-                for eye_x, eye_y in [eye1, eye2]:
-                    self.canvas.create_oval(
-                        eye_x - 2, eye_y - 2, eye_x + 2, eye_y + 2,
-                        fill='white'
-                    )
-            else:  # Body
-                # Calculate color gradient
-                color_idx = min(i % len(self.COLORS['snake_gradient']),
-                               len(self.COLORS['snake_gradient']) - 1)
-                color = self.COLORS['snake_gradient'][color_idx]
-
-                self.canvas.create_rectangle(
-                    px + 2, py + 2, px + self.CELL_SIZE - 2, py + self.CELL_SIZE - 2,
-                    fill=color,
-                    outline=self.COLORS['glass_border_2'],
-                    width=1
+                # Horizontal lines
+                self.canvas.create_line(
+                    0, i * self.CELL_SIZE,
+                    self.CANVAS_WIDTH, i * self.CELL_SIZE,
+                    fill=self.COLORS['bg_gradient_1'],
+                    width=1,
+                    tags=("static", "grid")
                 )
 
-        # Draw particle effects
-        active_particles = []
-        for particle in self.particle_effects:
-            if particle['life'] > 0:
-                px = (particle['x'] + particle['dx'] / 10) * self.CELL_SIZE
-                py = (particle['y'] + particle['dy'] / 10) * self.CELL_SIZE
-                size = particle['life'] // 4
-                self.canvas.create_oval(
-                    px - size, py - size, px + size, py + size,
-                    fill=particle['color'],
-                    outline=''
-                )
-                particle['life'] -= 1
-                active_particles.append(particle)
-        self.particle_effects = active_particles
+        self.canvas.tag_lower("static")
+        self.canvas.itemconfigure("static", state="normal")
+
+    def clear_screen(self):
+        """Delete everything except the static playfield, which is hidden"""
+        self.canvas.delete("!static")
+        self.canvas.itemconfigure("static", state="hidden")
+
+    def cell_coords(self, x, y, inset):
+        """Canvas rectangle for a board cell shrunk by inset pixels"""
+        px = (x - self.camera[0]) * self.CELL_SIZE
+        py = (y - self.camera[1]) * self.CELL_SIZE
+        return px + inset, py + inset, px + self.CELL_SIZE - inset, py + self.CELL_SIZE - inset
+
+    def view_rect(self):
+        """Board cells on screen as (x0, y0, x1, y1), end exclusive"""
+        x0, y0 = self.camera
+        return x0, y0, x0 + self.VIEW_SIZE, y0 + self.VIEW_SIZE
+
+    def in_view(self, x, y):
+        """True if a board cell is on screen"""
+        x0, y0, x1, y1 = self.view_rect()
+        return x0 <= x < x1 and y0 <= y < y1
+
+    def update_camera(self, center=False):
+        """Scroll so the head stays CAMERA_MARGIN cells inside the view
+
+        With center set (after a rebuild) the head is put in the middle
+        instead. Boards that fit the view never scroll.
+        """
+        size, view, margin = self.GRID_SIZE, self.VIEW_SIZE, self.CAMERA_MARGIN
+        head_x, head_y = self.engine.snake[0]
+        camera_x, camera_y = self.camera
+        if center:
+            camera_x, camera_y = head_x - view // 2, head_y - view // 2
+        else:
+            camera_x = min(max(camera_x, head_x - view + 1 + margin), head_x - margin)
+            camera_y = min(max(camera_y, head_y - view + 1 + margin), head_y - margin)
+        camera_x = min(max(camera_x, 0), size - view)
+        camera_y = min(max(camera_y, 0), size - view)
+
+        if (camera_x, camera_y) != self.camera:
+            if not center:
+                self.canvas.move("world", (self.camera[0] - camera_x) * self.CELL_SIZE,
+                                 (self.camera[1] - camera_y) * self.CELL_SIZE)
+            self.camera = (camera_x, camera_y)
+
+    def rebuild_segment_serials(self):
+        """Number every on-board snake segment, the head being 0"""
+        size = self.GRID_SIZE
+        if len(self.segment_serials) != size * size:
+            self.segment_serials = array('i', bytes(4 * size * size))
+        serials = self.segment_serials
+
+        # Tail first so the newest segment wins where the snake overlaps itself
+        snake = self.engine.snake
+        for i in range(len(snake) - 1, -1, -1):
+            x, y = snake[i]
+            if 0 <= x < size and 0 <= y < size:
+                serials[y * size + x] = -i
+        self.head_serial = 0
+        self.rendered_moves = self.engine.moves_count
+
+    def update_segment_serials(self):
+        """Number the segments added since the last frame.
+
+        Segment i always has serial head_serial - i, so after a rewind or a
+        long jump renumbering the snake from the head gives the segments
+        still there the serials they had; only tiles whose style changed
+        are then touched.
+        """
+        engine = self.engine
+        moved = engine.moves_count - self.rendered_moves
+        size = self.GRID_SIZE
+        serials = self.segment_serials
+        snake = engine.snake
+        self.head_serial += moved
+        self.rendered_moves = engine.moves_count
+        if 0 <= moved <= len(snake):
+            first = moved - 1
+        else:
+            first = len(snake) - 1
+        # Tail first so the newest segment wins where the snake overlaps itself
+        for i in range(first, -1, -1):
+            x, y = snake[i]
+            if 0 <= x < size and 0 <= y < size:
+                serials[y * size + x] = self.head_serial - i
+
+    def tile_style(self, index, value, head_index):
+        """(fill, outline, width, inset) of a visible occupied cell"""
+        if value & ~OBSTACLE:
+            if index == head_index:
+                return self.COLORS['snake_head'], self.COLORS['glass_border'], 2, 1
+            gradient = self.COLORS['snake_gradient']
+            color = gradient[-self.segment_serials[index] % len(gradient)]
+            return color, self.COLORS['glass_border_2'], 1, 2
+        return self.COLORS['obstacle'], self.COLORS['glass_border'], 2, 2
+
+    def update_tiles(self):
+        """Point the tile pool at the snake segments and obstacles in view"""
+        engine = self.engine
+        size = self.GRID_SIZE
+        head_x, head_y = engine.snake[0]
+        head_index = head_y * size + head_x
+
+        wanted = {index: self.tile_style(index, value, head_index)
+                  for index, value in engine.occupied_in(*self.view_rect())}
+
+        tiles, free = self.tiles, self.free_tiles
+        for index in [index for index in tiles if index not in wanted]:
+            item, _ = tiles.pop(index)
+            self.canvas.itemconfig(item, state='hidden')
+            free.append(item)
+
+        for index, style in wanted.items():
+            shown = tiles.get(index)
+            if shown is not None and shown[1] == style:
+                continue
+            fill, outline, width, inset = style
+            if shown is None:
+                item = free.pop()
+                self.canvas.itemconfig(item, fill=fill, outline=outline, width=width, state='normal')
+            else:
+                item = shown[0]
+                self.canvas.itemconfig(item, fill=fill, outline=outline, width=width)
+            self.canvas.coords(item, *self.cell_coords(index % size, index // size, inset))
+            tiles[index] = (item, style)
+
+    def update_eye_items(self):
+        """Place the eyes on the head, looking the way the snake moves"""
+        engine = self.engine
+        x, y = engine.snake[0]
+        visible = self.in_view(x, y)
+        if visible != self.eyes_visible:
+            for item in self.eye_items:
+                self.canvas.itemconfig(item, state='normal' if visible else 'hidden')
+            self.eyes_visible = visible
+        if not visible:
+            return
 
-        # Draw sidebar
-        self.draw_sidebar()
+        px, py = self.cell_coords(x, y, 0)[:2]
+        eye_offset = 6
+        if engine.snake_direction == "Right":
+            eye1 = (px + self.CELL_SIZE - 8, py + eye_offset)
+            eye2 = (px + self.CELL_SIZE - 8, py + self.CELL_SIZE - eye_offset)
+        elif engine.snake_direction == "Left":
+            eye1 = (px + 8, py + eye_offset)
+            eye2 = (px + 8, py + self.CELL_SIZE - eye_offset)
+        elif engine.snake_direction == "Up":
+            eye1 = (px + eye_offset, py + 8)
+            eye2 = (px + self.CELL_SIZE - eye_offset, py + 8)
+        else:  # Down
+            eye1 = (px + eye_offset, py + self.CELL_SIZE - 8)
+            eye2 = (px + self.CELL_SIZE - eye_offset, py + self.CELL_SIZE - 8)
+
+        for item, (eye_x, eye_y) in zip(self.eye_items, (eye1, eye2)):
+            self.canvas.coords(item, eye_x - 2, eye_y - 2, eye_x + 2, eye_y + 2)
+
+    def update_food_items(self):
+        """Move the food and pulse its glow, hiding it while out of view"""
+        food = self.engine.food
+        glow, item = self.food_items
+        visible = food is not None and self.in_view(*food)
+        if visible != self.food_visible:
+            for food_item in self.food_items:
+                self.canvas.itemconfig(food_item, state='normal' if visible else 'hidden')
+            self.food_visible = visible
+        if not visible:
+            return
+        fx, fy = food
+
+        # Glow effect
+        glow_size = 5 + abs((self.animation_frame % 60) - 30) // 10
+        self.canvas.coords(glow, *self.cell_coords(fx, fy, -glow_size))
+
+        if food != self.rendered_food:
+            self.canvas.coords(item, *self.cell_coords(fx, fy, 3))
+            self.rendered_food = food
+
+    def update_powerup_items(self):
+        """Create and remove powerup items as they spawn, expire or scroll by"""
+        powerups = set(self.engine.powerups_in(*self.view_rect()).items())
+        for key in list(self.powerup_items):
+            if key not in powerups:
+                self.canvas.delete(*self.powerup_items.pop(key))
+
+        color_map = {
+            PowerUpType.SPEED_BOOST: self.COLORS['powerup_speed'],
+            PowerUpType.SLOW_DOWN: self.COLORS['powerup_slow'],
+            PowerUpType.SCORE_MULTIPLIER: self.COLORS['powerup_score'],
+            PowerUpType.INVINCIBLE: self.COLORS['powerup_invincible'],
+        }
+
+        symbol_map = {
+            PowerUpType.SPEED_BOOST: "⚡",
+            PowerUpType.SLOW_DOWN: "🐌",
+            PowerUpType.SCORE_MULTIPLIER: "✨",
+            PowerUpType.INVINCIBLE: "🛡️",
+        }
+
+        for key in powerups:
+            if key in self.powerup_items:
+                continue
+            (x, y), powerup_type = key
+            px, py = self.cell_coords(x, y, 0)[:2]
+            color = color_map.get(powerup_type, self.COLORS['powerup_score'])
+            self.powerup_items[key] = (
+                self.canvas.create_rectangle(
+                    *self.cell_coords(x, y, 2),
+                    fill=color,
+                    outline=self.COLORS['glass_border'],
+                    width=2,
+                    tags=("world", "powerup")
+                ),
+                self.canvas.create_text(
+                    px + self.CELL_SIZE // 2, py + self.CELL_SIZE // 2,
+                    text=symbol_map.get(powerup_type, "?"),
+                    fill=self.COLORS['text_primary'],
+                    font=self.fonts['small'],
+                    tags=("world", "powerup")
+                ),
+            )
+            # Keep powerups under the snake like the rest of the board
+            if self.tiles or self.free_tiles:
+                self.canvas.tag_lower("powerup", "tile")
+
+    def draw_particles(self):
+        """Show live particles on their pooled ovals, then age them"""
+        pool = self.particles
+        items = self.particle_items
+        shown = self.particle_shown
+        cell = self.CELL_SIZE
+        camera_x, camera_y = self.camera
+
+        for slot in pool.live_slots():
+            serial, size = pool.serial[slot], pool.life[slot] // 4
+            shown_serial, shown_size = shown[slot]
+            if serial != shown_serial:
+                # Slot was reused by a new particle
+                self.canvas.itemconfig(items[slot], fill=pool.color[slot], state='normal')
+            if serial != shown_serial or size != shown_size:
+                px, py = (pool.x[slot] - camera_x) * cell, (pool.y[slot] - camera_y) * cell
+                self.canvas.coords(items[slot], px - size, py - size, px + size, py + size)
+                shown[slot] = (serial, size)
+
+        for slot in pool.age():
+            self.canvas.itemconfig(items[slot], state='hidden')
 
     def draw_sidebar(self):
-        """Draw the sidebar with game stats"""
+        """Build the sidebar items; update_sidebar keeps them current"""
+        engine = self.engine
+        self.canvas.delete("sidebar")
         sidebar_x = self.CANVAS_WIDTH + 10
         sidebar_width = 280
 
+        # Items whose contents change, and the values they last showed
+        items = self.sidebar_items = {}
+        self.sidebar_shown = {}
+        self.sidebar_lowered = False
+
         # Stats panel
         panel_y = 10
-        self.create_glass_panel(sidebar_x, panel_y, sidebar_width, 180)
+        self.create_glass_panel(sidebar_x, panel_y, sidebar_width, 180, tags="sidebar")
 
         # Game mode
         self.canvas.create_text(
             sidebar_x + sidebar_width // 2, panel_y + 20,
-            text=self.game_mode.value,
+            text=engine.game_mode.value,
             fill=self.COLORS['glass_border'],
-            font=self.fonts['button']
-        )
-
-        # Score
-        self.canvas.create_text(
-            sidebar_x + 20, panel_y + 50,
-            text="Score:",
-            fill=self.COLORS['text_secondary'],
-            font=self.fonts['small'],
-            anchor="w"
-        )
-        self.canvas.create_text(
-            sidebar_x + sidebar_width - 20, panel_y + 50,
-            text=str(self.score),
-            fill=self.COLORS['text_primary'],
-            font=self.fonts['score'],
-            anchor="e"
-        )
-
-        # Length
-        self.canvas.create_text(
-            sidebar_x + 20, panel_y + 80,
-            text="Length:",
-            fill=self.COLORS['text_secondary'],
-            font=self.fonts['small'],
-            anchor="w"
-        )
-        self.canvas.create_text(
-            sidebar_x + sidebar_width - 20, panel_y + 80,
-            text=str(len(self.snake)),
-            fill=self.COLORS['text_primary'],
-            font=self.fonts['score'],
-            anchor="e"
-        )
-
-        # Food eaten
-        self.canvas.create_text(
-            sidebar_x + 20, panel_y + 110,
-            text="Food:",
-            fill=self.COLORS['text_secondary'],
-            font=self.fonts['small'],
-            anchor="w"
-        )
-        self.canvas.create_text(
-            sidebar_x + sidebar_width - 20, panel_y + 110,
-            text=str(self.food_eaten),
-            fill=self.COLORS['text_primary'],
-            font=self.fonts['score'],
-            anchor="e"
+            font=self.fonts['button'],
+            tags="sidebar"
         )
 
-        # Time (for time attack)
-        if self.game_mode == GameMode.TIME_ATTACK:
+        # Score, length, food eaten and, in time attack, time left
+        rows = [("Score:", 'score'), ("Length:", 'length'), ("Food:", 'food')]
+        if engine.game_mode == GameMode.TIME_ATTACK:
+            rows.append(("Time:", 'time'))
+        for i, (label, key) in enumerate(rows):
             self.canvas.create_text(
-                sidebar_x + 20, panel_y + 140,
-                text="Time:",
+                sidebar_x + 20, panel_y + 50 + 30 * i,
+                text=label,
                 fill=self.COLORS['text_secondary'],
                 font=self.fonts['small'],
-                anchor="w"
+                anchor="w",
+                tags="sidebar"
             )
-            time_color = self.COLORS['food'] if self.time_remaining < 30 else self.COLORS['text_primary']
-            self.canvas.create_text(
-                sidebar_x + sidebar_width - 20, panel_y + 140,
-                text=f"{self.time_remaining}s",
-                fill=time_color,
+            items[key] = self.canvas.create_text(
+                sidebar_x + sidebar_width - 20, panel_y + 50 + 30 * i,
+                text="",
+                fill=self.COLORS['text_primary'],
                 font=self.fonts['score'],
-                anchor="e"
-            )
-
-        # Active powerup
-        if self.active_powerup:
-            powerup_y = 200
-            self.create_glass_panel(sidebar_x, powerup_y, sidebar_width, 80)
-
-            self.canvas.create_text(
-                sidebar_x + sidebar_width // 2, powerup_y + 15,
-                text="Active Powerup",
-                fill=self.COLORS['text_secondary'],
-                font=self.fonts['tiny']
+                anchor="e",
+                tags="sidebar"
             )
 
-            powerup_names = {
-                PowerUpType.SPEED_BOOST: "⚡ Speed Boost",
-                PowerUpType.SLOW_DOWN: "🐌 Slow Down",
-                PowerUpType.SCORE_MULTIPLIER: "✨ Score x2",
-                PowerUpType.INVINCIBLE: "🛡️ Invincible",
-            }
+        # Active powerup, hidden while there is none
+        powerup_y = 200
+        powerup_tags = ("sidebar", "sidebar_powerup")
+        self.create_glass_panel(sidebar_x, powerup_y, sidebar_width, 80, tags=powerup_tags)
 
-            self.canvas.create_text(
-                sidebar_x + sidebar_width // 2, powerup_y + 40,
-                text=powerup_names.get(self.active_powerup, "Unknown"),
-                fill=self.COLORS['text_primary'],
-                font=self.fonts['button']
-            )
+        self.canvas.create_text(
+            sidebar_x + sidebar_width // 2, powerup_y + 15,
+            text="Active Powerup",
+            fill=self.COLORS['text_secondary'],
+            font=self.fonts['tiny'],
+            tags=powerup_tags
+        )
+        items['powerup'] = self.canvas.create_text(
+            sidebar_x + sidebar_width // 2, powerup_y + 40,
+            text="",
+            fill=self.COLORS['text_primary'],
+            font=self.fonts['button'],
+            tags=powerup_tags
+        )
 
-            # Timer bar
-            bar_width = sidebar_width - 40
-            bar_progress = (self.powerup_timer / 100) * bar_width
-            self.canvas.create_rectangle(
-                sidebar_x + 20, powerup_y + 60,
-                sidebar_x + 20 + bar_width, powerup_y + 70,
-                fill=self.COLORS['bg_gradient_1'],
-                outline=self.COLORS['glass_border']
-            )
-            self.canvas.create_rectangle(
-                sidebar_x + 20, powerup_y + 60,
-                sidebar_x + 20 + bar_progress, powerup_y + 70,
-                fill=self.COLORS['powerup_score'],
-                outline=''
-            )
+        # Timer bar
+        bar_width = sidebar_width - 40
+        self.sidebar_bar = (sidebar_x + 20, powerup_y + 60, bar_width)
+        self.canvas.create_rectangle(
+            sidebar_x + 20, powerup_y + 60,
+            sidebar_x + 20 + bar_width, powerup_y + 70,
+            fill=self.COLORS['bg_gradient_1'],
+            outline=self.COLORS['glass_border'],
+            tags=powerup_tags
+        )
+        items['powerup_timer'] = self.canvas.create_rectangle(
+            sidebar_x + 20, powerup_y + 60,
+            sidebar_x + 20, powerup_y + 70,
+            fill=self.COLORS['powerup_score'],
+            outline='',
+            tags=powerup_tags
+        )
+        self.canvas.itemconfig("sidebar_powerup", state='hidden')
 
-        # High score panel
-        high_score_y = 290 if self.active_powerup else 210
-        self.create_glass_panel(sidebar_x, high_score_y, sidebar_width, 100)
+        # High score panel, moved down below the powerup panel while it shows
+        high_score_y = 210
+        lower_tags = ("sidebar", "sidebar_lower")
+        self.create_glass_panel(sidebar_x, high_score_y, sidebar_width, 100, tags=lower_tags)
 
         self.canvas.create_text(
             sidebar_x + sidebar_width // 2, high_score_y + 15,
             text="🏆 High Score",
             fill=self.COLORS['text_secondary'],
-            font=self.fonts['tiny']
+            font=self.fonts['tiny'],
+            tags=lower_tags
         )
 
-        mode_high_scores = self.high_scores.get(self.game_mode.value, [])
-        if mode_high_scores:
-            best = mode_high_scores[0]
+        best = self.mode_best
+        if best:
             self.canvas.create_text(
                 sidebar_x + sidebar_width // 2, high_score_y + 45,
                 text=str(best['score']),
                 fill=self.COLORS['glass_border'],
-                font=self.fonts['subtitle']
+                font=self.fonts['subtitle'],
+                tags=lower_tags
             )
             self.canvas.create_text(
                 sidebar_x + sidebar_width // 2, high_score_y + 75,
                 text=f"Length: {best['length']} | Food: {best['food']}",
                 fill=self.COLORS['text_secondary'],
-                font=self.fonts['tiny']
+                font=self.fonts['tiny'],
+                tags=lower_tags
             )
         else:
             self.canvas.create_text(
                 sidebar_x + sidebar_width // 2, high_score_y + 50,
                 text="No high score yet!",
                 fill=self.COLORS['text_secondary'],
-                font=self.fonts['small']
+                font=self.fonts['small'],
+                tags=lower_tags
             )
 
         # Controls reminder
@@ -976,72 +1160,183 @@ class SnakeGame:
             sidebar_x + sidebar_width // 2, controls_y,
             text="SPACE - Pause",
             fill=self.COLORS['text_secondary'],
-            font=self.fonts['tiny']
+            font=self.fonts['tiny'],
+            tags=lower_tags
         )
         self.canvas.create_text(
             sidebar_x + sidebar_width // 2, controls_y + 15,
             text="ESC - Menu",
             fill=self.COLORS['text_secondary'],
-            font=self.fonts['tiny']
+            font=self.fonts['tiny'],
+            tags=lower_tags
+        )
+        items['autopilot'] = self.canvas.create_text(
+            sidebar_x + sidebar_width // 2, controls_y + 30,
+            text="",
+            fill=self.COLORS['text_secondary'],
+            font=self.fonts['tiny'],
+            tags=lower_tags
         )
 
+        # Measured tick rate against the target for the current speed
+        items['tick_stats'] = self.canvas.create_text(
+            sidebar_x + sidebar_width // 2, controls_y + 50,
+            text="",
+            fill=self.COLORS['text_secondary'],
+            font=self.fonts['tiny'],
+            tags=lower_tags
+        )
+
+        self.update_sidebar()
+
+    def update_sidebar(self):
+        """Refresh only the sidebar items whose values changed"""
+        engine = self.engine
+        items = self.sidebar_items
+        shown = self.sidebar_shown
+
+        for key, value in (('score', engine.score), ('length', len(engine.snake)),
+                           ('food', engine.food_eaten)):
+            if shown.get(key) != value:
+                self.canvas.itemconfig(items[key], text=str(value))
+                shown[key] = value
+
+        if 'time' in items and shown.get('time') != engine.time_remaining:
+            time_color = self.COLORS['food'] if engine.time_remaining < 30 else self.COLORS['text_primary']
+            self.canvas.itemconfig(items['time'], text=f"{engine.time_remaining}s", fill=time_color)
+            shown['time'] = engine.time_remaining
+
+        powerup = engine.active_powerup
+        if shown.get('powerup') != powerup:
+            if powerup:
+                powerup_names = {
+                    PowerUpType.SPEED_BOOST: "⚡ Speed Boost",
+                    PowerUpType.SLOW_DOWN: "🐌 Slow Down",
+                    PowerUpType.SCORE_MULTIPLIER: "✨ Score x2",
+                    PowerUpType.INVINCIBLE: "🛡️ Invincible",
+                }
+                self.canvas.itemconfig(items['powerup'], text=powerup_names.get(powerup, "Unknown"))
+
+            lowered = powerup is not None
+            if lowered != self.sidebar_lowered:
+                self.canvas.itemconfig("sidebar_powerup", state='normal' if lowered else 'hidden')
+                self.canvas.move("sidebar_lower", 0, 80 if lowered else -80)
+                self.sidebar_lowered = lowered
+            shown['powerup'] = powerup
+
+        if powerup and shown.get('powerup_timer') != engine.powerup_timer:
+            bar_x, bar_y, bar_width = self.sidebar_bar
+            bar_progress = (engine.powerup_timer / POWERUP_DURATION) * bar_width
+            self.canvas.coords(items['powerup_timer'], bar_x, bar_y, bar_x + bar_progress, bar_y + 10)
+            shown['powerup_timer'] = engine.powerup_timer
+
+        autopilot = self.autopilot is not None
+        if shown.get('autopilot') != autopilot:
+            self.canvas.itemconfig(
+                items['autopilot'],
+                text="P - Autopilot: ON" if autopilot else "P - Autopilot",
+                fill=self.COLORS['glass_border'] if autopilot else self.COLORS['text_secondary']
+            )
+            shown['autopilot'] = autopilot
+
+        # The tick rate moves every tick, so it is refreshed once a second
+        now = self.clock.last
+        if now - shown.get('tick_stats', -1) >= 1:
+            stats = self.clock.stats()
+            if stats:
+                self.canvas.itemconfig(
+                    items['tick_stats'],
+                    text=f"{stats['ticks_per_second']:.1f}/{stats['target_ticks_per_second']:.1f} ticks/s "
+                         f"| jitter {stats['jitter_ms']:.1f} ms"
+                )
+            shown['tick_stats'] = now
+
     def game_over(self):
         """Handle game over"""
         self.running = False
+        self.stop_loop()
         self.save_score()
+        self.save_replay()
+        if self.profiler:
+            self.save_profile()
         self.show_game_over()
 
     def save_score(self):
-        """Save the current score if it's a high score"""
-        mode_key = self.game_mode.value
-        if mode_key not in self.high_scores:
-            self.high_scores[mode_key] = []
-
-        score_data = {
-            'score': self.score,
-            'length': len(self.snake),
-            'food': self.food_eaten,
-            'moves': self.moves_count,
-            'date': datetime.now().strftime("%Y-%m-%d %H:%M")
-        }
+        """Record the finished run in the score store"""
+        engine = self.engine
+        try:
+            self.score_store().record(engine.game_mode.value, engine.score_data())
+        except Exception as e:
+            print(f"Error saving high scores: {e}")
 
-        self.high_scores[mode_key].append(score_data)
-        self.high_scores[mode_key].sort(key=lambda x: x['score'], reverse=True)
-        self.high_scores[mode_key] = self.high_scores[mode_key][:10]  # Keep top 10
+    def save_replay(self):
+        """Keep the last game as a replay file for bug reports"""
+        try:
+            self.replay.save('last_replay.snkr')
+        except Exception as e:
+            print(f"Error saving replay: {e}")
 
-        # Save to file
+    def save_profile(self):
+        """Dump span timings, as CSV if the path ends in .csv"""
         try:
-            with open('high_scores.json', 'w') as f:
-                json.dump(self.high_scores, f, indent=2)
+            self.profiler.dump(self.profile_path or 'profile.json')
         except Exception as e:
-            print(f"Error saving high scores: {e}")
+            print(f"Error saving profile: {e}")
+
+    def toggle_profiler(self):
+        """Start or stop timing the hot path"""
+        if self.profiler:
+            self.profiler.unwrap()
+            self.profiler = None
+            if self.profile_item is not None:
+                self.canvas.delete(self.profile_item)
+                self.profile_item = None
+            return
 
-    def load_high_scores(self):
-        """Load high scores from file"""
-        if os.path.exists('high_scores.json'):
-            try:
-                with open('high_scores.json', 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading high scores: {e}")
-        return {}
+        from profiler import Profiler
+
+        self.profiler = Profiler()
+        self.profiler.wrap(self, 'tick', 'sim')
+        self.profiler.wrap(self, 'draw_game')
+        self.profiler.wrap(self, 'draw_sidebar')
+        self.profiler.wrap(self, 'update_sidebar')
+        self.profiler.wrap(self.engine, 'spawn_food')
+        self.profiler.wrap(self.engine, 'spawn_powerup')
+
+    def draw_profile_overlay(self):
+        """Show span percentiles in the corner of the board"""
+        self.profile_frames += 1
+        if self.profile_frames % 10:
+            return
+
+        lines = [f"{'span':<14}{'p50':>7}{'p95':>7}{'p99':>7} ms"]
+        for name, stats in self.profiler.summary().items():
+            lines.append(f"{name:<14}{stats['p50_ms']:>7.2f}{stats['p95_ms']:>7.2f}{stats['p99_ms']:>7.2f}")
+        if self.latency.count:
+            lines.append(f"input->screen ms, p50 {self.latency.percentile(0.5)} p95 {self.latency.percentile(0.95)}")
+            lines.extend(self.latency.lines(width=12))
+        text = "\n".join(lines)
+
+        if self.profile_item is None:
+            self.profile_item = self.canvas.create_text(
+                6, 6,
+                text=text,
+                fill=self.COLORS['text_primary'],
+                font=('Courier', 9),
+                anchor="nw",
+                tags="profile"
+            )
+        else:
+            self.canvas.itemconfig(self.profile_item, text=text)
 
     def show_game_over(self):
         """Display game over screen"""
+        engine = self.engine
         self.current_screen = "game_over"
-        self.canvas.delete("all")
+        self.clear_screen()
 
         # Background
-        for i in range(self.CANVAS_HEIGHT):
-            color_ratio = i / self.CANVAS_HEIGHT
-            r = int(10 + (29 - 10) * color_ratio)
-            g = int(14 + (53 - 14) * color_ratio)
-            b = int(39 + (97 - 39) * color_ratio)
-            color = f'#{r:02x}{g:02x}{b:02x}'
-            self.canvas.create_line(
-                0, i, self.CANVAS_WIDTH + 300, i,
-                fill=color
-            )
+        self.draw_background(tags="game_over")
 
         # Panel
         panel_width = 450
@@ -1050,11 +1345,11 @@ class SnakeGame:
         panel_y = 50
         self.create_glass_panel(panel_x, panel_y, panel_width, panel_height)
 
-        # Title
+        # Title - filling the whole board is a win
         self.canvas.create_text(
             panel_x + panel_width // 2, panel_y + 50,
-            text="GAME OVER",
-            fill=self.COLORS['food'],
+            text="YOU WIN!" if engine.won else "GAME OVER",
+            fill=self.COLORS['glass_border'] if engine.won else self.COLORS['food'],
             font=self.fonts['title']
         )
 
@@ -1063,28 +1358,28 @@ class SnakeGame:
 
         self.canvas.create_text(
             panel_x + panel_width // 2, stats_y,
-            text=f"Final Score: {self.score}",
+            text=f"Final Score: {engine.score}",
             fill=self.COLORS['text_primary'],
             font=self.fonts['subtitle']
         )
 
         self.canvas.create_text(
             panel_x + panel_width // 2, stats_y + 50,
-            text=f"Length: {len(self.snake)} | Food Eaten: {self.food_eaten}",
+            text=f"Length: {len(engine.snake)} | Food Eaten: {engine.food_eaten}",
             fill=self.COLORS['text_secondary'],
             font=self.fonts['button']
         )
 
         self.canvas.create_text(
             panel_x + panel_width // 2, stats_y + 85,
-            text=f"Total Moves: {self.moves_count}",
+            text=f"Total Moves: {engine.moves_count}",
             fill=self.COLORS['text_secondary'],
             font=self.fonts['small']
         )
 
         # Check if new high score
-        mode_scores = self.high_scores.get(self.game_mode.value, [])
-        if mode_scores and self.score >= mode_scores[0]['score']:
+        best = self.best_score(engine.game_mode)
+        if best and engine.score >= best['score']:
             self.canvas.create_text(
                 panel_x + panel_width // 2, stats_y + 120,
                 text="🏆 NEW HIGH SCORE! 🏆",
@@ -1096,9 +1391,17 @@ class SnakeGame:
         button_y = panel_y + 300
         self.create_button(
             panel_x + 50, button_y,
-            panel_width - 100, 40,
+            (panel_width - 120) // 2, 40,
             "🔄 Play Again",
-            lambda: self.start_game(self.game_mode),
+            lambda: self.start_game(engine.game_mode),
+            tags="game_over"
+        )
+
+        self.create_button(
+            panel_x + panel_width // 2 + 10, button_y,
+            (panel_width - 120) // 2, 40,
+            "⏪ Review",
+            self.review,
             tags="game_over"
         )
 
@@ -1110,8 +1413,55 @@ class SnakeGame:
             tags="game_over"
         )
 
+    def review(self):
+        """Browse the finished game: arrow keys move through the ticks kept"""
+        self.current_screen = "review"
+        self.clear_screen()
+        self.particles.clear()
+        self.needs_redraw = True
+        self.draw_review()
+
+    def review_seek(self, ticks):
+        """Jump ticks forward (or back) through the finished game"""
+        engine = self.engine
+        self.rewind.seek(engine, engine.moves_count + ticks)
+        self.draw_review()
+
+    def draw_review(self):
+        """Draw the board at the reviewed tick with a position banner"""
+        self.draw_game()
+        self.canvas.delete("review")
+        self.canvas.create_text(
+            self.CANVAS_WIDTH // 2, 12,
+            text=f"⏪ REVIEW  tick {self.engine.moves_count} of {self.rewind.last_tick}",
+            fill=self.COLORS['text_primary'],
+            font=self.fonts['small'],
+            tags="review"
+        )
+        self.canvas.create_text(
+            self.CANVAS_WIDTH // 2, self.CANVAS_HEIGHT - 12,
+            text="←/→ 1 tick | ↓/↑ 100 ticks | ESC: Menu",
+            fill=self.COLORS['text_secondary'],
+            font=self.fonts['tiny'],
+            tags="review"
+        )
+
+
+def board_size(value):
+    size = int(value)
+    if not 4 <= size <= 1000:
+        raise argparse.ArgumentTypeError("board size must be between 4 and 1000")
+    return size
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snake Game - Ultimate Edition")
+    parser.add_argument("--grid", type=board_size, default=20, help="board width and height in cells")
+    parser.add_argument("--low-latency", action="store_true",
+                        help="tick early when a turn is pressed late in the interval")
+    args = parser.parse_args()
+
     root = tk.Tk()
     root.resizable(False, False)
-    game = SnakeGame(root)
+    game = SnakeGame(root, args.grid, low_latency=args.low_latency)
     root.mainloop()
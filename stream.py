@@ -0,0 +1,500 @@
+import random
+import sys
+import time
+from collections import deque
+
+from engine import DIRECTIONS, GameMode, PowerUpType, SnakeEngine
+from replay import CODE_OF, CODES, MODES
+
+# Stream layout: a run of records, each starting with one flags byte.
+#
+# Tick record, flags bit 7 clear:
+#   bits 0-1  direction code (replay.CODES) the snake faces after the tick
+#   bit 2     the head moved one cell that way (clear on a fatal tick)
+#   bit 3     the tail was popped
+#   bit 4     food follows: varint cell index + 1, 0 for no food
+#   bit 5     powerups follow: varint count, then varint cell and type each
+#   bit 6     field corrections follow: varint bitmask over FIELDS, then
+#             one varint per set bit in FIELDS order
+# Keyframe record, flags == KEYFRAME: varint payload length, then the whole
+# state (see StreamEncoder.keyframe_payload).
+#
+# Fields are predicted from the last state (moves_count + 1, elapsed_ms +
+# game_speed, powerup_timer - 1 while running, the rest unchanged) and only
+# sent where the prediction is wrong.
+KEYFRAME = 0x80
+MOVED, POPPED, FOOD, POWERUPS, CORRECTIONS = 0x04, 0x08, 0x10, 0x20, 0x40
+FIELDS = ('moves_count', 'elapsed_ms', 'score', 'food_eaten', 'score_multiplier', 'game_speed',
+          'powerup_timer', 'active_powerup', 'time_remaining', 'done', 'won')
+POWERUP_TYPES = tuple(PowerUpType)
+POWERUP_CODE = {None: 0, **{kind: code + 1 for code, kind in enumerate(POWERUP_TYPES)}}
+CHUNK = 64 * 1024
+
+
+def field_values(state):
+    """FIELDS of an engine or StreamState as unsigned ints"""
+    return (state.moves_count, state.elapsed_ms, state.score, state.food_eaten,
+            state.score_multiplier, state.game_speed, state.powerup_timer,
+            POWERUP_CODE[state.active_powerup], state.time_remaining, int(state.done), int(state.won))
+
+
+def predict(values, ticks=1):
+    """FIELDS after ``ticks`` ticks in which nothing unusual happened"""
+    moves, elapsed, score, eaten, multiplier, speed, timer, active, remaining, done, won = values
+    return (moves + ticks, elapsed + speed * ticks, score, eaten, multiplier, speed,
+            max(0, timer - ticks), active, remaining, done, won)
+
+
+def write_varint(out, value):
+    while value > 0x7f:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(view, pos):
+    """(value, next position); IndexError if the varint is cut off"""
+    value = shift = 0
+    while True:
+        byte = view[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value):
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+class StreamState:
+    """The part of a game the stream carries, as a decoder rebuilds it"""
+
+    def __init__(self):
+        self.GRID_SIZE = 0
+        self.game_mode = None
+        self.seed = 0
+        self.snake = deque()
+        self.snake_direction = "Right"
+        self.food = None
+        self.obstacles = []
+        self.powerups = {}
+        self.set_fields((0,) * len(FIELDS))
+
+    def set_fields(self, values):
+        (self.moves_count, self.elapsed_ms, self.score, self.food_eaten, self.score_multiplier,
+         self.game_speed, self.powerup_timer, active, self.time_remaining, done, won) = values
+        self.active_powerup = POWERUP_TYPES[active - 1] if active else None
+        self.done = bool(done)
+        self.won = bool(won)
+
+    def matches(self, engine):
+        """True if every streamed part of engine equals this state"""
+        return (self.snake == engine.snake and self.snake_direction == engine.snake_direction
+                and self.food == engine.food and self.powerups == engine.powerups
+                and self.obstacles == engine.obstacles and self.game_mode == engine.game_mode
+                and field_values(self) == field_values(engine))
+
+
+class StreamEncoder:
+    """Writes an engine's changes as records after each step().
+
+    Records go into fixed-size chunks that are never resized or rewritten,
+    so take() can hand out memoryviews of them without copying; a full chunk
+    is simply replaced by a new one. A keyframe goes out every
+    keyframe_every ticks so a recording can be entered part way through.
+
+    Most ticks only move the snake. Those are told apart by the engine's
+    events and its next timer, without reading the rest of its state, and
+    cost a one byte record.
+    """
+
+    def __init__(self, engine, keyframe_every=256):
+        self.engine = engine
+        self.keyframe_every = keyframe_every
+        self.chunk = bytearray(CHUNK)
+        self.start = self.end = 0
+        self.reset()
+
+    def reset(self):
+        """Start from a keyframe, e.g. after engine.reset()"""
+        self.sync()
+        self.since_keyframe = 0
+        self.write(self.keyframe())
+
+    def sync(self):
+        """Remember the engine's current state as what decoders have"""
+        engine = self.engine
+        self.head = engine.snake[0]
+        self.length = len(engine.snake)
+        self.food = engine.food
+        self.powerups = dict(engine.powerups)
+        self.values = field_values(engine)
+        self.ahead = 0  # quiet ticks since self.values, all as predicted
+        self.timed = engine.game_mode == GameMode.TIME_ATTACK
+        self.next_timer = self.timer_due()
+
+    def timer_due(self):
+        """Tick of the engine's next timed event, or infinity"""
+        heap = self.engine.timers.heap
+        return heap[0][0] if heap else float('inf')
+
+    def write(self, record):
+        """Append a finished record to the current chunk"""
+        size = len(record)
+        if self.end + size > len(self.chunk):
+            # Bytes not taken yet move along to the new chunk
+            pending = self.chunk[self.start:self.end]
+            self.chunk = bytearray(max(CHUNK, 2 * (size + len(pending))))
+            self.chunk[:len(pending)] = pending
+            self.start, self.end = 0, len(pending)
+        self.chunk[self.end:self.end + size] = record
+        self.end += size
+
+    def take(self):
+        """Everything written since the last take(), as a memoryview"""
+        view = memoryview(self.chunk)[self.start:self.end]
+        self.start = self.end
+        return view
+
+    def tick(self):
+        """Record the step the engine just took"""
+        engine = self.engine
+        snake = engine.snake
+        head = snake[0]
+        flags = CODE_OF[engine.snake_direction]
+        if head != self.head:
+            flags |= MOVED
+            if len(snake) == self.length:
+                flags |= POPPED
+        self.head = head
+        self.length = len(snake)
+
+        if (not engine.events and not engine.done and engine.moves_count < self.next_timer
+                and (not self.timed or engine.time_remaining == self.values[8])):
+            # Only the snake moved: food, powerups and all but the predicted
+            # fields change only on an event, a timer or Time Attack's clock
+            self.ahead += 1
+            record = None
+        else:
+            values = field_values(engine)
+            self.expected = predict(self.values, self.ahead + 1)
+            food = engine.food
+            if food == self.food and engine.powerups == self.powerups and values == self.expected:
+                record = None
+            else:
+                record = self.tick_record(flags, food, values)
+            self.values = values
+            self.ahead = 0
+            self.next_timer = self.timer_due()
+
+        if record is not None:
+            self.write(record)
+        elif self.end < len(self.chunk):
+            # The common case, a one byte record
+            self.chunk[self.end] = flags
+            self.end += 1
+        else:
+            self.write(bytes((flags,)))
+
+        self.since_keyframe += 1
+        if self.since_keyframe >= self.keyframe_every:
+            self.since_keyframe = 0
+            self.write(self.keyframe())
+
+    def tick_record(self, flags, food, values):
+        """A tick record with food, powerup or field changes"""
+        engine = self.engine
+        out = bytearray(1)
+        if food != self.food:
+            flags |= FOOD
+            write_varint(out, food[1] * engine.GRID_SIZE + food[0] + 1 if food else 0)
+            self.food = food
+
+        if engine.powerups != self.powerups:
+            flags |= POWERUPS
+            write_varint(out, len(engine.powerups))
+            for (x, y), kind in engine.powerups.items():
+                write_varint(out, y * engine.GRID_SIZE + x)
+                out.append(POWERUP_CODE[kind] - 1)
+            self.powerups = dict(engine.powerups)
+
+        if values != self.expected:
+            flags |= CORRECTIONS
+            mask = 0
+            for bit, (value, guess) in enumerate(zip(values, self.expected)):
+                if value != guess:
+                    mask |= 1 << bit
+            write_varint(out, mask)
+            for bit, value in enumerate(values):
+                if mask >> bit & 1:
+                    write_varint(out, value)
+
+        out[0] = flags
+        return out
+
+    def keyframe(self):
+        """A keyframe record for the engine's current state"""
+        payload = self.keyframe_payload()
+        record = bytearray([KEYFRAME])
+        write_varint(record, len(payload))
+        return record + payload
+
+    def keyframe_payload(self):
+        """Grid, mode, seed, direction, FIELDS, food, obstacles, powerups,
+        then the snake as its head (zigzag x, y) and a 2-bit direction code
+        from each segment to the next, four per byte"""
+        engine = self.engine
+        size = engine.GRID_SIZE
+        out = bytearray()
+        for value in (size, MODES.index(engine.game_mode), engine.seed, CODE_OF[engine.snake_direction],
+                      *field_values(engine)):
+            write_varint(out, value)
+        write_varint(out, engine.food[1] * size + engine.food[0] + 1 if engine.food else 0)
+        write_varint(out, len(engine.obstacles))
+        for x, y in engine.obstacles:
+            write_varint(out, y * size + x)
+        write_varint(out, len(engine.powerups))
+        for (x, y), kind in engine.powerups.items():
+            write_varint(out, y * size + x)
+            out.append(POWERUP_CODE[kind] - 1)
+
+        snake = engine.snake
+        write_varint(out, len(snake))
+        head_x, head_y = snake[0]
+        write_varint(out, zigzag(head_x))
+        write_varint(out, zigzag(head_y))
+        packed = 0
+        previous = snake[0]
+        for i, (x, y) in enumerate(snake):
+            if i == 0:
+                continue
+            dx, dy = x - previous[0], y - previous[1]
+            if dx > 1:
+                dx = -1  # wrapped around in Zen mode
+            elif dx < -1:
+                dx = 1
+            if dy > 1:
+                dy = -1
+            elif dy < -1:
+                dy = 1
+            packed |= CODE_OF[STEP_NAMES[dx, dy]] << ((i - 1) & 3) * 2
+            if (i - 1) & 3 == 3:
+                out.append(packed)
+                packed = 0
+            previous = (x, y)
+        if (len(snake) - 1) & 3:
+            out.append(packed)
+        return out
+
+
+STEP_NAMES = {delta: name for name, delta in DIRECTIONS.items()}
+
+
+class StreamDecoder:
+    """Rebuilds a StreamState from records fed in any sized pieces.
+
+    feed() parses straight out of the memoryview it is given; only a
+    record cut off at the end of a piece is copied, to be completed by the
+    next one. Ticks before the first keyframe are skipped.
+    """
+
+    def __init__(self):
+        self.state = None
+        self.partial = b""
+
+    def feed(self, data):
+        """Apply every complete record in data; returns how many"""
+        view = memoryview(data)
+        pos = count = 0
+        if self.partial:
+            pos = self.complete(view)
+            if pos is None:
+                return 0
+            count = 1
+        while pos < len(view):
+            try:
+                end = self.record(view, pos)
+            except IndexError:
+                break
+            pos = end
+            count += 1
+        self.partial = bytes(view[pos:])
+        return count
+
+    def complete(self, view):
+        """Finish the pending record with the start of view.
+
+        Copies twice as much of view each time the record is still cut off,
+        so about its own length at most. Returns where in view the next
+        record starts, or None if view did not finish it either.
+        """
+        pending = len(self.partial)
+        take = 16
+        while True:
+            data = self.partial + bytes(view[:take])
+            try:
+                end = self.record(data, 0)
+            except IndexError:
+                if take >= len(view):
+                    self.partial = data
+                    return None
+                take *= 2
+                continue
+            self.partial = b""
+            return end - pending
+
+    def record(self, view, pos):
+        """Apply the record at pos and return where the next one starts"""
+        flags = view[pos]
+        if flags == KEYFRAME:
+            length, start = read_varint(view, pos + 1)
+            if start + length > len(view):
+                raise IndexError("keyframe cut off")
+            self.state = self.read_keyframe(view[start:start + length])
+            return start + length
+
+        # Parse everything first, so a cut-off record changes nothing
+        pos += 1
+        food = powerups = corrections = None
+        if flags & FOOD:
+            food, pos = read_varint(view, pos)
+        if flags & POWERUPS:
+            count, pos = read_varint(view, pos)
+            powerups = []
+            for _ in range(count):
+                cell, pos = read_varint(view, pos)
+                powerups.append((cell, view[pos]))
+                pos += 1
+        if flags & CORRECTIONS:
+            mask, pos = read_varint(view, pos)
+            corrections = []
+            for bit in range(len(FIELDS)):
+                if mask >> bit & 1:
+                    value, pos = read_varint(view, pos)
+                    corrections.append((bit, value))
+
+        state = self.state
+        if state is None:
+            return pos
+        size = state.GRID_SIZE
+        direction = CODES[flags & 3]
+        state.snake_direction = direction
+        if flags & MOVED:
+            dx, dy = DIRECTIONS[direction]
+            x, y = state.snake[0]
+            x += dx
+            y += dy
+            if state.game_mode == GameMode.ZEN:
+                x %= size
+                y %= size
+            state.snake.appendleft((x, y))
+            if flags & POPPED:
+                state.snake.pop()
+        if food is not None:
+            state.food = ((food - 1) % size, (food - 1) // size) if food else None
+        if powerups is not None:
+            state.powerups = {(cell % size, cell // size): POWERUP_TYPES[kind] for cell, kind in powerups}
+
+        values = list(predict(field_values(state)))
+        for bit, value in corrections or ():
+            values[bit] = value
+        state.set_fields(values)
+        return pos
+
+    def read_keyframe(self, view):
+        state = StreamState()
+        pos = 0
+        values = []
+        for _ in range(4 + len(FIELDS)):
+            value, pos = read_varint(view, pos)
+            values.append(value)
+        size, mode, state.seed, direction = values[:4]
+        state.GRID_SIZE = size
+        state.game_mode = MODES[mode]
+        state.snake_direction = CODES[direction]
+        state.set_fields(values[4:])
+
+        food, pos = read_varint(view, pos)
+        state.food = ((food - 1) % size, (food - 1) // size) if food else None
+        count, pos = read_varint(view, pos)
+        for _ in range(count):
+            cell, pos = read_varint(view, pos)
+            state.obstacles.append((cell % size, cell // size))
+        count, pos = read_varint(view, pos)
+        for _ in range(count):
+            cell, pos = read_varint(view, pos)
+            state.powerups[cell % size, cell // size] = POWERUP_TYPES[view[pos]]
+            pos += 1
+
+        length, pos = read_varint(view, pos)
+        x, pos = read_varint(view, pos)
+        y, pos = read_varint(view, pos)
+        x, y = unzigzag(x), unzigzag(y)
+        state.snake.append((x, y))
+        for i in range(length - 1):
+            dx, dy = DIRECTIONS[CODES[view[pos + (i >> 2)] >> ((i & 3) * 2) & 3]]
+            x += dx
+            y += dy
+            if state.game_mode == GameMode.ZEN:
+                x %= size
+                y %= size
+            state.snake.append((x, y))
+        return state
+
+
+def check(mode=GameMode.CLASSIC, games=20, seed=0, grid_size=20, max_ticks=5000):
+    """Stream greedy games, decode them alongside and compare every tick.
+
+    Returns (ticks, bytes, encode seconds, step seconds).
+    """
+    from bots import GreedyBot
+
+    clock = time.perf_counter
+    ticks = size = encode_time = step_time = 0
+    for game in range(games):
+        engine = SnakeEngine(grid_size, mode=mode, seed=seed + game)
+        bot = GreedyBot(random.Random(seed + game))
+        encoder = StreamEncoder(engine)
+        decoder = StreamDecoder()
+        decoder.feed(encoder.take())
+        while not engine.done and engine.moves_count < max_ticks:
+            direction = bot.choose(engine)
+            start = clock()
+            engine.step(direction)
+            middle = clock()
+            encoder.tick()
+            end = clock()
+            step_time += middle - start
+            encode_time += end - middle
+
+            data = encoder.take()
+            size += len(data)
+            ticks += 1
+            decoder.feed(data)
+            if not decoder.state.matches(engine):
+                raise AssertionError(f"{mode.value} game {game} differs after tick {engine.moves_count}")
+    return ticks, size, encode_time, step_time
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Summarize recordings, e.g. from server.py --record
+        for path in sys.argv[1:]:
+            decoder = StreamDecoder()
+            with open(path, 'rb') as f:
+                records = decoder.feed(f.read())
+            state = decoder.state
+            print(f"{path}: {records} records, {state.game_mode.value}, seed {state.seed}, "
+                  f"tick {state.moves_count}, score {state.score}, length {len(state.snake)}"
+                  f"{', finished' if state.done else ''}")
+    else:
+        for mode in GameMode:
+            ticks, size, encode_time, step_time = check(mode)
+            print(f"{mode.value}: {ticks} ticks match, {size / ticks:.2f} bytes/tick, "
+                  f"encode {encode_time / ticks * 1e6:.2f} us vs step {step_time / ticks * 1e6:.2f} us")
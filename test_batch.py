@@ -0,0 +1,11 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from batch import SUPPORTED_MODES, check_parity  # noqa: E402
+
+
+@pytest.mark.parametrize("mode", SUPPORTED_MODES, ids=lambda mode: mode.name)
+def test_parity(mode):
+    """BatchEngine plays exactly as SnakeEngine on the same random draws"""
+    assert check_parity(mode, num_games=16, ticks=400, seed=0) >= 16
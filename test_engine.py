@@ -0,0 +1,108 @@
+import random
+
+import pytest
+
+from bots import CycleBot, GreedyBot
+from engine import POWERUP_DURATION, POWERUP_LIFETIME, GameMode, PowerUpType, SnakeEngine
+from scheduler import EventScheduler
+
+
+def zen_engine():
+    """A Zen game heading right along row 10, with the food out of its way"""
+    engine = SnakeEngine(20, mode=GameMode.ZEN, seed=0)
+    engine.food = (0, 0)
+    return engine
+
+
+def place_powerup(engine, pos, powerup_type):
+    """Put a powerup on pos the way spawn_powerup does"""
+    engine.powerups[pos] = powerup_type
+    engine.powerup_expiry[pos] = engine.moves_count + POWERUP_LIFETIME
+    engine.timers.schedule(engine.powerup_expiry[pos], "powerup_expired", pos)
+
+
+def check_free_cells(engine):
+    """free_cells holds exactly the empty cells, and free_slots their slots"""
+    free = engine.free_cells
+    assert sorted(free) == [i for i, value in enumerate(engine.cells) if not value]
+    for slot, cell in enumerate(free):
+        assert engine.free_slots[cell] == slot
+    assert sum(slot >= 0 for slot in engine.free_slots) == len(free)
+
+
+@pytest.mark.parametrize("mode", GameMode, ids=lambda mode: mode.name)
+def test_free_cell_index_tracks_the_board(mode):
+    for seed in range(3):
+        engine = SnakeEngine(12, mode=mode, seed=seed)
+        bot = GreedyBot(random.Random(seed))
+        check_free_cells(engine)
+        while not engine.done and engine.moves_count < 500:
+            engine.step(bot.choose(engine))
+            check_free_cells(engine)
+            assert engine.food is None or engine.cells[engine.food[1] * 12 + engine.food[0]] == 0
+
+
+@pytest.mark.parametrize("size", [4, 6])
+def test_filling_the_board_wins(size):
+    engine = SnakeEngine(size, mode=GameMode.CLASSIC, seed=0)
+    bot = CycleBot(random.Random(0), cache_dir=None)
+    while not engine.done:
+        engine.step(bot.choose(engine))
+    assert engine.won
+    assert engine.food is None
+    assert len(engine.snake) == size * size
+    assert len(engine.free_cells) == 0
+
+
+def test_effect_lasts_powerup_duration_ticks():
+    engine = zen_engine()
+    place_powerup(engine, (11, 10), PowerUpType.SCORE_MULTIPLIER)
+    engine.step()
+    assert engine.active_powerup == PowerUpType.SCORE_MULTIPLIER
+    assert engine.powerup_timer == POWERUP_DURATION - 1
+
+    # Counting the pickup tick, the effect is on for POWERUP_DURATION ticks
+    picked = engine.moves_count
+    while engine.active_powerup:
+        engine.step()
+    assert engine.moves_count - picked + 1 == POWERUP_DURATION
+    assert engine.score_multiplier == 1
+
+
+def test_renewed_effect_ignores_the_old_end():
+    engine = zen_engine()
+    place_powerup(engine, (11, 10), PowerUpType.SCORE_MULTIPLIER)
+    place_powerup(engine, (16, 10), PowerUpType.SCORE_MULTIPLIER)
+    for _ in range(6):
+        engine.step()
+    renewed = engine.moves_count
+    while engine.active_powerup:
+        engine.step()
+    assert engine.moves_count == renewed + POWERUP_DURATION - 1
+
+
+def test_powerup_expires_after_its_lifetime():
+    engine = zen_engine()
+    while not engine.powerups or next(iter(engine.powerups))[1] == 10:
+        engine.powerups.clear()
+        engine.powerup_expiry.clear()
+        engine.spawn_powerup()
+    (pos,) = engine.powerups
+    for _ in range(POWERUP_LIFETIME - 1):
+        engine.step()
+    assert pos in engine.powerups
+    engine.step()
+    assert pos not in engine.powerups
+    assert pos not in engine.powerup_expiry
+
+
+def test_scheduler_fires_due_events_in_order():
+    timers = EventScheduler()
+    timers.schedule(5, "b")
+    timers.schedule(3, "a")
+    timers.schedule(5, "c")
+    timers.schedule(9, "d")
+    assert list(timers.due(2)) == []
+    assert [kind for _, kind, _ in timers.due(5)] == ["a", "b", "c"]
+    assert timers.next_tick() == 9
+    assert len(timers) == 1
@@ -0,0 +1,52 @@
+import pytest
+
+import hamilton
+from engine import OBSTACLE, GameMode, SnakeEngine
+
+
+def check_cycle(cycle, size, cells):
+    """A closed tour of distinct free cells, each step to a neighbour"""
+    order = cycle.order
+    assert len(set(order)) == len(order)
+    for k, cell in enumerate(order):
+        assert not cells[cell] & OBSTACLE
+        assert cycle.pos[cell] == k
+        following = order[(k + 1) % len(order)]
+        assert abs(cell % size - following % size) + abs(cell // size - following // size) == 1
+    assert sum(p >= 0 for p in cycle.pos) == len(order)
+
+
+@pytest.mark.parametrize("size", [4, 8, 20, 64])
+def test_open_even_board_covers_every_cell(size):
+    engine = SnakeEngine(size, mode=GameMode.CLASSIC, seed=0)
+    cycle = hamilton.build_cycle(size, engine.cells)
+    check_cycle(cycle, size, engine.cells)
+    assert len(cycle) == size * size
+
+
+@pytest.mark.parametrize("size", [8, 20, 33])
+def test_obstacle_boards(size):
+    for seed in range(10):
+        engine = SnakeEngine(size, mode=GameMode.OBSTACLES, seed=seed)
+        cycle = hamilton.build_cycle(size, engine.cells)
+        check_cycle(cycle, size, engine.cells)
+        assert len(cycle) > 0
+
+
+def test_cycle_file_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(hamilton, "CYCLES", {})
+    engine = SnakeEngine(20, mode=GameMode.OBSTACLES, seed=3)
+    built = hamilton.cycle_for(engine, str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1
+
+    monkeypatch.setattr(hamilton, "CYCLES", {})
+    loaded = hamilton.cycle_for(engine, str(tmp_path))
+    assert loaded is not built
+    assert loaded.order == built.order and loaded.pos == built.pos
+
+
+def test_truncated_cycle_file_is_refused(tmp_path):
+    engine = SnakeEngine(8, mode=GameMode.CLASSIC, seed=0)
+    data = hamilton.build_cycle(8, engine.cells).to_bytes()
+    with pytest.raises(ValueError):
+        hamilton.Cycle.from_bytes(data[:-4])
@@ -0,0 +1,48 @@
+from inputs import InputQueue, LatencyHistogram
+
+
+def test_turns_apply_in_order_one_per_pop():
+    queue = InputQueue()
+    assert queue.push("Up", "Right", 1)
+    assert queue.push("Left", "Right", 2)
+    assert queue.pop("Right") == ("Up", 1)
+    assert queue.pop("Up") == ("Left", 2)
+    assert queue.pop("Left") is None
+
+
+def test_presses_that_change_nothing_coalesce():
+    queue = InputQueue()
+    assert not queue.push("Right", "Right", 1)  # already heading that way
+    assert not queue.push("Left", "Right", 2)  # a reversal
+    assert queue.push("Up", "Right", 3)
+    assert not queue.push("Up", "Right", 4)  # same as the last queued turn
+    assert not queue.push("Down", "Right", 5)  # reverses the last queued turn
+    assert len(queue) == 1
+
+
+def test_capacity():
+    queue = InputQueue(capacity=2)
+    assert queue.push("Up", "Right", 1)
+    assert queue.push("Left", "Right", 2)
+    assert not queue.push("Down", "Right", 3)
+    assert len(queue) == 2
+    queue.clear()
+    assert queue.pop("Right") is None
+
+
+def test_turns_no_longer_legal_are_skipped():
+    # Queued while heading Right, but the autopilot turned the snake Down
+    queue = InputQueue()
+    queue.push("Up", "Right", 1)
+    queue.push("Left", "Right", 2)
+    assert queue.pop("Down") == ("Left", 2)
+    assert len(queue) == 0
+
+
+def test_latency_percentiles():
+    histogram = LatencyHistogram(bucket_ms=10, buckets=5)
+    for ms in (1, 5, 12, 18, 25, 400):
+        histogram.record(ms)
+    assert histogram.percentile(0.5) == 20
+    assert histogram.percentile(1.0) == 50  # the open-ended last bucket
+    assert LatencyHistogram().percentile(0.5) is None
@@ -0,0 +1,64 @@
+import pytest
+
+import levels
+from engine import GameMode, SnakeEngine
+
+
+def flood_connected(size, cells):
+    """connected() done the slow way, by flood fill over every free cell"""
+    blocked = set(cells)
+    free = [cell for cell in range(size * size) if cell not in blocked]
+    if not free:
+        return True
+    seen = {free[0]}
+    stack = [free[0]]
+    while stack:
+        cell = stack.pop()
+        x, y = cell % size, cell // size
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            neighbour = ny * size + nx
+            if 0 <= nx < size and 0 <= ny < size and neighbour not in blocked and neighbour not in seen:
+                seen.add(neighbour)
+                stack.append(neighbour)
+    return len(seen) == len(free)
+
+
+@pytest.mark.parametrize("size", [4, 5, 6, 7])
+@pytest.mark.parametrize("difficulty", [1, 2, 10, 50])
+def test_small_boards_generate(size, difficulty):
+    """Tiny boards and high difficulties still produce a level, possibly empty"""
+    for seed in range(20):
+        cells = levels.generate(seed, size, difficulty)
+        assert levels.reserved_cells(size).isdisjoint(cells)
+        assert levels.connected(size, cells)
+
+
+@pytest.mark.parametrize("size", [4, 5, 6, 7])
+def test_small_board_obstacles_game(size):
+    engine = SnakeEngine(size, mode=GameMode.OBSTACLES, seed=1)
+    assert not engine.done
+
+
+@pytest.mark.parametrize("size", [8, 20, 33, 64])
+def test_generated_levels_are_connected(size):
+    for seed in range(50):
+        cells = levels.generate(seed, size)
+        assert levels.connected(size, cells)
+        assert flood_connected(size, cells)
+
+
+def test_connected_finds_a_sealed_cell():
+    # A plus of walls around (3, 3) on an 8x8 board cuts that cell off
+    size = 8
+    cells = [2 * size + 3, 4 * size + 3, 3 * size + 2, 3 * size + 4]
+    assert not levels.connected(size, cells)
+    assert not flood_connected(size, cells)
+    assert levels.pockets(size, cells) == [3 * size + 3]
+
+
+def test_pool_file_round_trip(tmp_path):
+    path = levels.pool_path(str(tmp_path), 20, 2)
+    pool = {seed: levels.generate(seed, 20) for seed in range(10)}
+    levels.save_pool(path, 20, 2, pool)
+    assert levels.load_pool(path, 20, 2) == pool
+    assert levels.load_pool(path, 21, 2) == {}
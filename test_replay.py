@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from bots import GreedyBot
+from engine import GameMode, SnakeEngine
+from replay import Replay, simulate
+
+
+def record(mode, seed, ticks=2000):
+    """A bot's game recorded the way the GUI does, and the engine it left"""
+    engine = SnakeEngine(20, mode=mode, seed=seed)
+    bot = GreedyBot(random.Random(seed))
+    replay = Replay.for_engine(engine)
+    while not engine.done and engine.moves_count < ticks:
+        engine.step(bot.choose(engine))
+        replay.append(engine.snake_direction)
+    return replay, engine
+
+
+@pytest.mark.parametrize("mode", GameMode, ids=lambda mode: mode.name)
+def test_round_trip_replays_the_game(mode, tmp_path):
+    replay, engine = record(mode, seed=5)
+    path = str(tmp_path / "game.snkr")
+    replay.save(path)
+    loaded = Replay.load(path)
+    assert list(loaded.directions()) == list(replay.directions())
+
+    again = simulate(loaded)
+    assert again.moves_count == engine.moves_count
+    assert again.score == engine.score
+    assert list(again.snake) == list(engine.snake)
+    assert again.done == engine.done
+
+
+@pytest.mark.parametrize("ticks", [0, 1, 4, 5, 7, 8])
+def test_truncate(ticks):
+    replay, _ = record(GameMode.ZEN, seed=1, ticks=10)
+    directions = list(replay.directions())
+    replay.truncate(ticks)
+    assert list(replay.directions()) == directions[:ticks]
+    assert len(replay.moves) == (ticks + 3) // 4
+
+    # Recording carries on cleanly after the cut
+    replay.append("Up")
+    assert list(replay.directions()) == directions[:ticks] + ["Up"]
+
+
+def test_bad_files_are_refused():
+    replay, _ = record(GameMode.CLASSIC, seed=2, ticks=50)
+    data = replay.to_bytes()
+    with pytest.raises(ValueError):
+        Replay.from_bytes(data[:-2])
+    with pytest.raises(ValueError):
+        Replay.from_bytes(b"SNKX" + data[4:])
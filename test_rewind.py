@@ -0,0 +1,11 @@
+import pytest
+
+from engine import GameMode
+from rewind import check
+
+
+@pytest.mark.parametrize("mode", GameMode, ids=lambda mode: mode.name)
+def test_seek_matches_original_run(mode):
+    """Seeking back replays to the same state, with the oldest snapshots dropped"""
+    ticks, first_tick = check(mode, seed=0, ticks=1500, budget_bytes=16 * 1024)
+    assert first_tick > 0
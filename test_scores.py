@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from scores import ScoreStore
+
+RUN = {'score': 50, 'length': 8, 'food': 5, 'moves': 120, 'date': "2024-05-01 12:00"}
+
+
+def open_store(tmp_path, contents):
+    """A fresh store importing a high_scores.json holding contents"""
+    json_path = tmp_path / "high_scores.json"
+    json_path.write_text(contents)
+    return ScoreStore(str(tmp_path / "scores.db"), str(json_path))
+
+
+def test_json_import(tmp_path):
+    older = dict(RUN, score=30, date="2024-04-01 09:30")
+    store = open_store(tmp_path, json.dumps({"Classic": [older, RUN], "Zen Mode": [RUN]}))
+    assert store.top("Classic") == [RUN, older]
+    assert store.best("Zen Mode") == RUN
+    assert store.count() == 3
+
+
+@pytest.mark.parametrize("contents", ["", "{\"Classic\": [{\"score\": 5", "not json", "[1, 2]"])
+def test_unreadable_json_is_retried(tmp_path, contents):
+    store = open_store(tmp_path, contents)
+    assert store.count() == 0
+    store.close()
+
+    # Fixed, the file is picked up on the next open
+    store = open_store(tmp_path, json.dumps({"Classic": [RUN]}))
+    assert store.top("Classic") == [RUN]
+
+
+def test_bad_entries_are_skipped(tmp_path):
+    entries = [RUN, {'score': 10}, dict(RUN, food="lots"), None, 7]
+    store = open_store(tmp_path, json.dumps({"Classic": entries, "Speed Mode": "oops"}))
+    assert store.top("Classic") == [RUN]
+    assert store.count() == 1
+
+
+def test_json_is_imported_once(tmp_path):
+    contents = json.dumps({"Classic": [RUN]})
+    open_store(tmp_path, contents).close()
+    store = open_store(tmp_path, contents)
+    assert store.count() == 1
@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+import pytest
+
+from server import Client, GameServer
+
+
+class Transport:
+    def is_closing(self):
+        return False
+
+    def get_write_buffer_size(self):
+        return 0
+
+
+class Writer:
+    """Enough of a StreamWriter to collect what the server sends"""
+
+    def __init__(self):
+        self.transport = Transport()
+        self.sent = []
+
+    def write(self, data):
+        self.sent.append(bytes(data))
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("name", ["../../x", "/tmp/evil", "a/b", "..", "", "x" * 65, "a b", 7])
+def test_bad_room_names_are_refused(tmp_path, name):
+    server = GameServer(record_dir=str(tmp_path / "rec"))
+    (tmp_path / "rec").mkdir()
+    writer = Writer()
+    server.handle(Client(None, writer), {'join': name, 'delta': True})
+
+    assert json.loads(writer.sent[-1])['type'] == 'error'
+    assert not server.rooms
+    assert not any(tmp_path.rglob("*.snks"))
+
+
+def test_room_is_recorded_under_its_name(tmp_path):
+    async def join_and_leave():
+        server = GameServer(record_dir=str(tmp_path))
+        client = Client(None, Writer())
+        server.handle(client, {'join': "room_1-a", 'mode': "ZEN"})
+        assert "room_1-a" in server.rooms
+        server.leave(client)
+
+    asyncio.run(join_and_leave())
+    assert [path.name for path in tmp_path.iterdir()] == ["room_1-a.snks"]
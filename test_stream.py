@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+from bots import GreedyBot
+from engine import GameMode, SnakeEngine
+from stream import StreamDecoder, StreamEncoder, check
+
+
+@pytest.mark.parametrize("mode", GameMode, ids=lambda mode: mode.name)
+def test_stream_decodes_to_engine_state(mode):
+    """Every tick decodes back to the engine's state"""
+    ticks, size, _, _ = check(mode, games=3, seed=0)
+    assert ticks and size / ticks < 3
+
+
+@pytest.mark.parametrize("piece", [1, 2, 7, 100, 5000])
+def test_records_split_across_pieces(piece):
+    """Feeding a stream in pieces of any size decodes the same as all at once"""
+    engine = SnakeEngine(20, mode=GameMode.CLASSIC, seed=3)
+    bot = GreedyBot(random.Random(3))
+    encoder = StreamEncoder(engine, keyframe_every=64)
+    data = bytearray(encoder.take())
+    while not engine.done and engine.moves_count < 3000:
+        engine.step(bot.choose(engine))
+        encoder.tick()
+        data += encoder.take()
+
+    whole = StreamDecoder()
+    records = whole.feed(data)
+    pieces = StreamDecoder()
+    fed = sum(pieces.feed(data[start:start + piece]) for start in range(0, len(data), piece))
+    assert fed == records
+    assert pieces.partial == b""
+    assert pieces.state.matches(engine) and whole.state.matches(engine)
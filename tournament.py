@@ -0,0 +1,211 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+
+from bots import BOTS
+from engine import GameMode, SnakeEngine
+from scores import FIELDS, ScoreStore
+
+
+def game_seed(seed, mode, index):
+    """Seed for one game, independent of which worker plays it"""
+    return random.Random(f"{seed}:{mode.name}:{index}").getrandbits(63)
+
+
+def play_game(mode, bot_name, seed, max_ticks):
+    """Play one headless game and return its stats"""
+    engine = SnakeEngine(mode=mode, seed=seed)
+    bot = BOTS[bot_name](random.Random(f"{seed}:bot"))
+
+    ticks = 0
+    while not engine.done and ticks < max_ticks:
+        engine.step(bot.choose(engine))
+        ticks += 1
+
+    result = engine.score_data()
+    result.update({
+        'mode': mode.value,
+        'bot': bot_name,
+        'seed': seed,
+        'won': engine.won,
+        'finished': engine.done,
+    })
+    return result
+
+
+def run_chunk(task):
+    """Worker entry point: play a run of games for one mode"""
+    mode_name, bot_name, seed, start, count, max_ticks = task
+    mode = GameMode[mode_name]
+    return [play_game(mode, bot_name, game_seed(seed, mode, index), max_ticks)
+            for index in range(start, start + count)]
+
+
+def bot_modes(bot_name, modes):
+    """The modes a bot is meant for, of those asked for; bots without MODES play all"""
+    supported = getattr(BOTS[bot_name], 'MODES', None)
+    return [mode for mode in modes if supported is None or mode in supported]
+
+
+def make_tasks(modes, bot_name, games, seed, max_ticks, chunk_size):
+    """Split games per mode into chunks small enough to balance the pool"""
+    tasks = []
+    for mode in modes:
+        for start in range(0, games, chunk_size):
+            count = min(chunk_size, games - start)
+            tasks.append((mode.name, bot_name, seed, start, count, max_ticks))
+    return tasks
+
+
+def run_tournament(modes, bot_name, games, seed=0, workers=None, max_ticks=100000,
+                   chunk_size=25, on_result=None):
+    """Play games for every mode across a process pool.
+
+    Results are streamed back to the parent as each chunk finishes and
+    passed to on_result one game at a time. Returns all results and the
+    wall time taken.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = make_tasks(modes, bot_name, games, seed, max_ticks, chunk_size)
+    results = []
+
+    start = time.perf_counter()
+    if workers == 1:
+        chunks = map(run_chunk, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers)
+        chunks = pool.imap_unordered(run_chunk, tasks)
+    try:
+        for chunk in chunks:
+            for result in chunk:
+                results.append(result)
+                if on_result:
+                    on_result(result)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    return results, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of sorted values"""
+    index = min(len(values) - 1, max(0, round(fraction * len(values)) - 1))
+    return values[index]
+
+
+def summarize(results, elapsed):
+    """Throughput and per-mode score distributions"""
+    summary = {
+        'games': len(results),
+        'seconds': round(elapsed, 3),
+        'games_per_second': round(len(results) / elapsed, 1) if elapsed else 0,
+        'ticks_per_second': round(sum(r['moves'] for r in results) / elapsed) if elapsed else 0,
+        'modes': {},
+    }
+
+    by_mode = {}
+    for result in results:
+        by_mode.setdefault(result['mode'], []).append(result)
+
+    for mode, mode_results in by_mode.items():
+        scores = sorted(r['score'] for r in mode_results)
+        lengths = [r['length'] for r in mode_results]
+
+        # Ten equal-width score buckets
+        width = max(1, (scores[-1] - scores[0] + 10) // 10)
+        histogram = [0] * 10
+        for score in scores:
+            histogram[min(9, (score - scores[0]) // width)] += 1
+
+        summary['modes'][mode] = {
+            'games': len(scores),
+            'won': sum(r['won'] for r in mode_results),
+            'unfinished': sum(not r['finished'] for r in mode_results),
+            'score_mean': round(statistics.fmean(scores), 2),
+            'score_stdev': round(statistics.pstdev(scores), 2),
+            'score_min': scores[0],
+            'score_p50': percentile(scores, 0.5),
+            'score_p90': percentile(scores, 0.9),
+            'score_p99': percentile(scores, 0.99),
+            'score_max': scores[-1],
+            'length_mean': round(statistics.fmean(lengths), 2),
+            'histogram_start': scores[0],
+            'histogram_width': width,
+            'histogram': histogram,
+        }
+    return summary
+
+
+def print_summary(summary, out=sys.stdout):
+    """Human readable version of summarize()"""
+    print(f"{summary['games']} games in {summary['seconds']}s: "
+          f"{summary['games_per_second']} games/s, {summary['ticks_per_second']} ticks/s", file=out)
+    for mode, stats in summary['modes'].items():
+        print(f"\n{mode}: {stats['games']} games, {stats['won']} won, "
+              f"{stats['unfinished']} hit the tick limit", file=out)
+        print(f"  score mean {stats['score_mean']} (sd {stats['score_stdev']}) | "
+              f"min {stats['score_min']} p50 {stats['score_p50']} p90 {stats['score_p90']} "
+              f"p99 {stats['score_p99']} max {stats['score_max']}", file=out)
+        peak = max(stats['histogram']) or 1
+        for i, count in enumerate(stats['histogram']):
+            low = stats['histogram_start'] + i * stats['histogram_width']
+            print(f"  {low:>6} | {'#' * (40 * count // peak)} {count}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless snake games across all cores")
+    parser.add_argument("--games", type=int, default=200, help="games per mode")
+    parser.add_argument("--mode", action="append", choices=[m.name for m in GameMode],
+                        help="mode to play, repeatable (default: every mode)")
+    parser.add_argument("--bot", default="greedy", choices=sorted(BOTS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    parser.add_argument("--max-ticks", type=int, default=100000, help="stop games that run longer")
+    parser.add_argument("--chunk-size", type=int, default=25, help="games per pool task")
+    parser.add_argument("--results", help="write one JSON line per game to this file")
+    parser.add_argument("--store", help="record every game in this score database")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    modes = [GameMode[name] for name in args.mode] if args.mode else list(GameMode)
+    playable = bot_modes(args.bot, modes)
+    skipped = [mode.name for mode in modes if mode not in playable]
+    if not playable:
+        parser.error(f"the {args.bot} bot does not play {', '.join(skipped)}")
+    if skipped:
+        print(f"Skipping {', '.join(skipped)}: the {args.bot} bot does not play them", file=sys.stderr)
+    modes = playable
+    results_file = open(args.results, "w") if args.results else None
+
+    def on_result(result):
+        if results_file:
+            results_file.write(json.dumps(result) + "\n")
+
+    try:
+        results, elapsed = run_tournament(modes, args.bot, args.games, args.seed, args.workers,
+                                          args.max_ticks, args.chunk_size, on_result)
+    finally:
+        if results_file:
+            results_file.close()
+
+    if args.store:
+        store = ScoreStore(args.store, json_path=None)
+        store.record_many((r['mode'], {field: r[field] for field in FIELDS}) for r in results)
+        store.close()
+
+    summary = summarize(results, elapsed)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()